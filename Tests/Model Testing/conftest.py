@@ -0,0 +1,12 @@
+import os
+import shutil
+import tempfile
+
+# kernels, fitted results and fit times of the tests must not be written to
+# the user cache; set before any test module imports core
+cacheDirectory = tempfile.mkdtemp(prefix="csfrat-test-cache-")
+os.environ["CSFRAT_CACHE_DIR"] = cacheDirectory
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(cacheDirectory, ignore_errors=True)
@@ -0,0 +1,69 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from core import estimationPool
+from core.budget import FitBudget
+from core.dataClass import Data
+from models.geometric import Geometric
+from models.truncatedLogistic import TruncatedLogistic
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+@pytest.mark.parametrize("optimizer", TruncatedLogistic.optimizers)
+def test_evaluation_budget(optimizer):
+    m = TruncatedLogistic(data=df, metricNames=['E', 'F', 'C'], optimizer=optimizer,
+                          budget=FitBudget(maxEvaluations=20))
+    m.runEstimation(m.covariateData)
+    assert m.budgetExceeded
+    assert not m.converged
+    assert m.evaluations == 20
+    # best parameters so far are used, results calculated from them
+    assert m.llfVal >= m.RLL(m.initialEstimates(), m.covariateData)
+    assert np.isclose(m.llfVal, m.RLL(m.mle_array, m.covariateData))
+    assert len(m.mvf_array) == m.n
+
+
+def test_time_budget():
+    m = Geometric(data=df, metricNames=['E', 'F'], engine="reference", budget=FitBudget(maxTime=0.0))
+    m.runEstimation(m.covariateData)
+    assert m.budgetExceeded
+    # stopped while building the symbolic gradient, initial estimates kept
+    assert np.array_equal(m.mle_array, m.initialEstimates())
+
+
+def test_root_budget():
+    expected = Geometric(data=df, metricNames=['E', 'F'])
+    expected.runEstimation(expected.covariateData)
+    m = Geometric(data=df, metricNames=['E', 'F'], budget=FitBudget(maxRootIterations=2))
+    m.runEstimation(m.covariateData)
+    assert m.budgetExceeded
+    assert m.gradientEvaluations < expected.gradientEvaluations
+    assert m.llfVal <= expected.llfVal
+
+
+def test_no_budget_limits():
+    m = Geometric(data=df, metricNames=['E'], optimizer="L-BFGS-B", budget=FitBudget())
+    m.runEstimation(m.covariateData)
+    assert m.converged and not m.budgetExceeded
+
+
+def test_budget_in_worker():
+    try:
+        with estimationPool.PoolRun(1) as run:
+            future = run.pool.submit(estimationPool.fitModel, TruncatedLogistic, ['E', 'F'], df, "L-BFGS-B",
+                                     run.token, FitBudget(maxEvaluations=10))
+            fitted = future.result(timeout=120)
+        assert fitted.budgetExceeded and fitted.evaluations == 10
+    finally:
+        estimationPool.shutdownPool()
+
+
+def test_remaining_budget():
+    remaining = FitBudget(maxTime=2.0, maxEvaluations=10).remaining(0.5, 12, 4)
+    assert remaining.maxTime == 1.5 and remaining.maxEvaluations == 0
+    assert remaining.maxRootIterations is None
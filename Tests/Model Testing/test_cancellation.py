@@ -0,0 +1,100 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import core.model
+from core import estimationPool
+from core.cancellation import CancellationToken, EstimationCancelled
+from core.kernelCache import KernelCache
+from core.dataClass import Data
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+class CountdownToken(CancellationToken):
+    """Cancels itself after a number of checks."""
+
+    def __init__(self, checks):
+        super().__init__()
+        self.remaining = checks
+
+    def check(self):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.cancel()
+        super().check()
+
+
+@pytest.mark.parametrize("optimizer", Geometric.optimizers)
+def test_cancelled_during_optimization(optimizer):
+    m = Geometric(data=df, metricNames=['E', 'F'], optimizer=optimizer)
+    token = CountdownToken(3)
+    with pytest.raises(EstimationCancelled):
+        m.runEstimation(m.covariateData, token)
+    assert token.remaining == 0
+
+
+@pytest.mark.parametrize("engine", ["reference", "parameterized"])
+def test_cancelled_while_building_gradient(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(core.model, "kernelCache", KernelCache(str(tmp_path)))
+    m = Geometric(data=df, metricNames=['E'], engine=engine)
+    with pytest.raises(EstimationCancelled):
+        m.runEstimation(m.covariateData, CountdownToken(5))
+    assert core.model.kernelCache.info()["memoryEntries"] == 0
+
+
+def test_token_does_not_change_result():
+    expected = Geometric(data=df, metricNames=['E', 'F'], optimizer="L-BFGS-B")
+    expected.runEstimation(expected.covariateData)
+    m = Geometric(data=df, metricNames=['E', 'F'], optimizer="L-BFGS-B")
+    m.runEstimation(m.covariateData, CancellationToken())
+    assert np.array_equal(m.mle_array, expected.mle_array)
+
+
+def test_run_token_stops_workers():
+    try:
+        with estimationPool.PoolRun(1) as run:
+            run.token.cancel()
+            future = run.pool.submit(estimationPool.fitModel, Geometric, ['E'], df, "L-BFGS-B", run.token)
+            with pytest.raises(EstimationCancelled):
+                future.result(timeout=120)
+
+        # a new run is not cancelled
+        with estimationPool.PoolRun(1) as run:
+            future = run.pool.submit(estimationPool.fitModel, Geometric, ['E'], df, "L-BFGS-B", run.token)
+            assert future.result(timeout=120).converged
+    finally:
+        estimationPool.shutdownPool()
+
+
+def test_run_tokens_independent():
+    try:
+        with estimationPool.PoolRun(1) as running:
+            with estimationPool.PoolRun(1) as cancelled:
+                assert cancelled.pool is running.pool
+                cancelled.token.cancel()
+            assert not running.token.cancelled
+            future = running.pool.submit(estimationPool.fitModel, Geometric, ['E'], df, "L-BFGS-B", running.token)
+            assert future.result(timeout=120).converged
+    finally:
+        estimationPool.shutdownPool()
+
+
+def test_pool_kept_while_used():
+    try:
+        with estimationPool.PoolRun(1) as first:
+            future = first.pool.submit(estimationPool.fitModel, Geometric, ['E'], df, "L-BFGS-B", first.token)
+            # a run with other workers, or one that breaks, doesn't stop the fits of the first run
+            with pytest.raises(BrokenProcessPool):
+                with estimationPool.PoolRun(2) as second:
+                    assert second.pool is not first.pool
+                    raise BrokenProcessPool()
+            assert not first.token.cancelled
+            assert future.result(timeout=120).converged
+    finally:
+        estimationPool.shutdownPool()
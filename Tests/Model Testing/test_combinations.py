@@ -0,0 +1,58 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+from core.combinations import CombinationSource, combinationName, numCombinations
+from core.dataClass import Data
+
+names = ['E', 'F', 'C', 'EC', 'FC', 'T1', 'T2', 'T3', 'T4', 'T5', 'T6', 'T7', 'T8', 'T9', 'T10']
+
+
+def test_same_order_as_powerset():
+    Systemdata = Data()
+    Systemdata.importFile(myPath + '/ds1.csv')
+    source = Systemdata.metricNameCombinations
+    expected = [list(c) for c in Systemdata.powerset(Systemdata.metricNames)]
+    assert list(source) == expected
+    assert len(source) == 8
+    assert [combinationName(c) for c in source][:2] == ["None", "E"]
+
+
+def test_size_limits():
+    source = CombinationSource(names, maxSize=3)
+    assert len(source) == sum(numCombinations(15, r) for r in range(4))
+    assert len(source) == len(list(source))
+    assert all(len(c) <= 3 for c in source)
+    assert len(CombinationSource(names, minSize=14)) == 16
+    assert list(CombinationSource(names, minSize=1, maxSize=1)) == [[name] for name in names]
+
+
+def test_text_filter():
+    source = CombinationSource(names, maxSize=2, text="t1 E")
+    assert ['E', 'T1'] in list(source)
+    assert ['E', 'T10'] in list(source)    # words are matched anywhere in the name
+    assert all('t1' in combinationName(c).lower() and 'e' in combinationName(c).lower() for c in source)
+    assert len(source) == len(list(source))
+    assert list(CombinationSource(names, text="none")) == [[]]
+
+
+def test_paging_is_lazy():
+    source = CombinationSource(names)    # 32768 combinations
+    assert len(source) == 2**15
+    page = source.page(3, 100)
+    assert len(page) == 100
+    assert page == list(source)[300:400]
+    assert source.page(400, 100) == []
+    assert CombinationSource(names + [name + 'x' for name in names]).page(0, 2) == [[], ['E']]    # 2**30 never generated
+
+
+def test_contains_and_excluding():
+    source = CombinationSource(names, maxSize=2).excluding([['E', 'F']])
+    assert ('E', 'F') not in source
+    assert ['E', 'C'] in source
+    assert ('C', 'E') not in source      # not in the order of the metric names
+    assert ('E', 'F', 'C') not in source
+    assert len(source) == 1 + 15 + 105 - 1
+    assert ['E', 'F'] not in list(source)
+    # filters keep the exclusions
+    assert ('E', 'F') not in source.filtered(0, 3)
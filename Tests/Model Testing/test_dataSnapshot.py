@@ -0,0 +1,78 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pickle
+import pytest
+import numpy as np
+from core.dataClass import Data
+from core.dataSnapshot import DataSnapshot
+from core.estimationPool import fitModel
+from core.resultCache import ResultCache
+from ui.commonWidgets import TaskThread
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+Systemdata.max_interval = 15
+df = Systemdata.getData()
+snapshot = Systemdata.getSnapshot()
+
+
+def test_arrays():
+    assert snapshot.n == len(snapshot) == 15 and snapshot.metricNames == ('E', 'F', 'C')
+    assert np.array_equal(snapshot.t, df['T'].values) and np.array_equal(snapshot.cumulativeFailures, df['CFC'].values)
+    assert snapshot.covariates.dtype == np.float64 and snapshot.covariates.flags.c_contiguous
+    assert np.array_equal(snapshot.covariates, df[['E', 'F', 'C']].values.T)
+
+
+def test_covariate_views():
+    # adjacent metrics are views of the covariate matrix, others are copies
+    for names in [['E'], ['F', 'C'], ['E', 'F', 'C']]:
+        assert np.shares_memory(snapshot.covariateData(names), snapshot.covariates)
+    for names in [['E', 'C'], ['F', 'E']]:
+        assert not np.shares_memory(snapshot.covariateData(names), snapshot.covariates)
+        assert np.array_equal(snapshot.covariateData(names), np.array([df[name].values for name in names]))
+    assert snapshot.covariateData([]).shape == (0,)
+
+
+def test_read_only():
+    with pytest.raises(ValueError):
+        snapshot.t[0] = 5
+    with pytest.raises(ValueError):
+        snapshot.covariateData(['E', 'C'])[0, 0] = 5
+    with pytest.raises(AttributeError):
+        snapshot.t = np.zeros(15)
+
+    copy = pickle.loads(pickle.dumps(snapshot))
+    assert np.array_equal(copy.covariates, snapshot.covariates) and copy.metricNames == snapshot.metricNames
+    with pytest.raises(ValueError):
+        copy.failures[0] = 5
+
+    subset = snapshot.subset(10)
+    assert subset.n == 10 and np.shares_memory(subset.covariateData(['F']), snapshot.covariates)
+    assert np.array_equal(subset.cumulativeFailures, df['CFC'].values[:10])
+
+
+def test_models_share_snapshot():
+    first = fitModel(Geometric, ['E', 'F'], snapshot, "L-BFGS-B")
+    second = fitModel(Geometric, ['F'], snapshot, "L-BFGS-B")
+    assert first.data is snapshot and first.t is second.t
+    assert np.shares_memory(first.covariateData, second.covariateData)
+
+    # same results and result cache key as the dataframe
+    fromFrame = fitModel(Geometric, ['E', 'F'], df, "L-BFGS-B")
+    assert np.array_equal(first.mle_array, fromFrame.mle_array) and first.llfVal == fromFrame.llfVal
+    cache = ResultCache(os.devnull)
+    assert cache.key(Geometric, ['E', 'F'], snapshot) == cache.key(Geometric, ['E', 'F'], df)
+
+
+def test_run_creates_one_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setattr("ui.commonWidgets.resultCache", ResultCache(str(tmp_path / "results.sqlite")))
+    calls = []
+    monkeypatch.setattr(Systemdata, "getSnapshot", lambda: calls.append(1) or snapshot)
+    task = TaskThread([Geometric], [["None"], ["E"], ["F"], ["E", "F"]], Systemdata, "L-BFGS-B")
+    results = []
+    task.taskFinished.connect(results.append)
+    task.run()
+    assert len(calls) == 1 and len(results[0]) == 4
+    assert all(record.data is snapshot for record in results[0].values())
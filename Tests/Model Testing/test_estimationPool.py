@@ -0,0 +1,57 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from core import estimationPool
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+jobs = [(Geometric, ['E', 'F']), (DiscreteWeibull2, []), (DiscreteWeibull2, ['C'])]
+
+
+def test_pool_matches_serial():
+    try:
+        with estimationPool.PoolRun(2) as run:
+            futures = [run.pool.submit(estimationPool.fitModel, modelClass, metricNames, df, "L-BFGS-B", run.token)
+                       for modelClass, metricNames in jobs]
+            for (modelClass, metricNames), future in zip(jobs, futures):
+                fitted = future.result(timeout=120)
+                expected = estimationPool.fitModel(modelClass, metricNames, df, "L-BFGS-B")
+                assert type(fitted) is modelClass
+                assert fitted.metricNames == metricNames
+                assert fitted.llfVal == expected.llfVal
+                assert np.array_equal(fitted.mvf_array, expected.mvf_array)
+        # same pool is reused by the next run
+        with estimationPool.PoolRun(2) as nextRun:
+            assert nextRun.pool is run.pool
+    finally:
+        estimationPool.shutdownPool()
+
+
+def test_psse_warm_start():
+    subset = df[:int(0.8 * len(df))]
+    for modelClass, metricNames in jobs:
+        full = estimationPool.fitModel(modelClass, metricNames, df, "L-BFGS-B")
+        cold = estimationPool.fitPSSE(modelClass, metricNames, subset, df, "L-BFGS-B")
+        warm = estimationPool.fitPSSE(modelClass, metricNames, subset, df, "L-BFGS-B", initial=full.mle_array)
+        assert np.isclose(warm, cold, rtol=1e-4)
+
+
+def test_psse_in_pool():
+    subset = df[:int(0.8 * len(df))]
+    try:
+        with estimationPool.PoolRun(2) as run:
+            futures = [run.pool.submit(estimationPool.fitPSSE, modelClass, metricNames, subset, df, "L-BFGS-B",
+                                       run.token)
+                       for modelClass, metricNames in jobs]
+            for (modelClass, metricNames), future in zip(jobs, futures):
+                assert future.result(timeout=120) == estimationPool.fitPSSE(modelClass, metricNames, subset, df,
+                                                                            "L-BFGS-B")
+    finally:
+        estimationPool.shutdownPool()
@@ -0,0 +1,72 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pickle
+import pytest
+import numpy as np
+from core.estimationPool import fitModel
+from core.fitResult import FitResult
+from core.allocation import EffortAllocation
+from core.prediction import prediction_mvf, prediction_psse, prediction_intensity
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+Systemdata.max_interval = 15
+data = Systemdata.getSnapshot()
+fitted = {names: fitModel(DiscreteWeibull2, list(names), data, "L-BFGS-B") for names in [(), ('E',), ('E', 'F')]}
+
+
+class Effort:
+    """Stands in for a prediction effort spin box."""
+    def value(self):
+        return 2.0
+
+
+def test_record_values():
+    for names, model in fitted.items():
+        record = FitResult.fromModel(model, data)
+        assert not hasattr(record, "__dict__")
+        assert record.modelClass is DiscreteWeibull2 and record.combinationName == model.combinationName
+        assert record.shortName == "DW2" and record.metricString == model.metricString
+        assert record.n == model.n and record.numCovariates == model.numCovariates
+        for field in ["llfVal", "aicVal", "bicVal", "sseVal", "omega", "converged", "iterations"]:
+            assert getattr(record, field) == getattr(model, field)
+        for field in FitResult.arrayFields:
+            array = getattr(record, field)
+            assert array.dtype == np.float64 and array.flags.c_contiguous
+            assert np.array_equal(array, getattr(model, field))
+        assert np.array_equal(record.betas, model.betas)
+        assert np.array_equal(record.covariateData, model.covariateData)
+
+
+def test_data_shared():
+    first = FitResult.fromModel(fitted[('E',)], data)
+    second = FitResult.fromModel(fitModel(Geometric, ['E'], data, "L-BFGS-B"), data)
+    assert first.t is second.t and first.cumulativeFailures is second.cumulativeFailures
+    assert first.data is second.data
+    # records can be pickled, with their data
+    copy = pickle.loads(pickle.dumps(first))
+    assert np.array_equal(copy.mvf_array, first.mvf_array) and np.array_equal(copy.t, first.t)
+
+
+def test_prediction_and_allocation():
+    effort = {'E': Effort(), 'F': Effort()}
+    full = Systemdata.getFullData()
+    for names, model in fitted.items():
+        record = FitResult.fromModel(model, data)
+        for a, b in zip(prediction_mvf(record, 5, record.covariateData, effort),
+                        prediction_mvf(model, 5, model.covariateData, effort)):
+            assert np.allclose(a, b)
+        assert np.allclose(prediction_psse(record, full), prediction_psse(model, full))
+        assert prediction_intensity(record, 0.5, record.covariateData, effort)[2] == \
+            prediction_intensity(model, 0.5, model.covariateData, effort)[2]
+
+    model = fitted[('E', 'F')]
+    record = FitResult.fromModel(model, data)
+    fromRecord = EffortAllocation(record, record.covariateData, 1, 20.0)
+    fromModel = EffortAllocation(model, model.covariateData, 1, 20.0)
+    assert fromRecord.H == pytest.approx(fromModel.H)
+    assert np.allclose(fromRecord.percentages, fromModel.percentages)
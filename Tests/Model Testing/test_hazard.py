@@ -0,0 +1,46 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from core.model import Model
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.discreteWeibull_type3 import DiscreteWeibullType3
+from models.geometric import Geometric
+from models.IFR_generalized_SB import IFR_Generalized_SB
+from models.IFR_SB import IFR_SB
+from models.negativeBinomial2 import NegativeBinomial2
+from models.S_Distribution import S_Distribution
+from models.truncatedLogistic import TruncatedLogistic
+
+modelClasses = [DiscreteWeibull2, DiscreteWeibullType3, Geometric, IFR_Generalized_SB,
+                IFR_SB, NegativeBinomial2, S_Distribution, TruncatedLogistic]
+
+intervals = np.arange(1, 201)
+
+
+@pytest.mark.parametrize("modelClass", modelClasses)
+def test_hazardArray_matches_scalar(modelClass):
+    # hazard functions don't use instance data, no need to load a dataset
+    m = modelClass.__new__(modelClass)
+    args = modelClass.parameterEstimates
+    expected = np.array([m.hazardNumerical(i, args) for i in intervals])
+    assert np.allclose(m.hazardArray(intervals, args), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("modelClass", modelClasses)
+def test_default_hazardArray_wrapper(modelClass):
+    # base class implementation only relies on hazardNumerical
+    m = modelClass.__new__(modelClass)
+    args = modelClass.parameterEstimates
+    assert np.allclose(Model.hazardArray(m, intervals, args), m.hazardArray(intervals, args), rtol=1e-12)
+
+
+def test_long_series_no_overflow():
+    m = TruncatedLogistic.__new__(TruncatedLogistic)
+    # math.exp overflows for the scalar form at this size
+    with pytest.raises(OverflowError):
+        m.hazardNumerical(1, (5000.0, 0.1))
+    with np.errstate(over='ignore'):
+        h = m.hazardArray(np.arange(1, 2001), (5000.0, 0.1))
+    assert np.all(np.isfinite(h))
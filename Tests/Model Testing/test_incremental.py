@@ -0,0 +1,106 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+from core.dataClass import Data
+from core.resultCache import ResultCache
+from core.scheduler import CostModel
+from core.budget import FitBudget
+from core import estimationPool
+import ui.commonWidgets
+from ui.commonWidgets import TaskThread, PSSEThread
+from models.geometric import Geometric
+from models.discreteWeibull2 import DiscreteWeibull2
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+Systemdata.max_interval = Systemdata.n
+
+
+@pytest.fixture(autouse=True)
+def emptyCache(tmp_path, monkeypatch):
+    # fits are counted, so results of other runs must not be found
+    monkeypatch.setattr(ui.commonWidgets, "resultCache", ResultCache(str(tmp_path / "results.sqlite")))
+    monkeypatch.setattr(ui.commonWidgets, "costModel", CostModel(str(tmp_path / "history.json")))
+
+
+def runTask(modelsToRun, metricNames, previous=None, warmStart=False):
+    """Runs a TaskThread on this thread, returns its results and fitted names."""
+    task = TaskThread(modelsToRun, metricNames, Systemdata, "L-BFGS-B", warmStart=warmStart, previous=previous)
+    fitted, finished, counts = [], [], []
+    task.modelFinished.connect(lambda name, model: fitted.append(name))
+    task.taskFinished.connect(finished.append)
+    task.jobCount.connect(counts.append)
+    task.run()
+    return finished[0], fitted, counts[0]
+
+
+def test_only_new_combinations_fit():
+    first, fitted, count = runTask([Geometric, DiscreteWeibull2], [["None"], ["E"], ["E", "F"]])
+    assert count == 6 and len(fitted) == 6
+
+    second, fitted, count = runTask([Geometric], [["None"], ["E"], ["F"]], previous=first)
+    assert count == 1 and fitted == ["GM (F)"]
+    # kept results are the same objects, deselected ones are not emitted
+    assert list(second) == ["GM (None)", "GM (E)", "GM (F)"]
+    assert second["GM (None)"] is first["GM (None)"] and second["GM (E)"] is first["GM (E)"]
+
+
+def test_kept_results_are_warm_start_parents():
+    first, fitted, count = runTask([Geometric], [["None"], ["E"]], warmStart=True)
+    second, fitted, count = runTask([Geometric], [["None"], ["E"], ["E", "F"]], previous=first, warmStart=True)
+    assert fitted == ["GM (E, F)"]
+    assert second["GM (E, F)"].warmStarted and second["GM (E, F)"].converged
+
+
+def test_nothing_to_fit():
+    first, fitted, count = runTask([Geometric], [["E"]])
+    second, fitted, count = runTask([Geometric], [["E"]], previous=first)
+    assert count == 0 and fitted == [] and second == first
+
+
+def test_kept_results_emitted_before_fitting():
+    first, fitted, count = runTask([Geometric], [["None"], ["E"]])
+    task = TaskThread([Geometric], [["None"], ["E"], ["F"]], Systemdata, "L-BFGS-B", previous=first)
+    emitted = []
+    task.modelKept.connect(lambda name, model: emitted.append(("kept", name, model)))
+    task.modelFinished.connect(lambda name, model: emitted.append(("fit", name, model)))
+    task.run()
+    assert [(kind, name) for kind, name, model in emitted] == [("kept", "GM (None)"), ("kept", "GM (E)"),
+                                                              ("fit", "GM (F)")]
+    assert emitted[0][2] is first["GM (None)"]
+
+
+def test_failed_pool_fit_not_converged():
+    # the budget raises TypeError when each fit starts, in the workers
+    task = TaskThread([Geometric], [["None"], ["E"]], Systemdata, "L-BFGS-B", workers=2,
+                      budget=FitBudget(maxTime="invalid"))
+    finished = []
+    task.taskFinished.connect(finished.append)
+    try:
+        task.run()
+    finally:
+        estimationPool.shutdownPool()
+    assert list(finished[0]) == ["GM (None)", "GM (E)"]
+    assert not any(result.converged for result in finished[0].values())
+
+
+def test_failed_psse_fit_left_empty():
+    first, fitted, count = runTask([Geometric], [["None"], ["E"]])
+    # the budget raises TypeError when each fit starts, on this thread
+    thread = PSSEThread(first, Systemdata, 0.8, "L-BFGS-B", budget=FitBudget(maxTime="invalid"))
+    emitted = []
+    thread.results.connect(lambda results, fraction: emitted.append(results))
+    thread.run()
+    assert emitted == [{"GM (None)": "", "GM (E)": ""}]
+
+
+def test_cold_result_not_used_for_warm_start():
+    first, fitted, count = runTask([Geometric], [["None"], ["E"]])
+    second, fitted, count = runTask([Geometric], [["None"], ["E"]], warmStart=True)
+    # no parent, same fit as the cold run
+    assert second["GM (None)"].cached
+    assert not second["GM (E)"].cached and second["GM (E)"].warmStarted
+
+    third, fitted, count = runTask([Geometric], [["None"], ["E"]], warmStart=True)
+    assert third["GM (E)"].cached and third["GM (E)"].warmStarted
@@ -0,0 +1,119 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+import symengine
+import core.model
+import core.kernelCache as kernelCacheModule
+from core.kernelCache import KernelCache
+from core.dataClass import Data
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+
+
+def simpleKernel():
+    x = symengine.symbols('x:2')
+    expressions = [x[0] * x[1], symengine.exp(x[1])]
+    return x, expressions, symengine.lambdify(x, expressions, backend='lambda')
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = KernelCache(str(tmp_path))
+    x, expressions, kernel = simpleKernel()
+    assert cache.get("k") is None
+    cache.put("k", x, expressions, kernel)
+    assert cache.get("k") is kernel
+
+    # new cache (new session) only has the disk tier
+    reopened = KernelCache(str(tmp_path))
+    loaded = reopened.get("k")
+    assert np.allclose(loaded([2.0, 0.5]), kernel([2.0, 0.5]))
+    assert reopened.info()["diskEntries"] == 1
+    assert reopened.info()["memoryEntries"] == 1
+
+
+def test_eviction_and_clear(tmp_path):
+    x, expressions, kernel = simpleKernel()
+    cache = KernelCache(str(tmp_path), maxMemoryEntries=2, maxDiskBytes=1)
+    for key in ["a", "b", "c"]:
+        cache.put(key, x, expressions, kernel)
+    info = cache.info()
+    assert info["memoryEntries"] == 2
+    assert info["diskEntries"] == 0    # every file is over the size limit
+
+    cache = KernelCache(str(tmp_path))
+    cache.put("a", x, expressions, kernel)
+    cache.clear()
+    assert cache.info()["diskEntries"] == 0
+    assert cache.get("a") is None
+
+
+def test_key_depends_on_data():
+    cache = KernelCache()
+    m = Geometric(data=Systemdata.getFullData(), metricNames=['E'])
+    key = cache.key(m, m.covariateData)
+    assert key == cache.key(m, m.covariateData.copy())
+    assert key != cache.key(m, m.covariateData * 2)
+    assert key.startswith("Geometric-1cov-{0}n-{1}".format(m.n, kernelCacheModule.codeVersion(Geometric)))
+
+
+def test_key_depends_on_code_version(monkeypatch):
+    cache = KernelCache()
+    m = Geometric(data=Systemdata.getFullData(), metricNames=['E'])
+    key = cache.key(m, m.covariateData)
+    monkeypatch.setitem(kernelCacheModule._codeVersions, Geometric, "changed")
+    assert cache.key(m, m.covariateData) != key
+    monkeypatch.setattr(symengine, "__version__", "0.0.0")
+    assert "-symengine0.0.0-" in cache.key(m, m.covariateData)
+
+
+@pytest.mark.parametrize("stale", [b"ccore.kernelCache\nRemovedClass\n.", b"cremoved_module\nRemovedClass\n."])
+def test_stale_kernel_rebuilt(tmp_path, stale):
+    # pickles of classes that no longer exist, as after a symengine upgrade
+    cache = KernelCache(str(tmp_path))
+    x, expressions, kernel = simpleKernel()
+    cache.put("k", x, expressions, kernel)
+    with open(cache._path("k"), "wb") as f:
+        f.write(stale)
+    reopened = KernelCache(str(tmp_path))
+    assert reopened.get("k") is None
+    assert reopened.info()["diskEntries"] == 0
+
+
+def test_symbolic_gradient_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(core.model, "kernelCache", KernelCache(str(tmp_path)))
+    m = Geometric(data=Systemdata.getFullData(), metricNames=['E', 'F'], engine="reference")
+    x = m.initialEstimates()
+    expected = np.asarray(m.symbolicGradient(m.covariateData)(x), dtype=float)
+
+    # second session: symbolic likelihood must not be rebuilt
+    monkeypatch.setattr(core.model, "kernelCache", KernelCache(str(tmp_path)))
+
+    def fail(*args):
+        raise AssertionError("LLF_sym called on cache hit")
+    monkeypatch.setattr(m, "LLF_sym", fail)
+    assert np.allclose(np.asarray(m.symbolicGradient(m.covariateData)(x), dtype=float), expected)
+
+
+def test_parameterized_kernel_shared_between_datasets(tmp_path, monkeypatch):
+    monkeypatch.setattr(core.model, "kernelCache", KernelCache(str(tmp_path)))
+    simPath = myPath + '/../../datasets/cov_sims/sim{0}/GM/GM_2cov_dataset.csv'
+    results = []
+    for sim in [1, 2, 3]:
+        data = Data()
+        data.importFile(simPath.format(sim))
+        m = Geometric(data=data.getFullData(), metricNames=['x1', 'x2'], engine="parameterized")
+        x = m.initialEstimates()
+        results.append((m.parameterizedGradient(m.covariateData)(x), m.RLL_gradient(x, m.covariateData)))
+
+        # after the first dataset the symbolic likelihood is never rebuilt
+        def fail(*args):
+            raise AssertionError("LLF_sym_parameterized called on cache hit")
+        monkeypatch.setattr(Geometric, "LLF_sym_parameterized", fail)
+
+    for symbolic, numeric in results:
+        assert np.allclose(np.asarray(symbolic, dtype=float), numeric, rtol=1e-8)
+    assert core.model.kernelCache.info()["diskEntries"] == 1
@@ -0,0 +1,169 @@
+import glob
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+import symengine
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.discreteWeibull_type3 import DiscreteWeibullType3
+from models.geometric import Geometric
+from models.IFR_generalized_SB import IFR_Generalized_SB
+from models.IFR_SB import IFR_SB
+from models.negativeBinomial2 import NegativeBinomial2
+from models.S_Distribution import S_Distribution
+from models.truncatedLogistic import TruncatedLogistic
+from core.dataClass import Data
+from core.model import Model
+
+datasetPath = myPath + '/../../datasets/'
+
+# cov_sims folder name -> model class the data was simulated from
+simModels = {"DW2": DiscreteWeibull2, "DW3": DiscreteWeibullType3, "GM": Geometric,
+             "IFRGSB": IFR_Generalized_SB, "IFRSB": IFR_SB, "NB2": NegativeBinomial2,
+             "S": S_Distribution, "TL": TruncatedLogistic}
+
+MetricCombos = [[], ['E'], ['F'], ['C'], ['E', 'F'], ['F', 'C'], ['E', 'C'], ['E', 'F', 'C']]
+
+
+def loadData(fname):
+    data = Data()
+    data.importFile(fname)
+    return data.getFullData()
+
+
+def likelihoodPair(model, x):
+    ref = model.RLL_reference(x, model.covariateData)
+    vec = model.RLL_vectorized(x, model.covariateData)
+    return ref, vec
+
+
+# ds1 and ds2: every shipped model, every covariate combination
+dsCases = []
+for ds in ["ds1.csv", "ds2.csv"]:
+    df = loadData(datasetPath + ds)
+    for modelClass in simModels.values():
+        for metricNames in MetricCombos:
+            m = modelClass(data=df, metricNames=metricNames)
+            x = m.initialEstimates()
+            dsCases.append((likelihoodPair(m, x), m.combinationName, ds))
+
+# simulated data: the generating model with all of the file's covariates
+simCases = []
+for fname in sorted(glob.glob(datasetPath + 'cov_sims/*/*/*.csv')):
+    df = loadData(fname)
+    modelClass = simModels[os.path.basename(os.path.dirname(fname))]
+    metricNames = [name for name in df.columns if name not in ('T', 'FC', 'CFC')]
+    m = modelClass(data=df, metricNames=metricNames)
+    x = m.initialEstimates()
+    simCases.append((likelihoodPair(m, x), os.path.relpath(fname, datasetPath)))
+
+
+# numeric score against the derivative of the symbolic likelihood
+gradientCases = []
+df = loadData(datasetPath + "ds1.csv")
+for modelClass in simModels.values():
+    for metricNames in [[], ['E'], ['E', 'F', 'C']]:
+        m = modelClass(data=df, metricNames=metricNames)
+        x = m.initialEstimates()
+        f, symbols = m.LLF_sym(m.hazardSymbolic, m.covariateData)
+        fd = m.convertSym(symbols, [symengine.diff(f, s) for s in symbols], "numpy")
+        expected = np.asarray(fd(x), dtype=float)
+        gradientCases.append((expected, m.RLL_gradient(x, m.covariateData), m.combinationName))
+
+
+# single pass MVF curve against the per-point MVF loop
+mvfCases = []
+for modelClass in simModels.values():
+    for metricNames in [[], ['E'], ['E', 'F', 'C']]:
+        m = modelClass(data=df, metricNames=metricNames)
+        x = m.initialEstimates()
+        hazard = m.hazardArray(np.arange(1, m.n + 1), x[:m.numParameters])
+        expected = np.array([m.MVF(x, 2.0, hazard, stop, m.covariateData) for stop in range(m.n)])
+        mvfCases.append((expected, m.MVF_all(x, 2.0, hazard, m.covariateData), m.combinationName))
+
+
+# vectorized omega against the original loop, including hazard and covariate
+# data extended past the fitted intervals as in prediction
+omegaCases = []
+for modelClass in simModels.values():
+    for metricNames in [[], ['E'], ['E', 'F', 'C']]:
+        m = modelClass(data=df, metricNames=metricNames)
+        x = m.initialEstimates()
+        betas = x[m.numParameters:]
+        hazard = m.hazardArray(np.arange(1, m.n + 6), x[:m.numParameters])
+        cov = np.concatenate((m.covariateData, np.ones((m.numCovariates, 5))), axis=1) if m.numCovariates else m.covariateData
+        omegaCases.append((m.calcOmega_reference(hazard, betas, cov), m.calcOmega(hazard, betas, cov), m.combinationName))
+
+
+@pytest.mark.parametrize("values, name, sheet", dsCases)
+def test_vectorized_RLL_ds(values, name, sheet):
+    ref, vec = values
+    assert np.isclose(ref, vec, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("values, fname", simCases)
+def test_vectorized_RLL_cov_sims(values, fname):
+    ref, vec = values
+    assert np.isclose(ref, vec, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("expected, result, name", gradientCases)
+def test_RLL_gradient(expected, result, name):
+    assert np.allclose(expected, result, rtol=1e-8)
+
+
+@pytest.mark.parametrize("expected, result, name", mvfCases)
+def test_MVF_all(expected, result, name):
+    assert np.allclose(expected, result, rtol=1e-10, equal_nan=True)
+
+
+@pytest.mark.parametrize("modelClass", simModels.values())
+def test_RLL_batch(modelClass):
+    m = modelClass(data=df, metricNames=['E', 'F'])
+    rng = np.random.default_rng(0)
+    x_matrix = m.initialEstimates() * (1 + 0.05 * rng.standard_normal((25, m.numSymbols)))
+    expected = np.array([m.RLL_vectorized(x, m.covariateData) for x in x_matrix])
+    assert np.allclose(m.RLL_batch(x_matrix, m.covariateData), expected, rtol=1e-10, equal_nan=True)
+    # chunks of 3 rows give the same result
+    chunked = m.RLL_batch(x_matrix, m.covariateData, chunkElements=3 * m.n)
+    assert np.allclose(chunked, expected, rtol=1e-10, equal_nan=True)
+
+
+def test_RLL_batch_scalar_hazard():
+    # models without a vectorized hazard are evaluated row by row
+    class ScalarGeometric(Geometric):
+        hazardArray = Model.hazardArray
+
+    m = ScalarGeometric(data=df, metricNames=[])
+    x_matrix = np.array([[0.01], [0.02], [0.05]])
+    expected = [m.RLL_vectorized(x, m.covariateData) for x in x_matrix]
+    assert np.allclose(m.RLL_batch(x_matrix, m.covariateData), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("expected, result, name", omegaCases)
+def test_calcOmega(expected, result, name):
+    assert np.isclose(expected, result, rtol=1e-10, equal_nan=True)
+
+
+def test_shared_intermediates():
+    m = DiscreteWeibull2(data=df, metricNames=['E', 'F'])
+    x = m.initialEstimates()
+    hazard = m.hazardArray(np.arange(1, m.n + 1), x[:m.numParameters])
+    intermediates = m.fitIntermediates(hazard, x[m.numParameters:], m.covariateData)
+    assert m.RLL_detection(intermediates[3]) == m.RLL_vectorized(x, m.covariateData)
+    omega = m.calcOmega(hazard, x[m.numParameters:], m.covariateData, intermediates)
+    assert np.isclose(m.MVF_all(x, omega, hazard, m.covariateData, intermediates)[-1], m.totalFailures)
+
+
+def test_engine_selection():
+    df = loadData(datasetPath + "ds1.csv")
+    ref = Geometric(data=df, metricNames=['E', 'F'], engine="reference")
+    vec = Geometric(data=df, metricNames=['E', 'F'])
+    x = ref.initialEstimates()
+    assert vec.engine == "vectorized"
+    assert ref.RLL(x, ref.covariateData) == ref.RLL_reference(x, ref.covariateData)
+    assert np.isclose(ref.RLL(x, ref.covariateData), vec.RLL(x, vec.covariateData), rtol=1e-10)
+
+    with pytest.raises(ValueError):
+        Geometric(data=df, metricNames=[], engine="unknown")
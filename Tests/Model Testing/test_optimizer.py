@@ -0,0 +1,53 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.discreteWeibull_type3 import DiscreteWeibullType3
+from models.geometric import Geometric
+from models.IFR_generalized_SB import IFR_Generalized_SB
+from models.IFR_SB import IFR_SB
+from models.negativeBinomial2 import NegativeBinomial2
+from models.S_Distribution import S_Distribution
+from models.truncatedLogistic import TruncatedLogistic
+from core.dataClass import Data
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+modelClasses = [DiscreteWeibull2, DiscreteWeibullType3, Geometric, IFR_Generalized_SB,
+                IFR_SB, NegativeBinomial2, S_Distribution, TruncatedLogistic]
+
+
+def fit(modelClass, metricNames, optimizer):
+    m = modelClass(data=df, metricNames=metricNames, optimizer=optimizer)
+    m.runEstimation(m.covariateData)
+    return m
+
+
+@pytest.mark.parametrize("modelClass", modelClasses)
+@pytest.mark.parametrize("metricNames", [[], ['E', 'F', 'C']])
+def test_LBFGSB_matches_reference(modelClass, metricNames):
+    ref = fit(modelClass, metricNames, "reference")
+    m = fit(modelClass, metricNames, "L-BFGS-B")
+    assert m.converged
+    # gradient optimizer reaches at least the reference log-likelihood
+    assert m.llfVal >= ref.llfVal - 1e-5 * abs(ref.llfVal)
+    assert 0 < m.iterations < ref.iterations
+    assert m.evaluations > 0 and m.gradientEvaluations > 0
+    # hazard stays in (0, 1)
+    assert np.all((m.hazard_array > 0) & (m.hazard_array < 1))
+
+
+def test_trust_constr():
+    ref = fit(Geometric, ['E'], "reference")
+    m = fit(Geometric, ['E'], "trust-constr")
+    assert m.converged
+    assert np.isclose(m.llfVal, ref.llfVal, rtol=1e-6)
+
+
+def test_unknown_optimizer():
+    with pytest.raises(ValueError):
+        Geometric(data=df, metricNames=[], optimizer="unknown")
@@ -0,0 +1,80 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import subprocess
+import pytest
+import numpy as np
+from core.estimationPool import fitModel
+from core.project import Project
+from core.allocation import EffortAllocation
+from core.prediction import prediction_psse
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+Systemdata.max_interval = 15
+df = Systemdata.getFullData()
+
+
+@pytest.fixture(scope="module")
+def saved(tmp_path_factory):
+    results = {}
+    for modelClass, names in [(Geometric, []), (Geometric, ['E', 'F']), (DiscreteWeibull2, ['E'])]:
+        m = fitModel(modelClass, names, Systemdata.getData(), "L-BFGS-B")
+        results[m.combinationName] = m
+    m = results["GM (E, F)"]
+    allocations = {"GM (E, F)": [EffortAllocation(m, m.covariateData, 1, 20.0), m]}
+    psse = {name: 0.5 * i for i, name in enumerate(results)}
+    psse["DW2 (E)"] = ""
+    project = Project(Systemdata, 0, results, "L-BFGS-B", psse, 0.8, allocations)
+    path = str(tmp_path_factory.mktemp("project") / "ds1.csfrat")
+    project.save(path)
+    return project, path
+
+
+def test_round_trip(saved, monkeypatch):
+    project, path = saved
+
+    def fail(*args, **kwargs):
+        raise AssertionError("runEstimation called when loading a project")
+    monkeypatch.setattr(Geometric, "runEstimation", fail)
+    monkeypatch.setattr(DiscreteWeibull2, "runEstimation", fail)
+    loaded = Project.load(path)
+
+    assert loaded.data.sheetNames == Systemdata.sheetNames
+    assert loaded.data.metricNames == Systemdata.metricNames
+    assert loaded.data.max_interval == 15
+    assert loaded.data.getFullData().equals(df)
+    assert list(loaded.estimationResults) == list(project.estimationResults)
+    for name, fitted in project.estimationResults.items():
+        m = loaded.estimationResults[name]
+        assert m.modelClass is type(fitted) and m.metricNames == fitted.metricNames and m.n == 15
+        assert np.array_equal(m.mle_array, fitted.mle_array)
+        assert np.array_equal(m.betas, fitted.betas)
+        assert np.array_equal(m.mvf_array, fitted.mvf_array)
+        assert np.array_equal(m.intensityList, fitted.intensityList)
+        for field in ["llfVal", "aicVal", "bicVal", "sseVal", "omega", "converged", "iterations"]:
+            assert getattr(m, field) == getattr(fitted, field)
+        assert np.array_equal(prediction_psse(m, df), prediction_psse(fitted, df))
+    assert loaded.psseResults == project.psseResults and loaded.psseFraction == 0.8
+    allocation, m = loaded.allocationResults["GM (E, F)"]
+    original = project.allocationResults["GM (E, F)"][0]
+    assert m is loaded.estimationResults["GM (E, F)"] and allocation.allocationType == 1
+    assert allocation.H == original.H and np.array_equal(allocation.percentages, original.percentages)
+
+
+def test_load_does_not_import_fitting_modules(saved):
+    # a new interpreter, the test process has already imported them
+    code = ("import sys; sys.path.insert(0, {0!r}); from core.project import Project; Project.load({1!r}); "
+            "print('symengine' in sys.modules, 'scipy.optimize' in sys.modules)").format(myPath + '/../../', saved[1])
+    output = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+    assert output.split() == [b"False", b"False"]
+
+
+def test_not_a_project(tmp_path):
+    path = tmp_path / "data.csfrat"
+    path.write_bytes(b"T,FC\n1,2\n")
+    with pytest.raises(ValueError):
+        Project.load(str(path))
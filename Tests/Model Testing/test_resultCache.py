@@ -0,0 +1,109 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import time
+import pytest
+import numpy as np
+from core.estimationPool import fitModel
+from core.resultCache import ResultCache
+from core.budget import FitBudget
+from core.prediction import prediction_psse
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "results.sqlite"))
+
+
+def test_hit_rebuilds_without_fitting(cache, monkeypatch):
+    fitted = fitModel(DiscreteWeibull2, ['E', 'F'], df, "L-BFGS-B")
+    assert cache.get(DiscreteWeibull2, ['E', 'F'], df, "L-BFGS-B") is None
+    cache.put(fitted)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("runEstimation called on a cache hit")
+    monkeypatch.setattr(DiscreteWeibull2, "runEstimation", fail)
+    m = cache.get(DiscreteWeibull2, ['E', 'F'], df, "L-BFGS-B")
+    assert m.cached and not fitted.cached
+    assert np.array_equal(m.mle_array, fitted.mle_array)
+    assert np.array_equal(m.betas, fitted.betas)
+    assert np.array_equal(m.mvf_array, fitted.mvf_array)
+    assert np.array_equal(m.intensityList, fitted.intensityList)
+    for name in ["llfVal", "aicVal", "bicVal", "sseVal", "omega", "converged", "runtime"]:
+        assert getattr(m, name) == getattr(fitted, name)
+    assert np.array_equal(prediction_psse(m, df), prediction_psse(fitted, df))
+    assert cache.info()["hits"] == 1 and cache.info()["misses"] == 1
+
+
+def test_key_depends_on_inputs(cache):
+    key = cache.key(Geometric, ['E'], df)
+    assert key == cache.key(Geometric, ['E'], df.copy())
+    assert key != cache.key(Geometric, ['F'], df)
+    assert key != cache.key(DiscreteWeibull2, ['E'], df)
+    assert key != cache.key(Geometric, ['E'], df, "L-BFGS-B")
+    assert key != cache.key(Geometric, ['E'], df, budget=FitBudget(maxEvaluations=10))
+    assert key != cache.key(Geometric, ['E'], df[:-1])
+    changed = df.copy()
+    changed.loc[3, 'E'] += 1
+    assert key != cache.key(Geometric, ['E'], changed)
+    # columns not used by the fit don't change the key
+    changed = df.copy()
+    changed.loc[3, 'F'] += 1
+    assert key == cache.key(Geometric, ['E'], changed)
+
+
+def test_warm_start_separate_entry(cache):
+    parent = fitModel(Geometric, ['E'], df, "L-BFGS-B")
+    initial = np.append(parent.mle_array, 0.0)
+    warm = fitModel(Geometric, ['E', 'F'], df, "L-BFGS-B", initial=initial)
+    assert warm.warmStarted
+    cache.put(warm, initial)
+    assert cache.get(Geometric, ['E', 'F'], df, "L-BFGS-B") is None
+    assert cache.get(Geometric, ['E', 'F'], df, "L-BFGS-B", initial=initial * 2) is None
+    assert cache.get(Geometric, ['E', 'F'], df, "L-BFGS-B", initial=initial) is not None
+
+    # a warm start that fell back to the default estimates is stored as a default start
+    cold = fitModel(Geometric, ['E', 'F'], df, "L-BFGS-B")
+    cache.put(cold, initial)
+    assert cache.get(Geometric, ['E', 'F'], df, "L-BFGS-B") is not None
+
+
+def test_least_recently_used_evicted(tmp_path):
+    fits = [fitModel(Geometric, names, df, "L-BFGS-B") for names in [['E'], ['F'], ['C']]]
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+    cache.put(fits[0])
+    size = cache.info()["bytes"]
+    cache.maxBytes = int(2.5 * size)
+    time.sleep(0.01)
+    cache.put(fits[1])
+    time.sleep(0.01)
+    assert cache.get(Geometric, ['E'], df, "L-BFGS-B") is not None     # E now more recent than F
+    time.sleep(0.01)
+    cache.put(fits[2])
+    assert cache.info()["entries"] == 2
+    assert cache.get(Geometric, ['F'], df, "L-BFGS-B") is None
+    assert cache.get(Geometric, ['E'], df, "L-BFGS-B") is not None
+    cache.clear()
+    assert cache.info()["entries"] == 0
+
+
+def test_budget_exceeded_not_stored(cache):
+    m = fitModel(DiscreteWeibull2, ['E'], df, budget=FitBudget(maxEvaluations=5))
+    assert m.budgetExceeded
+    cache.put(m)
+    assert cache.info()["entries"] == 0
+
+
+def test_unreadable_database(tmp_path):
+    path = tmp_path / "results.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    cache = ResultCache(str(path))
+    assert cache.get(Geometric, ['E'], df) is None
+    cache.put(fitModel(Geometric, ['E'], df, "L-BFGS-B"))     # logs a warning, doesn't raise
@@ -0,0 +1,61 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+from core.dataClass import Data
+from core.estimationPool import fitModel
+from core.retainedResults import RetainedResults
+from models.geometric import Geometric
+from models.discreteWeibull2 import DiscreteWeibull2
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+Systemdata.max_interval = 15
+settings = ("L-BFGS-B", "None", False)
+
+results = {}
+for modelClass, names in [(Geometric, []), (Geometric, ['E']), (DiscreteWeibull2, ['E'])]:
+    m = fitModel(modelClass, names, Systemdata.getData(), "L-BFGS-B")
+    results[m.combinationName] = m
+
+
+def test_view_restores_results_in_order():
+    retained = RetainedResults()
+    retained.store(0, 15, settings, results)
+    retained.storePSSE(0, 15, {"GM (None)": 1.5, "GM (E)": 2.5, "DW2 (E)": ""}, 0.9)
+
+    fitSettings, shown, psse = retained.view(0, 15)
+    assert fitSettings == settings and list(shown) == list(results)
+    assert all(shown[name] is model for name, model in results.items())
+    assert psse == ({"GM (None)": 1.5, "GM (E)": 2.5, "DW2 (E)": ""}, 0.9)
+    # other sheets and intervals have nothing kept
+    assert retained.view(0, 14) == (None, {}, None) and retained.view(1, 15) == (None, {}, None)
+
+
+def test_matching_settings():
+    retained = RetainedResults()
+    retained.store(0, 15, settings, results)
+    # deselected combinations are still kept for the next run
+    retained.store(0, 15, settings, {"GM (E)": results["GM (E)"]})
+    assert list(retained.view(0, 15)[1]) == ["GM (E)"]
+    assert retained.matching(0, 15, settings) == results
+    assert retained.matching(0, 15, ("Nelder-Mead", "None", False)) == {}
+    # results restored from a project are shown, but not used by a run
+    retained.store(0, 14, None, results)
+    assert retained.matching(0, 14, None) == {} and len(retained.view(0, 14)[1]) == 3
+
+
+def test_least_recently_used_removed():
+    retained = RetainedResults(maxResults=4)
+    retained.store(0, 15, settings, results)
+    retained.store(0, 14, settings, {"GM (None)": results["GM (None)"]})
+    retained.view(0, 15)    # now used more recently than interval 14
+    retained.store(1, 15, settings, {"GM (E)": results["GM (E)"]})
+
+    assert retained.info()["results"] == 4
+    assert retained.view(0, 14)[1] == {} and len(retained.view(0, 15)[1]) == 3
+    # PSSE values are only returned for results that are still kept
+    retained.storePSSE(0, 14, {"GM (None)": 1.0}, 0.9)
+    assert retained.view(0, 14)[2] == ({}, 0.9)
+
+    retained.clear()
+    assert retained.info()["results"] == 0 and retained.view(0, 15) == (None, {}, None)
@@ -0,0 +1,83 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from core import estimationPool
+from core.prediction import prediction_psse
+from core.rollingOrigin import cutPoints, cutBlocks, evaluateCuts, RollingOriginResult
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+def test_cut_points():
+    assert cutPoints(20, 0.5, 0.95) == list(range(10, 20))
+    assert cutPoints(20, 0.1, 1.0) == list(range(5, 20))   # at least 5 intervals, one left to predict
+    assert cutPoints(20, 0.5, 0.95, step=3) == [10, 13, 16, 19]
+    assert cutPoints(20, 0.9, 0.5) == []
+
+
+def test_cut_blocks():
+    cuts = list(range(10, 20))
+    blocks = cutBlocks(cuts, 3)
+    assert [cut for block in blocks for cut in block] == cuts
+    assert [len(block) for block in blocks] == [4, 3, 3]
+    assert cutBlocks(cuts[:2], 5) == [[10], [11]]
+    assert cutBlocks(cuts, 0) == [cuts]
+
+
+@pytest.mark.parametrize("modelClass, metricNames", [(Geometric, ['E']), (DiscreteWeibull2, [])])
+def test_warm_chain_matches_cold_fits(modelClass, metricNames):
+    cuts = cutPoints(len(df), 0.7, 0.85)
+    psse, oneStep, converged = evaluateCuts(modelClass, metricNames, df, cuts, "L-BFGS-B")
+    assert converged.all()
+    for j, cut in enumerate(cuts):
+        cold = estimationPool.fitPSSE(modelClass, metricNames, df[:cut], df, "L-BFGS-B")
+        assert np.isclose(psse[j], cold, rtol=1e-4)
+    # one step error is the prediction of the first interval not fit
+    fitted = estimationPool.fitModel(modelClass, metricNames, df[:cuts[0]], "L-BFGS-B")
+    predicted = prediction_psse(fitted, df)[cuts[0]]
+    assert np.isclose(oneStep[0], predicted - df['CFC'].values[cuts[0]], rtol=1e-4)
+
+
+def test_result_matrices():
+    cuts = [10, 11, 12]
+    result = RollingOriginResult(["GM (None)", "DW2 (None)"], cuts)
+    result.setBlock("GM (None)", [10, 11, 12], [1.0, 2.0, 3.0], [1.0, -1.0, 1.0], [True, True, True])
+    result.setBlock("DW2 (None)", [11, 12], [4.0, 4.0], [2.0, 2.0], [True, False])
+    result.setBlock("DW2 (None)", [10], [4.0], [-2.0], [True])
+    assert np.allclose(result.meanPSSE(), [2.0, 4.0])
+    assert np.allclose(result.oneStepRMSE(), [1.0, 2.0])
+    summary = result.summary()
+    assert list(summary["Rank"]) == [1, 2]
+    assert list(summary["Converged Cuts"]) == [3, 2]
+    matrices = result.matrices()
+    assert list(matrices.columns) == ["Measure", "Combination", "10", "11", "12"]
+    assert len(matrices.index) == 4
+
+
+def test_unevaluated_combination_ranked_last():
+    result = RollingOriginResult(["A", "B"], [10])
+    result.setBlock("B", [10], [1.0], [3.0], [True])
+    assert list(result.summary()["Rank"]) == [2, 1]
+
+
+def test_blocks_in_pool_match_serial():
+    cuts = cutPoints(len(df), 0.7, 0.85)
+    serial = evaluateCuts(Geometric, ['E'], df, cuts, "L-BFGS-B")
+    full = estimationPool.fitModel(Geometric, ['E'], df, "L-BFGS-B")
+    try:
+        blocks = cutBlocks(cuts, 2)
+        with estimationPool.PoolRun(2) as run:
+            futures = [run.pool.submit(evaluateCuts, Geometric, ['E'], df, block, "L-BFGS-B", run.token,
+                                       initial=full.mle_array)
+                       for block in blocks]
+            psse = np.concatenate([future.result(timeout=120)[0] for future in futures])
+        assert np.allclose(psse, serial[0], rtol=1e-4)
+    finally:
+        estimationPool.shutdownPool()
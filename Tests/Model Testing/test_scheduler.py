@@ -0,0 +1,61 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+from core.scheduler import CostModel
+from core.dataClass import Data
+from models.geometric import Geometric
+from models.truncatedLogistic import TruncatedLogistic
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+def fitted(modelClass, metricNames, runtime):
+    m = modelClass(data=df, metricNames=metricNames, optimizer="L-BFGS-B")
+    m.runtime = runtime
+    return m
+
+
+def test_order_without_history(tmp_path):
+    costs = CostModel(str(tmp_path / "history.json"))
+    jobs = [("GM (None)", Geometric, []), ("GM (E, F)", Geometric, ['E', 'F']),
+            ("TL (E)", TruncatedLogistic, ['E']), ("TL (E, F, C)", TruncatedLogistic, ['E', 'F', 'C'])]
+    ordered = [name for name, modelClass, metricNames in costs.order(jobs, 30)]
+    assert ordered == ["TL (E, F, C)", "GM (E, F)", "TL (E)", "GM (None)"]
+
+
+def test_history_changes_order(tmp_path):
+    costs = CostModel(str(tmp_path / "history.json"))
+    jobs = [("TL (E, F, C)", TruncatedLogistic, ['E', 'F', 'C']), ("GM (E, F)", Geometric, ['E', 'F'])]
+    # geometric fits measured to be much slower than truncated logistic
+    costs.record(fitted(Geometric, ['E'], 5.0))
+    costs.record(fitted(TruncatedLogistic, ['E'], 0.01))
+    assert costs.order(jobs, len(df), "L-BFGS-B")[0][0] == "GM (E, F)"
+    # exact measurement used when available
+    assert costs.predict(Geometric, 1, len(df), "L-BFGS-B") == 5.0
+    # mean rate used for a class and method without history
+    assert costs.predict(Geometric, 1, len(df), "trust-constr") > costs.predict(TruncatedLogistic, 1, len(df), "L-BFGS-B")
+
+
+def test_moving_average_and_persistence(tmp_path):
+    path = str(tmp_path / "history.json")
+    costs = CostModel(path, smoothing=0.5)
+    costs.record(fitted(Geometric, ['E'], 1.0))
+    costs.record(fitted(Geometric, ['E'], 3.0))
+    assert costs.predict(Geometric, 1, len(df), "L-BFGS-B") == 2.0
+    costs.save()
+
+    # next session
+    reopened = CostModel(path)
+    assert reopened.predict(Geometric, 1, len(df), "L-BFGS-B") == 2.0
+    reopened.clear()
+    assert not os.path.exists(path)
+
+
+def test_unreadable_history(tmp_path):
+    path = tmp_path / "history.json"
+    path.write_text("not json")
+    costs = CostModel(str(path))
+    assert costs.rates == {} and costs.runtimes == {}
@@ -0,0 +1,105 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import math
+import pytest
+from core.estimationPool import fitModel
+from core.subsetSearch import createSearch, criterionValue, SubsetSearch, StepwiseSearch, BestFirstSearch
+from core.dataClass import Data
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+weights = {'E': -3.0, 'F': -2.0, 'C': 1.0}
+
+
+class Fit:
+    """Stands in for a fitted model, criterion is the sum of the weights."""
+    def __init__(self, combination, converged=True):
+        self.converged = converged
+        self.aicVal = sum(weights[name] for name in combination)
+        self.bicVal = self.aicVal + len(combination)
+
+
+def drive(search, fit=Fit):
+    rounds = []
+    while True:
+        proposed = search.propose()
+        if not proposed:
+            return rounds
+        rounds.append(proposed)
+        for combination in proposed:
+            search.update(combination, fit(combination))
+
+
+def test_forward_stepwise():
+    search = StepwiseSearch(['E', 'F', 'C'], "AIC", forward=True)
+    rounds = drive(search)
+    assert rounds == [[[]], [['E'], ['F'], ['C']], [['E', 'F'], ['E', 'C']], [['E', 'F', 'C']]]
+    assert search.best() == ['E', 'F']
+    assert search.fits == 7 and search.exhaustiveFits == 8
+
+
+def test_backward_stepwise():
+    search = createSearch("Backward Stepwise", ['E', 'F', 'C'], "AIC")
+    rounds = drive(search)
+    assert rounds[0] == [['E', 'F', 'C']]
+    assert search.best() == ['E', 'F']
+    assert search.fits == 6
+
+
+def test_bic_changes_selection():
+    # each covariate costs 1 more with BIC, so C is never worth adding
+    search = createSearch("Forward Stepwise", ['C'], "BIC")
+    drive(search)
+    assert search.best() == []
+
+
+def test_best_first_prunes_poor_parents():
+    search = BestFirstSearch(['E', 'F', 'C'], "AIC", margin=2.0)
+    drive(search)
+    assert search.best() == ['E', 'F']
+    # supersets of F, C and (E, C) are not expanded, they are worse than the best by more than 2
+    assert ('F', 'C') not in search.fitted
+    assert search.fits == 7
+
+
+def test_best_first_bounded():
+    search = createSearch("Best First", ['E', 'F', 'C'], "AIC", maxFits=3)
+    drive(search)
+    assert search.fits == 3
+    assert search.best() == ['E']
+
+
+def test_not_converged_not_expanded():
+    search = BestFirstSearch(['E', 'F'], "AIC")
+    drive(search, lambda combination: Fit(combination, converged=combination != []))
+    assert search.fitted[()] == math.inf
+    assert search.fits == 1
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        createSearch("Exhaustive", ['E'])
+
+
+def test_search_must_propose():
+    with pytest.raises(TypeError):
+        SubsetSearch(['E'])
+
+
+def test_search_fitted_models():
+    candidates = ['E', 'F', 'C']
+    exhaustive = {}
+    for combination in [[], ['E'], ['F'], ['C'], ['E', 'F'], ['E', 'C'], ['F', 'C'], ['E', 'F', 'C']]:
+        exhaustive[tuple(combination)] = criterionValue(fitModel(Geometric, combination, df, "L-BFGS-B"))
+    for strategy in ["Forward Stepwise", "Backward Stepwise", "Best First"]:
+        search = createSearch(strategy, candidates)
+        drive(search, lambda combination: fitModel(Geometric, combination, df, "L-BFGS-B"))
+        assert search.fits <= 8
+        for combination, value in search.fitted.items():
+            assert value == pytest.approx(exhaustive[combination])
+        # best of the search is never worse than the model without covariates
+        assert search.value(search.best()) <= exhaustive[()]
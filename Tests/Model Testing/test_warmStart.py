@@ -0,0 +1,87 @@
+import os, sys
+myPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, myPath + '/../../')
+import pytest
+import numpy as np
+from core.estimationPool import fitModel
+from core.budget import FitBudget
+from core.warmStart import parentCombinations, bestParent, nestedEstimates
+from core.dataClass import Data
+from models.discreteWeibull2 import DiscreteWeibull2
+from models.geometric import Geometric
+
+Systemdata = Data()
+Systemdata.importFile(myPath + '/ds1.csv')
+df = Systemdata.getFullData()
+
+
+def test_parent_combinations():
+    combinations = [[], ['E'], ['F'], ['E', 'F'], ['E', 'F', 'C'], ['C']]
+    assert parentCombinations(['E', 'F'], combinations) == [['E'], ['F']]
+    assert parentCombinations(['E'], combinations) == [[]]
+    assert parentCombinations([], combinations) == []
+    # (E, C) and (F, C) not selected, next largest subset used
+    assert parentCombinations(['E', 'F', 'C'], combinations) == [['E', 'F']]
+    assert parentCombinations(['C', 'F'], [['F', 'C'], ['C']]) == [['C']]
+
+
+def test_nested_estimates_keep_likelihood():
+    parent = fitModel(DiscreteWeibull2, ['F', 'E'], df, "L-BFGS-B")
+    m = DiscreteWeibull2(data=df, metricNames=['E', 'C', 'F'])
+    initial = nestedEstimates(parent, m.metricNames)
+    assert initial[m.numParameters + 1] == 0.0
+    assert np.isclose(m.RLL(initial, m.covariateData), parent.llfVal)
+
+
+def test_best_parent():
+    fitted = [fitModel(Geometric, names, df, "L-BFGS-B") for names in [['E'], ['F'], ['C']]]
+    best = bestParent(fitted)
+    assert best.llfVal == max(m.llfVal for m in fitted)
+    for m in fitted:
+        m.converged = False
+    assert bestParent(fitted) is None
+
+
+@pytest.mark.parametrize("optimizer", ["reference", "L-BFGS-B"])
+def test_warm_start(optimizer):
+    parent = fitModel(DiscreteWeibull2, ['E', 'F'], df, optimizer)
+    cold = fitModel(DiscreteWeibull2, ['E', 'F', 'C'], df, optimizer)
+    warm = fitModel(DiscreteWeibull2, ['E', 'F', 'C'], df, optimizer,
+                    initial=nestedEstimates(parent, ['E', 'F', 'C']))
+    assert warm.warmStarted and not cold.warmStarted
+    assert warm.converged
+    assert warm.llfVal >= cold.llfVal - 1e-6
+
+
+@pytest.mark.parametrize("optimizer", ["reference", "L-BFGS-B"])
+def test_lattice_uses_fewer_evaluations(optimizer):
+    combinations = [[], ['E'], ['F'], ['C'], ['E', 'F'], ['E', 'C'], ['F', 'C'], ['E', 'F', 'C']]
+    coldEvaluations = 0
+    warmEvaluations = 0
+    for modelClass in [Geometric, DiscreteWeibull2]:
+        fitted = {}
+        for names in combinations:
+            parent = bestParent([fitted[tuple(p)] for p in parentCombinations(names, combinations)])
+            initial = None if parent is None else nestedEstimates(parent, names)
+            fitted[tuple(names)] = fitModel(modelClass, names, df, optimizer, initial=initial)
+            warmEvaluations += fitted[tuple(names)].evaluations
+            coldEvaluations += fitModel(modelClass, names, df, optimizer).evaluations
+        assert all(m.converged for m in fitted.values())
+    assert warmEvaluations < 0.9 * coldEvaluations
+
+
+def test_diverged_warm_start_falls_back():
+    m = fitModel(Geometric, ['E'], df, "L-BFGS-B", initial=np.array([np.nan, 0.0]))
+    assert m.converged
+    assert not m.warmStarted
+    assert m.llfVal == fitModel(Geometric, ['E'], df, "L-BFGS-B").llfVal
+
+
+def test_fallback_uses_remaining_budget():
+    initial = np.array([np.nan, 0.0])
+    warm = Geometric(data=df, metricNames=['E'], optimizer="L-BFGS-B")
+    warm.runEstimation(warm.covariateData, initial=initial)
+    budget = FitBudget(maxEvaluations=warm.evaluations + 3)
+    m = fitModel(Geometric, ['E'], df, "L-BFGS-B", budget=budget, initial=initial)
+    assert m.budgetExceeded and m.evaluations <= 3
+    assert m.budget is budget
@@ -1,18 +1,28 @@
 # For handling debug output
 import logging as log
 
-from scipy.optimize import shgo
 import numpy as np
 
+from core.lazyImport import LazyModule
+
+# only needed when an allocation is run, not to show restored results
+optimize = LazyModule("scipy.optimize")
+
 
 class EffortAllocation:
+    # attributes shown in tab 4 for each allocation type, enough to restore
+    # the results of an allocation without running it
+    resultFields = {1: ("B", "mvfVal", "H", "percentages"),
+                    2: ("f", "effort", "percentages2")}
+
     def __init__(self, model, covariate_data, allocation_type, *args):
         """
         *args will either be budget (if allocation 1) or failures (if allocation 2)
         """
         self.model = model
         self.covariate_data = covariate_data
-        self.hazard_array = np.concatenate((self.model.hazard_array, [self.model.hazardNumerical(self.model.n + 1, self.model.modelParameters)]))
+        self.allocationType = allocation_type
+        self.hazard_array = np.concatenate((self.model.hazard_array, self.model.hazardArray(np.array([self.model.n + 1]), self.model.modelParameters)))
 
         if allocation_type == 1:
             self.B = args[0]
@@ -37,7 +47,7 @@ class EffortAllocation:
         # restrict bounds to positive values
         bnds = tuple((0, None) for i in range(self.model.numCovariates))
 
-        self.res = shgo(self.allocationFunction, args=(self.covariate_data,), bounds=bnds, constraints=cons)#, n=10000, iters=4)
+        self.res = optimize.shgo(self.allocationFunction, args=(self.covariate_data,), bounds=bnds, constraints=cons)#, n=10000, iters=4)
         # the result from SHGO is negative since it is a minimization function
         # therefore, we negatate the value to find the maximum
         self.mvfVal = -self.res.fun
@@ -46,10 +56,11 @@ class EffortAllocation:
 
     def allocationFunction(self, x, covariate_data):
         new_cov_data = np.concatenate((covariate_data, x[:, None]), axis=1)
-        omega = self.model.calcOmega(self.hazard_array, self.model.betas, new_cov_data)
+        intermediates = self.model.fitIntermediates(self.hazard_array, self.model.betas, new_cov_data)
+        omega = self.model.calcOmega(self.hazard_array, self.model.betas, new_cov_data, intermediates)
 
         # must be negative, SHGO uses minimization and we want to maximize fault discovery
-        return -(self.model.MVF(self.model.mle_array, omega, self.hazard_array, new_cov_data.shape[1] - 1, new_cov_data))
+        return -(self.model.MVF_all(self.model.mle_array, omega, self.hazard_array, new_cov_data, intermediates)[-1])
 
     def runAllocation2(self):
         #####################################
@@ -60,7 +71,7 @@ class EffortAllocation:
         cons2 = ({'type': 'eq', 'fun': self.optimization2, 'args': (self.covariate_data,)})
         bnds = tuple((0, None) for i in range(self.model.numCovariates))
 
-        self.res2 = shgo(lambda x: sum([x[i] for i in range(self.model.numCovariates)]), bounds=bnds, constraints=cons2)
+        self.res2 = optimize.shgo(lambda x: sum([x[i] for i in range(self.model.numCovariates)]), bounds=bnds, constraints=cons2)
         self.effort = np.sum(self.res2.x)
 
     def optimization2(self, x, covariate_data):
@@ -70,10 +81,33 @@ class EffortAllocation:
 
     def allocationFunction2(self, x, covariate_data):
         new_cov_data = np.concatenate((covariate_data, x[:, None]), axis=1)
-        omega = self.model.calcOmega(self.hazard_array, self.model.betas, new_cov_data)
+        intermediates = self.model.fitIntermediates(self.hazard_array, self.model.betas, new_cov_data)
+        omega = self.model.calcOmega(self.hazard_array, self.model.betas, new_cov_data, intermediates)
 
         # we want to minimize, SHGO uses minimization
-        return self.model.MVF(self.model.mle_array, omega, self.hazard_array, new_cov_data.shape[1] - 1, new_cov_data)
+        return self.model.MVF_all(self.model.mle_array, omega, self.hazard_array, new_cov_data, intermediates)[-1]
+
+    def results(self):
+        """Returns dict of the allocation results, see resultFields."""
+        return {name: getattr(self, name) for name in self.resultFields[self.allocationType]}
+
+    @classmethod
+    def fromResults(cls, model, covariate_data, allocation_type, results):
+        """Creates an EffortAllocation from results(), without running it.
+
+        Args:
+            model: Model object the allocation was run on.
+            covariate_data: Covariate data of the model.
+            allocation_type: 1 (budget) or 2 (failures).
+            results: Dict returned by results().
+        """
+        allocation = cls.__new__(cls)
+        allocation.model = model
+        allocation.covariate_data = covariate_data
+        allocation.allocationType = allocation_type
+        for name, value in results.items():
+            setattr(allocation, name, value)
+        return allocation
 
     #### work in progress
     
@@ -0,0 +1,122 @@
+"""
+Limits on the work done by one model fit.
+
+A FitBudget is given to a Model when it is created. During runEstimation a
+FitMonitor checks the budget and the cancellation token, and keeps the best
+parameters seen so far. If the budget runs out the fit stops, the best
+parameters are used as the result and the model is flagged with
+budgetExceeded.
+"""
+
+import time
+
+import numpy as np
+
+
+class BudgetExceeded(Exception):
+    """Raised inside a fit when one of the limits of its budget is reached."""
+    pass
+
+
+class FitBudget:
+    """Maximum wall time, likelihood evaluations and root iterations of a fit.
+
+    A limit of None is not checked.
+
+    Attributes:
+        maxTime: Maximum wall time in seconds (float), including building the
+            symbolic gradient.
+        maxEvaluations: Maximum number of log-likelihood evaluations (int) of
+            the optimizer.
+        maxRootIterations: Maximum number of gradient evaluations (int) of the
+            root solver used by the reference optimizer, passed to it as
+            maxfev. Evaluations for its finite difference Jacobian are not
+            counted by the solver.
+    """
+
+    def __init__(self, maxTime=None, maxEvaluations=None, maxRootIterations=None):
+        """Initializes FitBudget class.
+
+        Args:
+            maxTime: Maximum wall time in seconds, or None.
+            maxEvaluations: Maximum log-likelihood evaluations, or None.
+            maxRootIterations: Maximum root solver iterations, or None.
+        """
+        self.maxTime = maxTime
+        self.maxEvaluations = maxEvaluations
+        self.maxRootIterations = maxRootIterations
+
+    def remaining(self, runtime, evaluations, rootIterations):
+        """Budget left after part of a fit, for a fit that continues it.
+
+        Args:
+            runtime: Wall time used so far, in seconds.
+            evaluations: Log-likelihood evaluations used so far.
+            rootIterations: Root solver iterations used so far.
+
+        Returns:
+            FitBudget with each limit reduced by the work used, not below 0.
+        """
+        def left(limit, used):
+            return None if limit is None else max(0, limit - used)
+
+        return FitBudget(left(self.maxTime, runtime), left(self.maxEvaluations, evaluations),
+                         left(self.maxRootIterations, rootIterations))
+
+    def __repr__(self):
+        return "FitBudget(maxTime={0}, maxEvaluations={1}, maxRootIterations={2})".format(
+            self.maxTime, self.maxEvaluations, self.maxRootIterations)
+
+
+class FitMonitor:
+    """Tracks one fit against its budget and cancellation token.
+
+    Has the same check() method as CancellationToken, so it can be passed
+    anywhere a token is checked.
+
+    Attributes:
+        budget: FitBudget of the fit, or None.
+        token: CancellationToken of the fit, or None.
+        evaluations: Number of log-likelihood evaluations so far.
+        bestValue: Lowest negative log-likelihood seen so far.
+        bestX: Parameters of bestValue, None if no finite value seen.
+    """
+
+    def __init__(self, budget=None, token=None):
+        """Initializes FitMonitor class, starts the wall time clock."""
+        self.budget = budget
+        self.token = token
+        self.evaluations = 0
+        self.bestValue = np.inf
+        self.bestX = None
+        self._deadline = None
+        if budget is not None and budget.maxTime is not None:
+            self._deadline = time.time() + budget.maxTime
+
+    @property
+    def maxRootIterations(self):
+        """Root iteration limit, None if not limited."""
+        return None if self.budget is None else self.budget.maxRootIterations
+
+    def check(self):
+        """Raises EstimationCancelled or BudgetExceeded if the fit must stop."""
+        if self.token is not None:
+            self.token.check()
+        if self._deadline is not None and time.time() > self._deadline:
+            raise BudgetExceeded()
+
+    def evaluated(self, x, value):
+        """Records one log-likelihood evaluation.
+
+        Args:
+            x: Parameters (unscaled) the objective was evaluated at.
+            value: Negative log-likelihood at x.
+        """
+        self.evaluations += 1
+        if value < self.bestValue:
+            self.bestValue = value
+            self.bestX = np.array(x, dtype=float)
+        if self.budget is not None and self.budget.maxEvaluations is not None \
+                and self.evaluations >= self.budget.maxEvaluations:
+            raise BudgetExceeded()
+        self.check()
@@ -0,0 +1,55 @@
+"""
+Cooperative cancellation of running model fits.
+
+A CancellationToken is passed to Model.runEstimation, which checks it from
+the optimizer callbacks and while building symbolic expressions. When the
+token is cancelled the fit raises EstimationCancelled. The token can wrap a
+multiprocessing event, so fits running in worker processes are cancelled by
+the same call.
+"""
+
+import threading
+
+
+class EstimationCancelled(Exception):
+    """Raised by a fit when its cancellation token has been cancelled."""
+    pass
+
+
+class CancellationToken:
+    """Flag shared by the UI and the fits it started.
+
+    Attributes:
+        event: threading.Event or multiprocessing event that is set when
+            cancelled.
+    """
+
+    def __init__(self, event=None):
+        """Initializes CancellationToken class.
+
+        Args:
+            event: Event used as the flag. A new threading.Event is created
+                if not given. A multiprocessing event must be used for fits
+                running in other processes.
+        """
+        if event is None:
+            event = threading.Event()
+        self.event = event
+
+    @property
+    def cancelled(self):
+        """True if cancel() has been called."""
+        return self.event.is_set()
+
+    def cancel(self):
+        """Requests all fits using this token to stop."""
+        self.event.set()
+
+    def reset(self):
+        """Clears the flag so the token can be used for another run."""
+        self.event.clear()
+
+    def check(self):
+        """Raises EstimationCancelled if the token has been cancelled."""
+        if self.event.is_set():
+            raise EstimationCancelled()
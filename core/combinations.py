@@ -0,0 +1,107 @@
+"""
+Lazy source of covariate metric combinations.
+
+There are 2**k combinations of k covariates, too many to build as a list
+of names once k is large. A CombinationSource generates the combinations
+when iterated, in order of increasing size, and can be limited by size,
+filtered by text and read one page at a time. The estimation accepts a
+source in place of a list of combinations.
+"""
+
+import math
+from itertools import combinations, islice
+
+
+def combinationName(combination):
+    """Display name of a combination, "None" if it has no covariates."""
+    return ", ".join(combination) if combination else "None"
+
+
+def numCombinations(n, r):
+    """Number of combinations of r items out of n."""
+    if r < 0 or r > n:
+        return 0
+    return math.factorial(n) // (math.factorial(r) * math.factorial(n - r))
+
+
+class CombinationSource:
+    """Combinations of covariate names, generated when iterated.
+
+    Iterating yields each combination as a list of names, the empty list
+    for the combination without covariates.
+
+    Attributes:
+        metricNames: List of covariate names.
+        minSize: Minimum number of covariates of a combination (int).
+        maxSize: Maximum number of covariates of a combination (int).
+        text: Filter text. A combination matches if each word of the text
+            is contained in its name, ignoring case.
+        excluded: Set of combinations (tuples) not generated.
+    """
+
+    def __init__(self, metricNames, minSize=0, maxSize=None, text="", excluded=()):
+        """Initializes CombinationSource class.
+
+        Args:
+            metricNames: List of covariate names.
+            minSize: Minimum number of covariates of a combination.
+            maxSize: Maximum number of covariates, None for no limit.
+            text: Filter text, empty for no filter.
+            excluded: Combinations (lists or tuples) not generated.
+        """
+        self.metricNames = list(metricNames)
+        self.minSize = max(0, minSize)
+        self.maxSize = len(self.metricNames) if maxSize is None else min(maxSize, len(self.metricNames))
+        self.text = text
+        self.excluded = set(tuple(c) for c in excluded)
+        self._words = [word.lower() for word in text.replace(",", " ").split()]
+
+    def __iter__(self):
+        for r in range(self.minSize, self.maxSize + 1):
+            for combination in combinations(self.metricNames, r):
+                if self._matches(combination) and combination not in self.excluded:
+                    yield list(combination)
+
+    def __len__(self):
+        """Number of combinations, counted without generating them if not filtered."""
+        if self._words:
+            return sum(1 for combination in self)
+        total = sum(numCombinations(len(self.metricNames), r) for r in range(self.minSize, self.maxSize + 1))
+        return total - sum(1 for c in self.excluded if self._inRange(c))
+
+    def __contains__(self, combination):
+        combination = tuple(combination)
+        ordered = tuple(name for name in self.metricNames if name in combination)
+        return (combination == ordered and self._inRange(combination)
+                and self._matches(combination) and combination not in self.excluded)
+
+    def __repr__(self):
+        return "CombinationSource({0} metrics, {1} to {2} covariates, filter '{3}', {4} excluded)".format(
+            len(self.metricNames), self.minSize, self.maxSize, self.text, len(self.excluded))
+
+    def page(self, index, size):
+        """Returns list of the combinations on a page.
+
+        Args:
+            index: Page number (int), starting at 0.
+            size: Number of combinations per page (int).
+        """
+        return list(islice(iter(self), index * size, (index + 1) * size))
+
+    def filtered(self, minSize=0, maxSize=None, text=""):
+        """Returns a source of the same covariates, with other filters."""
+        return CombinationSource(self.metricNames, minSize, maxSize, text, self.excluded)
+
+    def excluding(self, excluded):
+        """Returns a source without the excluded combinations."""
+        return CombinationSource(self.metricNames, self.minSize, self.maxSize, self.text,
+                                 self.excluded | set(tuple(c) for c in excluded))
+
+    def _inRange(self, combination):
+        return self.minSize <= len(combination) <= self.maxSize
+
+    def _matches(self, combination):
+        if not self._words:
+            return True
+        name = combinationName(combination).lower()
+        return all(word in name for word in self._words)
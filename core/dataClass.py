@@ -10,6 +10,9 @@ from itertools import combinations, chain
 
 from PyQt5 import QtCore
 
+from core.combinations import CombinationSource
+from core.dataSnapshot import DataSnapshot
+
 
 class Data:
     def __init__(self):
@@ -31,7 +34,7 @@ class Data:
         self._n = 0
         self.containsHeader = True
         self.metricNames = []
-        self.metricNameCombinations = []
+        self.metricNameCombinations = CombinationSource([])
         self.metricNameDictionary = {}
         self._max_interval = 0
         self.setupMetricNameDictionary()
@@ -101,6 +104,13 @@ class Data:
     def getFullData(self):
         return self.dataSet[self.sheetNames[self._currentSheet]]
 
+    def getSnapshot(self):
+        """
+        Returns DataSnapshot of the data returned by getData(), read-only
+        arrays shared by the fits of an estimation run in this process
+        """
+        return DataSnapshot(self.getData())
+
     def getDataModel(self):
         """
         Returns PandasModel for the current dataFrame to be displayed
@@ -284,11 +294,11 @@ class Data:
         self.metricNames = names_list
 
     def getMetricNameCombinations(self):
-        self.metricNameCombinations = []
-        comb = self.powerset(self.metricNames)
-        for c in comb:
-            self.metricNameCombinations.append(", ".join(c))
-        self.metricNameCombinations[0] = "None"
+        """
+        Sets source of all combinations of metric names, generated when
+        iterated instead of stored
+        """
+        self.metricNameCombinations = CombinationSource(self.metricNames)
 
     def powerset(self, iterable):
         """ powerset([1,2,3]) --> () (1,) (2,) (3,) (1,2) (1,3) (2,3) (1,2,3) """
@@ -0,0 +1,127 @@
+"""
+Read-only arrays of the data fit by an estimation run.
+
+Every Model used to take its columns from a pandas dataframe, and build its
+own copy of the covariate data. A DataSnapshot converts the dataframe once
+per run: T, FC and CFC arrays and one float64 matrix of all covariates, a
+row per metric. Models of the run take their arrays from the snapshot;
+the covariate data of a combination is a view of the matrix rows when the
+metrics are adjacent, so most combinations don't copy any data.
+
+The arrays are not writeable and the snapshot can't be changed once
+created, so one snapshot is shared by the fits and results of all threads
+of the UI process. Worker processes don't share it: the snapshot is
+pickled with its arrays for each job sent to the pool, and each job
+unpickles its own read-only copy.
+"""
+
+import numpy as np
+
+
+def asSnapshot(data, metricNames=None):
+    """Returns data as a DataSnapshot.
+
+    Args:
+        data: DataSnapshot, returned unchanged, or pandas dataframe.
+        metricNames: Covariate columns included if data is a dataframe,
+            all columns other than T, FC and CFC if None.
+    """
+    if isinstance(data, DataSnapshot):
+        return data
+    return DataSnapshot(data, metricNames)
+
+
+class DataSnapshot:
+    """Read-only data of one sheet, up to the last interval fit.
+
+    Attributes:
+        t: Numpy array of failure times (T).
+        failures: Numpy array of failure counts (FC) at each time.
+        cumulativeFailures: Numpy array of cumulative failure counts (CFC).
+        covariates: Numpy float64 array with shape (number of metrics, n),
+            one row of covariate data per metric.
+        metricNames: Tuple of metric names, in the order of the covariate
+            rows.
+        n: Number of intervals (int).
+    """
+
+    __slots__ = ("t", "failures", "cumulativeFailures", "covariates", "metricNames", "_rows")
+
+    # columns that are not covariates, see Data.STATIC_NAMES
+    staticNames = ("T", "FC", "CFC")
+
+    def __init__(self, data, metricNames=None):
+        """Initializes DataSnapshot class, the columns of data are copied.
+
+        Args:
+            data: Pandas dataframe with T, FC, CFC and covariate columns.
+            metricNames: Covariate columns included, all columns other
+                than T, FC and CFC if None.
+        """
+        if metricNames is None:
+            metricNames = [name for name in data.columns if name not in self.staticNames]
+        covariates = np.empty((len(metricNames), len(data)))
+        for i, name in enumerate(metricNames):
+            covariates[i] = data[name].values
+        self._set(np.array(data["T"].values), np.array(data["FC"].values), np.array(data["CFC"].values),
+                  covariates, metricNames)
+
+    def _set(self, t, failures, cumulativeFailures, covariates, metricNames):
+        """Sets the attributes once, the arrays are made read-only."""
+        for array in (t, failures, cumulativeFailures, covariates):
+            array.setflags(write=False)
+        object.__setattr__(self, "t", t)
+        object.__setattr__(self, "failures", failures)
+        object.__setattr__(self, "cumulativeFailures", cumulativeFailures)
+        object.__setattr__(self, "covariates", covariates)
+        object.__setattr__(self, "metricNames", tuple(metricNames))
+        object.__setattr__(self, "_rows", {name: i for i, name in enumerate(metricNames)})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DataSnapshot can't be changed, create a new snapshot.")
+
+    def __reduce__(self):
+        # the arrays are read-only again after unpickling
+        return (_restore, (self.t, self.failures, self.cumulativeFailures, self.covariates, self.metricNames))
+
+    def __len__(self):
+        return len(self.t)
+
+    @property
+    def n(self):
+        return len(self.t)
+
+    def covariateData(self, metricNames):
+        """Covariate data of a combination, one row per metric.
+
+        Args:
+            metricNames: List of metric names of the combination.
+
+        Returns:
+            Numpy array with shape (len(metricNames), n). A view of the
+            covariate matrix if the metrics are adjacent rows in the same
+            order, otherwise a copy of the rows. Empty array with no metrics.
+        """
+        if not metricNames:
+            return np.array([])
+        rows = [self._rows[name] for name in metricNames]
+        first = rows[0]
+        if rows == list(range(first, first + len(rows))):
+            return self.covariates[first:first + len(rows)]
+        selected = self.covariates[rows]
+        selected.setflags(write=False)
+        return selected
+
+    def subset(self, n):
+        """Snapshot of the first n intervals, its arrays are views of these."""
+        snapshot = object.__new__(DataSnapshot)
+        snapshot._set(self.t[:n], self.failures[:n], self.cumulativeFailures[:n], self.covariates[:, :n],
+                      self.metricNames)
+        return snapshot
+
+
+def _restore(t, failures, cumulativeFailures, covariates, metricNames):
+    """Recreates a pickled DataSnapshot."""
+    snapshot = object.__new__(DataSnapshot)
+    snapshot._set(t, failures, cumulativeFailures, covariates, metricNames)
+    return snapshot
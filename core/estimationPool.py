@@ -0,0 +1,333 @@
+"""
+Runs model estimation in worker processes.
+
+Model fitting is pure Python and NumPy, so threads only use one core. Each
+job sent to a worker holds a model class, a metric combination and the data
+of the current sheet, all of which can be pickled. The worker fits the model
+and the fitted Model object is sent back to the parent process. PSSE refits
+run in the same pool, only the PSSE value is sent back.
+
+Each run of the pool (estimation, PSSE or rolling origin) is a PoolRun,
+with its own cancellation token passed with the jobs it submits. Cancelling
+it only stops the fits of that run. Runs of different threads share the
+pool: it is only replaced or stopped when no run is using it. The tokens
+are flags in an array of shared memory given to the workers when they
+start; a multiprocessing event can't be sent to a worker that is already
+running.
+"""
+
+# For handling debug output
+import logging as log
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from core.cancellation import CancellationToken
+from core.dataSnapshot import asSnapshot
+from core.prediction import prediction_psse
+from core.goodnessOfFit import PSSE
+
+# pool kept between estimation runs, so worker start up (importing numpy,
+# scipy, symengine) and the compiled kernels of each worker are reused
+_pool = None
+
+# pools that are running, including pools replaced while runs still use them
+_pools = []
+
+# guards the pools and their runs, changed by the estimation, PSSE and
+# rolling origin threads
+_poolLock = threading.Lock()
+
+# number of run flags of a pool, the most runs that can use it at once
+RUN_SLOTS = 64
+
+# in worker processes, run flags of the pool
+_runFlags = None
+
+
+def defaultWorkerCount():
+    """Number of worker processes used if not specified, one per CPU."""
+    return os.cpu_count() or 1
+
+
+class RunFlag:
+    """Cancellation flag of one run, used as the event of its token.
+
+    The flag is a slot of the shared array of the pool. It is pickled as the
+    slot number only, and uses the array of the worker it is sent to.
+
+    Attributes:
+        flags: multiprocessing array of the flags of the pool.
+        slot: Index of the flag in flags (int).
+    """
+
+    def __init__(self, flags, slot):
+        """Initializes RunFlag class."""
+        self.flags = flags
+        self.slot = slot
+
+    def is_set(self):
+        return bool(self.flags[self.slot])
+
+    def set(self):
+        self.flags[self.slot] = 1
+
+    def clear(self):
+        self.flags[self.slot] = 0
+
+    def __reduce__(self):
+        return (_workerFlag, (self.slot,))
+
+
+def _workerFlag(slot):
+    """Flag of a run, in the worker process it is sent to."""
+    return RunFlag(_runFlags, slot)
+
+
+def _initWorker(flags):
+    """Run by each worker process when it starts, stores the run flags."""
+    global _runFlags
+    _runFlags = flags
+
+
+def createPool(workers):
+    """Creates a process pool for estimation jobs.
+
+    Workers are started with the "spawn" method on every platform, since
+    forking a process that is running the Qt event loop is not safe.
+
+    Args:
+        workers: Number of worker processes (int).
+
+    Returns:
+        A concurrent.futures.ProcessPoolExecutor, and the array of run flags
+        shared with its workers.
+    """
+    log.info("Starting estimation pool with %d worker processes.", workers)
+    context = multiprocessing.get_context("spawn")
+    flags = context.RawArray("b", RUN_SLOTS)
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                               initializer=_initWorker, initargs=(flags,))
+    return pool, flags
+
+
+class SharedPool:
+    """Process pool kept between runs, with the run flags of its workers.
+
+    Attributes:
+        executor: concurrent.futures.ProcessPoolExecutor.
+        flags: multiprocessing array of the run flags, shared with the
+            workers.
+        workers: Number of worker processes (int).
+        runs: Number of runs using the pool (int).
+        freeSlots: List of the slots of flags not used by a run.
+        broken: True if a worker process stopped unexpectedly. New runs
+            start a new pool.
+    """
+
+    def __init__(self, workers):
+        """Initializes SharedPool class, starts the worker processes.
+
+        Args:
+            workers: Number of worker processes (int).
+        """
+        self.executor, self.flags = createPool(workers)
+        self.workers = workers
+        self.runs = 0
+        self.freeSlots = list(range(RUN_SLOTS))
+        self.broken = False
+
+    def stop(self):
+        """Stops the worker processes, jobs that have not started are cancelled."""
+        for slot in range(RUN_SLOTS):
+            self.flags[slot] = 1    # stop fits that are already running
+        try:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            # cancel_futures added in Python 3.9
+            self.executor.shutdown(wait=False)
+
+
+class PoolRun:
+    """One run of jobs in the shared process pool, used as a context manager.
+
+    Entering the run starts the pool, or a new pool if the number of workers
+    changed or the pool is broken, and gives the run its own cancellation
+    token to pass with its jobs. A pool that is replaced is only stopped
+    once the last run using it ends, so a run never stops the fits of
+    runs on other threads.
+
+        with PoolRun(workers) as run:
+            future = run.pool.submit(fitModel, ..., run.token, ...)
+
+    Attributes:
+        workers: Number of worker processes (int).
+        pool: concurrent.futures.ProcessPoolExecutor the jobs are submitted
+            to, set when the run is entered.
+        token: CancellationToken of the jobs of the run, set when the run
+            is entered. Cancelling it only stops the fits of this run.
+    """
+
+    def __init__(self, workers):
+        """Initializes PoolRun class.
+
+        Args:
+            workers: Number of worker processes (int).
+        """
+        self.workers = workers
+        self.pool = None
+        self.token = None
+        self._shared = None
+        self._slot = None
+
+    def __enter__(self):
+        global _pool
+        with _poolLock:
+            if _pool is None or _pool.workers != self.workers or _pool.broken:
+                previous = _pool
+                _pool = SharedPool(self.workers)
+                _pools.append(_pool)
+                if previous is not None:
+                    _release(previous)
+            self._shared = _pool
+            self._shared.runs += 1
+            self._slot = self._shared.freeSlots.pop()
+            flag = RunFlag(self._shared.flags, self._slot)
+            flag.clear()
+        self.pool = self._shared.executor
+        self.token = CancellationToken(flag)
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        """Ends the run, a BrokenProcessPool error marks the pool broken.
+
+        The flag of the run is set, so fits it leaves running stop. If the
+        run ends with an error its flag is not used again, since jobs of the
+        run may still be queued.
+        """
+        self.token.cancel()
+        with _poolLock:
+            self._shared.runs -= 1
+            if excType is None:
+                self._shared.freeSlots.append(self._slot)
+            elif issubclass(excType, BrokenProcessPool):
+                self._shared.broken = True
+            _release(self._shared)
+        return False
+
+
+def _release(shared):
+    """Stops a pool no run uses, if it is replaced or broken; _poolLock held."""
+    global _pool
+    if shared.runs > 0 or (shared is _pool and not shared.broken):
+        return
+    if shared is _pool:
+        _pool = None
+    _pools.remove(shared)
+    shared.stop()
+
+
+def shutdownPool():
+    """Stops every pool, including the fits of runs that are using them.
+
+    Called when the app closes.
+    """
+    global _pool
+    with _poolLock:
+        for shared in _pools:
+            shared.stop()
+        _pools.clear()
+        _pool = None
+
+
+def fitModel(modelClass, metricCombination, data, optimizer="reference", token=None, budget=None, initial=None):
+    """Fits one model/metric combination, run by worker processes.
+
+    Args:
+        modelClass: Model class (not instance) to fit.
+        metricCombination: List of metric names (strings) used as covariates.
+        data: DataSnapshot (or pandas dataframe) of the data to fit. Jobs
+            sent to the pool each carry a pickled copy.
+        optimizer: Name of the optimization method, one of Model.optimizers.
+        token: CancellationToken for the fit, the token of the PoolRun for
+            jobs of the shared pool, or None.
+        budget: FitBudget limiting the fit, or None.
+        initial: Initial estimates of a warm start, or None. If the fit from
+            them doesn't converge, the model is fit again from its default
+            initial estimates, with the part of the budget that is left.
+
+    Returns:
+        Model object with estimation results as properties.
+
+    Raises:
+        EstimationCancelled: If the token is cancelled before the fit ends.
+    """
+    m = modelClass(data=data, metricNames=metricCombination, optimizer=optimizer, budget=budget)
+    m.runEstimation(m.covariateData, token, initial)
+    if initial is not None and not m.converged and not m.budgetExceeded:
+        log.info("Warm start of %s (%s) diverged, using default initial estimates.", m.shortName, m.metricString)
+        warm = m
+        if budget is not None:
+            budget = budget.remaining(warm.runtime, warm.evaluations, warm.gradientEvaluations)
+        m = modelClass(data=data, metricNames=metricCombination, optimizer=optimizer, budget=budget)
+        m.runEstimation(m.covariateData, token)
+        m.budget = warm.budget      # the budget of the whole fit, used by the result cache key
+        m.runtime += warm.runtime
+    return m
+
+
+def failedModel(modelClass, metricCombination, data, optimizer="reference", budget=None):
+    """Not converged model of a combination whose fit raised an error.
+
+    The estimates and fitted values are NaN. Used so a combination is still
+    listed in the results, and the rest of the run continues.
+
+    Args:
+        modelClass: Model class (not instance) of the fit.
+        metricCombination: List of metric names (strings) used as covariates.
+        data: DataSnapshot of the data of the fit.
+        optimizer: Name of the optimization method of the fit.
+        budget: FitBudget of the fit, or None.
+
+    Returns:
+        Model object with results set, not fitted.
+    """
+    m = modelClass(data=data, metricNames=metricCombination, optimizer=optimizer, budget=budget)
+    intervals = np.full(m.n, np.nan)
+    m.restoreResults({"mle_array": np.full(m.numSymbols, np.nan), "converged": False, "runtime": 0,
+                      "iterations": 0, "evaluations": 0, "gradientEvaluations": 0, "budgetExceeded": False,
+                      "warmStarted": False, "omega": np.nan, "hazard_array": intervals,
+                      "mvf_array": intervals, "intensityList": intervals, "llfVal": np.nan,
+                      "aicVal": np.nan, "bicVal": np.nan, "sseVal": np.nan})
+    return m
+
+
+def fitPSSE(modelClass, metricCombination, subset, fullData, optimizer="reference", token=None, budget=None,
+            initial=None):
+    """Fits a combination to the first intervals of the data, returns its PSSE.
+
+    Args:
+        modelClass: Model class (not instance) to fit.
+        metricCombination: List of metric names (strings) used as covariates.
+        subset: DataSnapshot (or pandas dataframe) of the first intervals,
+            the model is fit to.
+        fullData: DataSnapshot (or pandas dataframe) of all intervals, the
+            predictions of the fitted model are compared to.
+        optimizer: Name of the optimization method, one of Model.optimizers.
+        token: CancellationToken for the fit, see fitModel.
+        budget: FitBudget limiting the fit, or None.
+        initial: Initial estimates, usually the MLEs of the fit to all
+            intervals, or None.
+
+    Returns:
+        Predictive sum of squares error (float).
+    """
+    m = fitModel(modelClass, metricCombination, subset, optimizer, token, budget, initial)
+    fullData = asSnapshot(fullData, metricCombination)
+    fitted_array = prediction_psse(m, fullData)
+    return PSSE(fitted_array, fullData.cumulativeFailures, m.n)
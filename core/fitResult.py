@@ -0,0 +1,146 @@
+"""
+Compact records of fitted models, kept for the results shown in tabs 2 to 4.
+
+A fitted Model object holds the dataframe it was fit to, its own copy of
+the covariate data and the state used during estimation. Thousands of them
+use a lot of memory, so the estimation results of a run are kept as
+FitResult records instead. A record holds the parameters, the fitted
+arrays (contiguous float64) and the goodness-of-fit values. The data is
+referenced: the DataSnapshot of the run, shared by all of its records.
+
+Records have the methods of their model class used by prediction and
+effort allocation (hazardArray, fitIntermediates, calcOmega, MVF_all,
+intensityFit), so both work from a record the same way as from a Model.
+"""
+
+import numpy as np
+
+from core.model import Model
+
+
+class FitResult:
+    """Estimation results of one model/metric combination.
+
+    Attributes:
+        modelClass: Model subclass that was fit.
+        metricNames: List of covariate metric names as strings.
+        metricString: Metric names separated by commas, "None" if there are
+            no covariates.
+        combinationName: Name of the model/metric combination.
+        optimizer: Name of the optimization method of the fit.
+        engine: Name of the log-likelihood implementation of the fit.
+        n: Number of intervals fit (int).
+        numParameters: Number of hazard function parameters (int).
+        numCovariates: Number of covariates (int).
+        totalFailures: Number of failures in the intervals fit.
+        data: DataSnapshot of the data fit, shared with the other records
+            of a run.
+        mle_array, omega, hazard_array, mvf_array, intensityList, llfVal,
+            aicVal, bicVal, sseVal, converged, runtime, iterations,
+            evaluations, gradientEvaluations, budgetExceeded, warmStarted:
+            Results of the fit, see Model.
+        cached: Boolean indicating if the results were rebuilt from the
+            result cache instead of fitted.
+    """
+
+    __slots__ = ("modelClass", "metricNames", "metricString", "combinationName", "optimizer", "engine", "n",
+                 "numParameters", "numCovariates", "totalFailures", "data", "cached") + Model.resultFields
+
+    # fitted arrays, stored as contiguous float64
+    arrayFields = ("mle_array", "hazard_array", "mvf_array", "intensityList")
+
+    def __init__(self, modelClass, metricNames, data, optimizer="reference", engine="vectorized"):
+        """Initializes FitResult class, results are set by restoreResults.
+
+        Args:
+            modelClass: Model subclass that was fit.
+            metricNames: List of covariate metric names.
+            data: DataSnapshot of the data fit, including the metrics.
+            optimizer: Name of the optimization method of the fit.
+            engine: Name of the log-likelihood implementation of the fit.
+        """
+        self.modelClass = modelClass
+        self.metricNames = list(metricNames)
+        self.metricString = ", ".join(self.metricNames) if self.metricNames else "None"
+        self.combinationName = "{0} ({1})".format(modelClass.shortName, self.metricString)
+        self.optimizer = optimizer
+        self.engine = engine
+        self.data = data
+        self.n = data.n
+        self.numParameters = len(modelClass.parameterEstimates)
+        self.numCovariates = len(self.metricNames)
+        self.totalFailures = data.cumulativeFailures[-1]
+        self.cached = False
+
+    @classmethod
+    def fromModel(cls, model, data=None):
+        """Creates the record of a fitted Model.
+
+        Args:
+            model: Model object, after runEstimation or restoreResults.
+            data: DataSnapshot the model was fit to, shared with other
+                records. The snapshot of the model is used if None; models
+                fit in worker processes have their own copy.
+        """
+        record = cls(type(model), model.metricNames, model.data if data is None else data, model.optimizer,
+                     model.engine)
+        record.restoreResults(model.results())
+        record.cached = model.cached
+        return record
+
+    def restoreResults(self, results):
+        """Sets estimation results returned by Model.results() or results()."""
+        for name, value in results.items():
+            if name in self.arrayFields:
+                value = np.ascontiguousarray(value, dtype=np.float64)
+            setattr(self, name, value)
+
+    def results(self):
+        """Returns dict of the estimation results, the same as Model.results()."""
+        return {name: getattr(self, name) for name in Model.resultFields}
+
+    @property
+    def name(self):
+        return self.modelClass.name
+
+    @property
+    def shortName(self):
+        return self.modelClass.shortName
+
+    @property
+    def modelParameters(self):
+        return self.mle_array[:self.numParameters]
+
+    @property
+    def betas(self):
+        return self.mle_array[self.numParameters:]
+
+    @property
+    def t(self):
+        return self.data.t
+
+    @property
+    def failures(self):
+        return self.data.failures
+
+    @property
+    def cumulativeFailures(self):
+        return self.data.cumulativeFailures
+
+    @property
+    def covariateData(self):
+        """Covariate data of the combination, from the shared snapshot."""
+        return self.data.covariateData(self.metricNames)
+
+    def hazardArray(self, i_array, args):
+        return self.modelClass.hazardArray(self, i_array, args)
+
+    def hazardNumerical(self, i, args):
+        return self.modelClass.hazardNumerical(self, i, args)
+
+    # calculations of Model that only use the attributes of the record
+    covariateMatrix = Model.covariateMatrix
+    fitIntermediates = Model.fitIntermediates
+    calcOmega = Model.calcOmega
+    MVF_all = Model.MVF_all
+    intensityFit = Model.intensityFit
@@ -140,10 +140,16 @@ class PlotWidget(pg.PlotWidget):
 
     def createLines(self, results):
         """
-        called when estimation is complete
         creates line objects for all models, for mvf and intensity plots
         """
+        self.clearLines()
+        for key, model in results.items():
+            self.addLine(key, model)
 
+    def clearLines(self):
+        """
+        called when estimation starts, removes lines of previous results
+        """
         self.plotColor.index = 0
 
         # clear plots (by removing fitted lines)
@@ -156,37 +162,49 @@ class PlotWidget(pg.PlotWidget):
         self.intensityLines.clear()
         self.currentLines.clear()
 
-        for key, model in results.items():
-            color = self.plotColor.nextColor()
-            pen = pg.mkPen(color, width=3)
-            symbolBrush = pg.mkBrush(color)
-            self.mvfLines[key] = pg.PlotDataItem(model.t, model.mvf_array, pen=pen)
-            self.mvfLines[key].setSymbolPen(pen)
-            self.mvfLines[key].setSymbolBrush(symbolBrush)
-            self.mvfLines[key].setSymbol('o')
-
-            self.intensityLines[key] = pg.PlotDataItem(model.t, model.intensityList, pen=pen)
-            self.intensityLines[key].setSymbolPen(pen)
-            self.intensityLines[key].setSymbolBrush(symbolBrush)
-            self.intensityLines[key].setSymbol('o')
+    def addLine(self, key, model):
+        """
+        called when the estimation of a model is complete
+        creates mvf and intensity line objects for the model, using the
+        current line and plot style
+        """
+        color = self.plotColor.nextColor()
+        pen = pg.mkPen(color, width=3)
+        symbolBrush = pg.mkBrush(color)
+        self.mvfLines[key] = pg.PlotDataItem(model.t, model.mvf_array, pen=pen)
+        self.intensityLines[key] = pg.PlotDataItem(model.t, model.intensityList, pen=pen)
+
+        for line in (self.mvfLines[key], self.intensityLines[key]):
+            line.setSymbolPen(pen)
+            line.setSymbolBrush(symbolBrush)
+            line.setSymbol('o')
 
             # check for line style
             if self.lineStyle == "points":
-                self.setPointsView()
-
+                line.setSymbolSize(4)
+                line.setPen((0, 0, 0, 0))    # transparent (4th value)
             elif self.lineStyle == "line":
-                self.setLineView()
-
+                line.setSymbolSize(0)
             elif self.lineStyle == "both":
-                self.setLineAndPointsView()
+                line.setSymbolSize(4)
 
             # check for plot style
-            if self.plotStyle == "smooth":
-                self.setSmoothPlot()
-            elif self.plotStyle == "step":
-                self.setStepPlot()
+            if self.plotStyle == "step":
+                line.opts['stepMode'] = 'right'
+                line.updateItems()
 
 
+    def removeLine(self, key):
+        """
+        called when the result of a model is removed, without clearing the
+        lines of other results
+        """
+        if key in self.currentLines:
+            self.removeLines([key])
+            self.currentLines.remove(key)
+        self.mvfLines.pop(key, None)
+        self.intensityLines.pop(key, None)
+
     def updateLines(self, newLines):
         # more lines than currently shown means we need to add lines
         if len(newLines) > len(self.currentLines):
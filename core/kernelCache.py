@@ -0,0 +1,244 @@
+"""
+Cache for compiled gradient kernels used during model estimation.
+
+Building and differentiating the symbolic log-likelihood (Model.LLF_sym) is
+the most expensive part of a fit that uses the symbolic gradient. Kernels are
+stored in two tiers: compiled lambda functions are kept in memory with least
+recently used eviction, and the differentiated expressions are pickled to a
+user cache directory so they survive between sessions. A disk hit only needs
+to compile the stored expressions, no symbolic differentiation is performed.
+"""
+
+# For handling debug output
+import logging as log
+
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+from core.lazyImport import LazyModule
+
+# imported when a kernel is first compiled
+symengine = LazyModule("symengine")
+
+
+def userCacheDirectory():
+    """Returns the platform specific directory used for C-SFRAT cache files.
+
+    The location can be overridden with the CSFRAT_CACHE_DIR environment
+    variable.
+    """
+    override = os.environ.get("CSFRAT_CACHE_DIR")
+    if override:
+        return override
+
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        return os.path.join(base, "C-SFRAT", "Cache")
+    elif sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~"), "Library", "Caches", "C-SFRAT")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+        return os.path.join(base, "c-sfrat")
+
+
+_codeVersions = {}
+
+
+def codeVersion(modelClass):
+    """Hash (string) of the source of a model class module and core.model.
+
+    Kernels and results built by older code are not used once either changes.
+    """
+    import core.model   # imported here, core.model imports this module
+    if modelClass not in _codeVersions:
+        digest = hashlib.sha1()
+        for path in [inspect.getsourcefile(core.model.Model), inspect.getsourcefile(modelClass)]:
+            try:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            except (OSError, TypeError):
+                digest.update(str(path).encode())
+        _codeVersions[modelClass] = digest.hexdigest()[:16]
+    return _codeVersions[modelClass]
+
+
+def datasetFingerprint(failures, covariate_data):
+    """Hash (string) of the failure counts and covariate data of a fit."""
+    digest = hashlib.sha1()
+    digest.update(np.ascontiguousarray(failures, dtype=np.int64).tobytes())
+    digest.update(np.ascontiguousarray(covariate_data, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+class KernelCache:
+    """Two tier (memory and disk) cache of compiled gradient functions.
+
+    Attributes:
+        directory: Path (string) of the directory containing cached kernels.
+        maxMemoryEntries: Number of compiled kernels kept in memory (int).
+        maxDiskBytes: Total size of cached kernel files allowed on disk (int).
+            Least recently used files are removed when exceeded.
+        hits: Number of lookups that found a kernel, in memory or on disk.
+        misses: Number of lookups that required the kernel to be built.
+    """
+
+    extension = ".kernel"
+
+    def __init__(self, directory=None, maxMemoryEntries=64, maxDiskBytes=256 * 1024**2):
+        """Initializes KernelCache class.
+
+        Args:
+            directory: Cache directory, defaults to a "kernels" folder inside
+                userCacheDirectory().
+            maxMemoryEntries: Number of compiled kernels kept in memory.
+            maxDiskBytes: Size limit (bytes) for kernels stored on disk.
+        """
+        if directory is None:
+            directory = os.path.join(userCacheDirectory(), "kernels")
+        self.directory = directory
+        self.maxMemoryEntries = maxMemoryEntries
+        self.maxDiskBytes = maxDiskBytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+
+    def key(self, model, covariate_data, fingerprint=True):
+        """Creates cache key for a model/metric combination.
+
+        Args:
+            model: Model object the kernel is built for.
+            covariate_data: Covariate data used in the fit.
+            fingerprint: If True, the key includes a hash of the failure and
+                covariate data, for kernels with the data built in. If False,
+                the key is shared by all data with the same shape.
+
+        Returns:
+            Key as a string, safe to use as a file name.
+        """
+        # kernels of older versions of the likelihood or hazard, or pickled
+        # by another symengine version, are not used
+        key = "{0}-{1}cov-{2}n-{3}-symengine{4}".format(type(model).__name__, model.numCovariates, model.n,
+                                                        codeVersion(type(model)), symengine.__version__)
+        if fingerprint:
+            key += "-" + datasetFingerprint(model.failures, covariate_data)
+        else:
+            key += "-data"
+        return key
+
+    def get(self, key):
+        """Returns compiled kernel stored under key, or None if not cached."""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                symbols, expressions = pickle.load(f)
+            kernel = symengine.lambdify(symbols, expressions, backend='lambda')
+            os.utime(path)  # mark as recently used for eviction
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as error:
+            # corrupt file, or pickled by code that no longer matches
+            # (AttributeError, ImportError after an upgrade)
+            log.warning("Could not read cached kernel %s, it will be rebuilt: %s", path, error)
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._storeMemory(key, kernel)
+        return kernel
+
+    def put(self, key, symbols, expressions, kernel):
+        """Stores a kernel in memory and its expressions on disk.
+
+        Args:
+            key: Cache key returned by the key() method.
+            symbols: Symbols the expressions are functions of.
+            expressions: Differentiated expressions that were compiled.
+            kernel: The compiled function.
+        """
+        self._storeMemory(key, kernel)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                pickle.dump((list(symbols), list(expressions)), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)     # other processes never see partial files
+            self._evictDisk()
+        except (OSError, pickle.PicklingError, RuntimeError, TypeError) as error:
+            # disk tier is optional, memory tier still works
+            log.warning("Could not write kernel to cache: %s", error)
+
+    def info(self):
+        """Returns a dict describing the contents of the cache."""
+        files = self._diskEntries()
+        return {"directory": self.directory,
+                "memoryEntries": len(self._memory),
+                "diskEntries": len(files),
+                "diskBytes": sum(size for path, size, mtime in files),
+                "hits": self.hits,
+                "misses": self.misses}
+
+    def clear(self, disk=True):
+        """Removes all kernels from memory, and from disk if disk is True."""
+        self._memory.clear()
+        if disk:
+            for path, size, mtime in self._diskEntries():
+                self._remove(path)
+
+    def _storeMemory(self, key, kernel):
+        self._memory[key] = kernel
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxMemoryEntries:
+            self._memory.popitem(last=False)
+
+    def _evictDisk(self):
+        """Removes least recently used files until below maxDiskBytes."""
+        files = sorted(self._diskEntries(), key=lambda entry: entry[2])
+        total = sum(size for path, size, mtime in files)
+        while files and total > self.maxDiskBytes:
+            path, size, mtime = files.pop(0)
+            self._remove(path)
+            total -= size
+
+    def _diskEntries(self):
+        """List of (path, size, modification time) for every cached file."""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if name.endswith(self.extension):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# shared by all models
+kernelCache = KernelCache()
@@ -0,0 +1,33 @@
+"""
+Modules imported when they are first used.
+
+symengine and the scipy optimizers take a noticeable time to import and are
+only needed to fit models. Modules that use them refer to a LazyModule
+instead, so restoring fitted results (see core.project) does not import
+them.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access.
+
+    Attributes:
+        name: Full name of the module (string), e.g. "scipy.optimize".
+    """
+
+    def __init__(self, name):
+        """Initializes LazyModule class, the module is not imported."""
+        self.name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        # only called for attributes not found on the instance
+        if self._module is None:
+            self._module = importlib.import_module(self.name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = "imported" if self._module is not None else "not imported"
+        return "LazyModule('{0}', {1})".format(self.name, state)
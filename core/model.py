@@ -5,13 +5,20 @@ import logging as log
 import time   # for testing
 
 import numpy as np
-import scipy.optimize
 from scipy.special import factorial as npfactorial
-
-import symengine
+from scipy.special import gammaln
 
 import math
 
+from core.kernelCache import kernelCache
+from core.budget import BudgetExceeded, FitMonitor
+from core.lazyImport import LazyModule
+from core.dataSnapshot import asSnapshot
+
+# only needed to fit models, not to use restored results
+optimize = LazyModule("scipy.optimize")
+symengine = LazyModule("symengine")
+
 
 class Model(ABC):
     """Generic model class, contains functions used by all models.
@@ -24,8 +31,8 @@ class Model(ABC):
     by all classes that inherit from it.
 
     Attributes:
-        data: Pandas dataframe containing the imported data for the current
-            sheet.
+        data: DataSnapshot of the data fit, usually shared by all models of
+            an estimation run in the same process.
         metricNames: List of covariate metric names as strings.
         t: Numpy array containing all failure times (T).
         failures: Numpy array containing failure counts (FC) as integers at
@@ -34,8 +41,9 @@ class Model(ABC):
         cumulativeFailures: Numpy array containing cumulative failure counts
             (CFC) as integers at each time (T).
         totalFailures: Total number of failures contained in the data (int).
-        covariateData: List of numpy arrays containing the data for each
-            covariate metric to be used in calculations.
+        covariateData: Numpy array containing the data for each covariate
+            metric to be used in calculations, one row per metric. A view of
+            the snapshot data where possible, read-only.
         numCovariates: The number of covariates to be used in calculations
             (int).
         converged: Boolean indicating if the model converged or not.
@@ -56,31 +64,102 @@ class Model(ABC):
             that the model fit to the cumulative data.
         intensityList: List of values (float) that the model fit to the
             intensity data.
+        engine: Name of the log-likelihood implementation used by RLL, one
+            of Model.engines.
+        optimizer: Name of the optimization strategy used by runEstimation,
+            one of Model.optimizers.
+        iterations: Number of optimizer iterations used by the last fit (int).
+        evaluations: Number of log-likelihood evaluations used by the last
+            fit (int).
+        gradientEvaluations: Number of gradient evaluations used by the last
+            fit (int).
+        budget: FitBudget limiting runEstimation, or None.
+        budgetExceeded: Boolean indicating if the last fit stopped at a limit
+            of the budget.
+        warmStarted: Boolean indicating if the last fit started from given
+            initial estimates instead of initialEstimates().
+        cached: Boolean indicating if the results were rebuilt from the
+            result cache instead of fitted.
     """
 
     maxCovariates = None
 
+    # (lower, upper) bounds for each hazard function parameter, used by the
+    # gradient based optimizers, None for no bound
+    # models set these so that the hazard stays in (0, 1)
+    parameterBounds = None
+
+    # log-likelihood implementations RLL can dispatch to
+    # "reference" is the original loop implementation, and uses the symbolic
+    # gradient of LLF_sym during estimation, kept for verification
+    # "parameterized" uses the vectorized likelihood and a symbolic gradient
+    # that takes the data as arguments, shared by all datasets of one shape
+    engines = ("vectorized", "reference", "parameterized")
+
+    # optimization strategies runEstimation can use
+    # "reference" is the original Nelder-Mead search followed by root finding
+    # on the gradient
+    # "L-BFGS-B" and "trust-constr" minimize the negative log-likelihood using
+    # the gradient, with hazard parameters kept within parameterBounds
+    optimizers = ("reference", "L-BFGS-B", "trust-constr")
+
+    # objective value returned to the gradient based optimizers when the
+    # log-likelihood is not finite, so the line search steps back
+    invalidObjective = 1.0e10
+
+    # compiled hazard derivatives, indexed by model class
+    _hazardGradientKernels = {}
+
+    # attributes set by runEstimation that describe the fit, enough to
+    # restore a fitted model without running it (see results())
+    resultFields = ("mle_array", "converged", "runtime", "iterations", "evaluations", "gradientEvaluations",
+                    "budgetExceeded", "warmStarted", "omega", "hazard_array", "mvf_array", "intensityList",
+                    "llfVal", "aicVal", "bicVal", "sseVal")
+
+    # number of (parameter vector, interval) elements RLL_batch evaluates at
+    # once, bounds the size of each intermediate array (8 MB of floats)
+    batchChunkElements = 2**20
+
     def __init__(self, *args, **kwargs):
         """Initializes Model class
 
         Keyword Args:
-            data: Pandas dataframe with all required columns
+            data: DataSnapshot, or pandas dataframe with all required
+                columns (converted to a snapshot of the selected metrics)
             metricNames: list of selected metric names
+            engine: log-likelihood implementation (string), "vectorized" by
+                default
+            optimizer: optimization strategy (string), "reference" by default
+            budget: FitBudget limiting the work done by runEstimation, None
+                by default (no limits)
         """
-        self.data = kwargs["data"]                  # dataframe
         self.metricNames = kwargs["metricNames"]    # selected metric names (strings)
-        self.t = self.data["T"].values     # failure times
-        self.failures = self.data["FC"].values     # number of failures
+        self.data = asSnapshot(kwargs["data"], self.metricNames)    # read-only arrays
+        self.t = self.data.t     # failure times
+        self.failures = self.data.failures     # number of failures
         self.n = len(self.failures)                     # number of discrete time segments
-        self.cumulativeFailures = self.data["CFC"].values
+        self.cumulativeFailures = self.data.cumulativeFailures
         self.totalFailures = self.cumulativeFailures[-1]
-        self.covariateData = np.array([self.data[name].values for name in self.metricNames])
+        self.covariateData = self.data.covariateData(self.metricNames)
         self.numCovariates = len(self.covariateData)
         self.psseVal = None
         self.numParameters = len(self.parameterEstimates)
         self.numSymbols = self.numCovariates + self.numParameters
         self.converged = False
         self.runtime = 0
+        self.engine = kwargs.get("engine", "vectorized")
+        if self.engine not in Model.engines:
+            raise ValueError("Unknown likelihood engine '{0}', expected one of {1}.".format(self.engine, Model.engines))
+        self.optimizer = kwargs.get("optimizer", "reference")
+        if self.optimizer not in Model.optimizers:
+            raise ValueError("Unknown optimizer '{0}', expected one of {1}.".format(self.optimizer, Model.optimizers))
+        self.budget = kwargs.get("budget")
+        self.budgetExceeded = False     # True if the fit stopped at a budget limit
+        self.warmStarted = False
+        self.cached = False             # True if results come from the result cache
+        self.iterations = 0
+        self.evaluations = 0
+        self.gradientEvaluations = 0
         self.setupMetricString()
 
         # logging
@@ -96,6 +175,11 @@ class Model(ABC):
         modelString = "{0} model with {1} covariates".format(self.name, self.metricString)
         return modelString
 
+    @property
+    def modelClass(self):
+        """Class of the model, the same attribute as FitResult records have."""
+        return type(self)
+
     ################################################
     # Properties/Members all models must implement #
     ################################################
@@ -145,6 +229,71 @@ class Model(ABC):
 
     ##################################################
 
+    def hazardArray(self, i_array, args):
+        """Hazard function evaluated at every interval in i_array.
+
+        Models override this with a vectorized implementation. The default
+        calls hazardNumerical once per interval, so models that only define
+        the scalar form still work.
+
+        Args:
+            i_array: Numpy array of interval numbers (int).
+            args: Model parameters (hazard function parameters only).
+
+        Returns:
+            Numpy array of hazard values (float), same length as i_array.
+        """
+        return np.array([self.hazardNumerical(i, args) for i in i_array], dtype=float)
+
+    def hazardMatrix(self, i_array, params):
+        """Hazard function for many parameter vectors at once.
+
+        Model parameters are passed to hazardArray as column vectors, so the
+        vectorized hazard functions broadcast to a matrix. Models that only
+        define the scalar form are evaluated one parameter vector at a time.
+
+        Args:
+            i_array: Numpy array of interval numbers (int).
+            params: Numpy array with shape (m, numParameters), one set of
+                hazard function parameters per row.
+
+        Returns:
+            Numpy array with shape (m, len(i_array)).
+        """
+        params = np.asarray(params, dtype=float)
+        if type(self).hazardArray is Model.hazardArray:
+            return np.array([self.hazardArray(i_array, row) for row in params], dtype=float)
+        h = self.hazardArray(i_array, [params[:, j, None] for j in range(self.numParameters)])
+        return np.broadcast_to(h, (len(params), len(i_array)))
+
+    def hazardGradientArray(self, i_array, args):
+        """Partial derivatives of the hazard function at every interval.
+
+        The derivatives are found by differentiating hazardSymbolic once per
+        model class; the compiled result is stored in
+        Model._hazardGradientKernels and reused by every instance.
+
+        Args:
+            i_array: Numpy array of interval numbers (int).
+            args: Model parameters (hazard function parameters only).
+
+        Returns:
+            Numpy array with shape (numParameters, len(i_array)), row j holds
+            the derivative of the hazard with respect to args[j].
+        """
+        kernel = Model._hazardGradientKernels.get(type(self))
+        if kernel is None:
+            i = symengine.Symbol("i")
+            params = symengine.symbols(f'p:{self.numParameters}')
+            h = symengine.sympify(self.hazardSymbolic(i, params))
+            derivatives = [symengine.diff(h, params[j]) for j in range(self.numParameters)]
+            kernel = symengine.Lambdify([i] + list(params), derivatives, backend='lambda')
+            Model._hazardGradientKernels[type(self)] = kernel
+
+        i_array = np.asarray(i_array, dtype=float)
+        inputs = np.column_stack([i_array] + [np.full(len(i_array), a, dtype=float) for a in args])
+        return np.reshape(kernel(inputs), (len(i_array), self.numParameters)).T
+
     def setupMetricString(self):
         """Creates string of metric names separated by commas"""
         if (self.metricNames == []):
@@ -155,13 +304,16 @@ class Model(ABC):
         # self.combinationName = f"{self.shortName} ({self.metricString})"
         self.combinationName = "{0} ({1})".format(self.shortName, self.metricString)
 
-    def LLF_sym(self, hazard, covariate_data):
+    def LLF_sym(self, hazard, covariate_data, token=None):
         # x = b, b1, b2, b2 = symengine.symbols('b b1 b2 b3')
 
         x = symengine.symbols(f'x:{self.numSymbols}')
         second = []
         prodlist = []
         for i in range(self.n):
+            # building the expression is quadratic in n, stop if cancelled
+            if token is not None:
+                token.check()
             sum1 = 1
             sum2 = 1
             TempTerm1 = 1
@@ -190,7 +342,198 @@ class Model(ABC):
         f = firstTerm + secondTerm + thirdTerm - fourthTerm
         return f, x
 
+    def LLF_sym_parameterized(self, hazard, token=None):
+        """Symbolic log-likelihood with the data as symbols, not constants.
+
+        Failure counts and covariate values are symbols, so the compiled
+        gradient only depends on the model class, number of covariates and
+        number of intervals, and can be reused for any dataset of that shape.
+        The log(FC!) term is omitted since it does not depend on x.
+
+        Args:
+            hazard: Symbolic hazard function.
+            token: CancellationToken checked for each interval, or None.
+
+        Returns:
+            f: Symbolic log-likelihood (without the log(FC!) term).
+            x: Symbols for the model parameters and betas.
+            fc: Symbols for the failure counts, one per interval.
+            cov: Symbols for the covariate data, numCovariates lists of n.
+        """
+        x = symengine.symbols(f'x:{self.numSymbols}')
+        fc = symengine.symbols(f'fc:{self.n}')
+        cov = [symengine.symbols(f'z{j}_:{self.n}') for j in range(self.numCovariates)]
+        # symbols() returns a single symbol instead of a tuple for n = 1
+        fc = list(fc) if self.n > 1 else [fc]
+        cov = [list(c) if self.n > 1 else [c] for c in cov]
+
+        # exp(cov_i * beta) for each interval
+        exponents = []
+        for i in range(self.n):
+            term = 1
+            for j in range(self.numCovariates):
+                term = term * symengine.exp(cov[j][i] * x[self.numParameters + j])
+            exponents.append(term)
+
+        prodlist = []
+        for i in range(self.n):
+            if token is not None:
+                token.check()
+            survival = 1 - hazard(i + 1, x[:self.numParameters])
+            sum2 = 1
+            for k in range(i):
+                sum2 = sum2 * survival**exponents[k]
+            prodlist.append((1 - survival**exponents[i]) * sum2)
+
+        failure_sum = sum(fc)
+        f = -failure_sum + failure_sum * symengine.log(failure_sum / sum(prodlist))
+        for i in range(self.n):
+            f = f + fc[i] * symengine.log(prodlist[i])
+        return f, x, fc, cov
+
     def RLL(self, x, covariate_data):
+        """Log-likelihood of parameters x, computed by the selected engine."""
+        if self.engine == "reference":
+            return self.RLL_reference(x, covariate_data)
+        return self.RLL_vectorized(x, covariate_data)
+
+    def covariateMatrix(self, covariate_data, length):
+        """Covariate data as a (numCovariates x length) float array.
+
+        Only the first length intervals are used, covariate data may cover
+        more intervals than the hazard (prediction, effort allocation).
+        """
+        if self.numCovariates == 0:
+            return np.zeros((0, length))
+        return np.asarray(covariate_data, dtype=float)[:, :length]
+
+    def fitIntermediates(self, hazard, betas, covariate_data):
+        """Per-interval terms shared by omega, MVF and the log-likelihood.
+
+        The product over prior intervals k < i of (1 - h_i)^exp(cov_k * beta)
+        is evaluated in log space as log(1 - h_i) times the prefix sum of the
+        covariate exponents, so every term costs O(n * numCovariates).
+        Hazard and betas may also be 2D, one row per parameter vector.
+
+        Args:
+            hazard: Hazard values, one per interval (last axis). Determines
+                the number of intervals used.
+            betas: Covariate coefficients, on the last axis.
+            covariate_data: Covariate data, at least as many intervals as
+                hazard.
+
+        Returns:
+            Tuple of numpy arrays, each the same shape as hazard:
+                exponent_array: exp(cov_i * beta) for each interval, 1
+                    everywhere with no covariates.
+                log_survival: log(1 - h_i).
+                prior_exponents: Sum of exponents over prior intervals only
+                    (exclusive prefix sum). prior_exponents * log_survival is
+                    the log probability of surviving the prior intervals.
+                product_array: Probability of detecting a failure in each
+                    interval, (1 - (1 - h_i)^e_i) * (1 - h_i)^(e_0 + ... + e_(i-1)).
+        """
+        h = np.asarray(hazard, dtype=float)
+        cov_data = self.covariateMatrix(covariate_data, h.shape[-1])
+        exponent_array = np.broadcast_to(np.exp(np.asarray(betas, dtype=float) @ cov_data), h.shape)
+        log_survival = np.log(1 - h)
+        prior_exponents = np.concatenate((np.zeros(h.shape[:-1] + (1,)), np.cumsum(exponent_array[..., :-1], axis=-1)), axis=-1)
+        product_array = -np.expm1(exponent_array * log_survival) * np.exp(prior_exponents * log_survival)
+        return exponent_array, log_survival, prior_exponents, product_array
+
+    def RLL_vectorized(self, x, covariate_data):
+        """Log-likelihood computed in a single vectorized pass, O(n).
+
+        Gives the same result as RLL_reference.
+        """
+        h = self.hazardArray(np.arange(1, self.n + 1), x[:self.numParameters])
+        intermediates = self.fitIntermediates(h, x[self.numParameters:], covariate_data)
+        return self.RLL_detection(intermediates[3])
+
+    def RLL_batch(self, x_matrix, covariate_data, chunkElements=None):
+        """Log-likelihood of many parameter vectors in one computation.
+
+        Same values as calling RLL_vectorized for each row. Rows are
+        evaluated in chunks so that no intermediate array holds more than
+        chunkElements values.
+
+        Args:
+            x_matrix: Array with shape (m, numSymbols), each row holds model
+                parameters followed by betas.
+            covariate_data: Covariate data used in the fit.
+            chunkElements: Size limit (number of floats) for intermediate
+                arrays, Model.batchChunkElements by default.
+
+        Returns:
+            Numpy array of m log-likelihood values.
+        """
+        x_matrix = np.atleast_2d(np.asarray(x_matrix, dtype=float))
+        if chunkElements is None:
+            chunkElements = self.batchChunkElements
+        rows = max(1, chunkElements // self.n)
+        i_array = np.arange(1, self.n + 1)
+
+        result = np.empty(len(x_matrix))
+        for start in range(0, len(x_matrix), rows):
+            chunk = x_matrix[start:start + rows]
+            h = self.hazardMatrix(i_array, chunk[:, :self.numParameters])
+            intermediates = self.fitIntermediates(h, chunk[:, self.numParameters:], covariate_data)
+            result[start:start + rows] = self.RLL_detection(intermediates[3])
+        return result
+
+    def RLL_detection(self, product_array):
+        """Log-likelihood from the per-interval detection probabilities.
+
+        Args:
+            product_array: Detection probabilities returned by
+                fitIntermediates, 2D arrays give one value per row.
+        """
+        failure_sum = np.sum(self.failures)
+
+        first_term = -failure_sum
+        second_term = failure_sum * np.log(failure_sum / np.sum(product_array, axis=-1))
+        third_term = np.sum(np.log(product_array) * self.failures, axis=-1)
+        fourth_term = np.sum(gammaln(self.failures + 1))    # log(FC!)
+
+        f = first_term + second_term + third_term - fourth_term
+        return f
+
+    def RLL_gradient(self, x, covariate_data):
+        """Gradient (score) of the log-likelihood, computed numerically.
+
+        Uses the same intermediates as RLL_vectorized along with the hazard
+        derivatives from hazardGradientArray, so no symbolic expression of the
+        full likelihood is needed. With p_i the probability of detecting a
+        failure in interval i, the derivative is
+        -F * sum(dp_i) / sum(p_i) + sum(FC_i * dlog(p_i)).
+
+        Returns:
+            Numpy array of partial derivatives, one for each element of x.
+        """
+        i_array = np.arange(1, self.n + 1)
+        h = self.hazardArray(i_array, x[:self.numParameters])
+        dh = self.hazardGradientArray(i_array, x[:self.numParameters])
+        exponent_array, log_survival, prior_exponents, product_array = self.fitIntermediates(h, x[self.numParameters:], covariate_data)
+
+        # derivative of prior_exponents with respect to each beta
+        weighted = self.covariateMatrix(covariate_data, self.n) * exponent_array
+        prior_weighted = np.concatenate((np.zeros((self.numCovariates, 1)), np.cumsum(weighted[:, :-1], axis=1)), axis=1)
+
+        survival = np.exp(exponent_array * log_survival)    # (1 - h_i)^e_i
+        detection = -np.expm1(exponent_array * log_survival)
+
+        # log(p_i) = log(1 - (1 - h_i)^e_i) + S_i * log(1 - h_i)
+        ratio = survival / detection
+        d_log_survival = -dh / (1 - h)
+        d_log_p_params = (prior_exponents - ratio * exponent_array) * d_log_survival
+        d_log_p_betas = (prior_weighted - ratio * weighted) * log_survival
+        d_log_p = np.vstack((d_log_p_params, d_log_p_betas))
+
+        failure_sum = np.sum(self.failures)
+        return -failure_sum * (d_log_p @ product_array) / np.sum(product_array) + d_log_p @ self.failures
+
+    def RLL_reference(self, x, covariate_data):
+        """Log-likelihood computed with the original O(n^2) loop."""
         # want everything to be array of length n
         cov_data = np.array(covariate_data)
 
@@ -247,7 +590,74 @@ class Model(ABC):
         """
         return symengine.lambdify(x, bh, backend='lambda')
 
-    def runEstimation(self, covariate_data):
+    def symbolicGradient(self, covariate_data, token=None):
+        """Returns compiled gradient of LLF_sym as a function of x.
+
+        The symbolic likelihood is only built and differentiated if the
+        kernel cache does not already hold a kernel for this model class,
+        number of covariates, number of intervals and data. The token, if
+        given, is checked while the expression is built and differentiated.
+        """
+        key = kernelCache.key(self, covariate_data)
+        fd = kernelCache.get(key)
+        if fd is None:
+            f, x = self.LLF_sym(self.hazardSymbolic, covariate_data, token)    # pass hazard rate function
+
+            bh = np.array(self.differentiate(f, x, token))
+
+            fd = self.convertSym(x, bh, "numpy")
+            kernelCache.put(key, x, bh, fd)
+        return fd
+
+    def parameterizedGradient(self, covariate_data, token=None):
+        """Returns gradient of LLF_sym_parameterized as a function of x.
+
+        One compiled kernel is shared by every fit with the same model class,
+        number of covariates and number of intervals; the failure counts and
+        covariate data of this fit are passed to it as arguments.
+        """
+        key = kernelCache.key(self, covariate_data, fingerprint=False)
+        kernel = kernelCache.get(key)
+        if kernel is None:
+            f, x, fc, cov = self.LLF_sym_parameterized(self.hazardSymbolic, token)
+            bh = np.array(self.differentiate(f, x, token))
+            inputs = list(x) + fc + [c for row in cov for c in row]
+            kernel = self.convertSym(inputs, bh, "numpy")
+            kernelCache.put(key, inputs, bh, kernel)
+
+        data = np.concatenate((np.asarray(self.failures, dtype=float),
+                               np.asarray(covariate_data, dtype=float).ravel()))
+        return lambda x: kernel(np.concatenate((x, data)))
+
+    def differentiate(self, f, x, token=None):
+        """Symbolic derivatives of f with respect to each symbol of x.
+
+        Differentiating the full likelihood can take seconds per symbol, the
+        token is checked before each one.
+        """
+        derivatives = []
+        for i in range(self.numSymbols):
+            if token is not None:
+                token.check()
+            derivatives.append(symengine.diff(f, x[i]))
+        return derivatives
+
+    def runEstimation(self, covariate_data, token=None, initial=None):
+        """Fits the model, storing the results as properties.
+
+        Args:
+            covariate_data: Covariate data used in the fit.
+            token: CancellationToken, or None. Checked by the optimizers and
+                while building symbolic gradients; if it is cancelled the fit
+                stops by raising EstimationCancelled. The token is not stored
+                on the model, since fitted models are sent between processes.
+            initial: Initial estimates, for example from a fit of a nested
+                model. initialEstimates() are used if None.
+
+        If a limit of self.budget is reached, the fit stops and the best
+        parameters found so far (or the initial estimates, if none were
+        evaluated) are used as the result, with budgetExceeded set to True.
+        """
         # need class of specific model being used, lambda function stored as class variable
 
         # ex. (max covariates = 3) for 3 covariates, zero_array should be length 0
@@ -259,17 +669,31 @@ class Model(ABC):
         # create new lambda function that calls lambda function for all covariates
         # for no covariates, concatenating array a with zero element array
         optimize_start = time.time()    # record time
-        initial = self.initialEstimates()
-
-        #log.info("Initial estimates: %s", initial)
-        f, x = self.LLF_sym(self.hazardSymbolic, covariate_data)    # pass hazard rate function
-
-        bh = np.array([symengine.diff(f, x[i]) for i in range(self.numSymbols)])
-
-        fd = self.convertSym(x, bh, "numpy")
+        self.warmStarted = initial is not None
+        initial = self.initialEstimates() if initial is None else np.asarray(initial, dtype=float)
+        self.budgetExceeded = False
+        monitor = FitMonitor(self.budget, token)
+
+        try:
+            #log.info("Initial estimates: %s", initial)
+            if self.engine == "reference":
+                fd = self.symbolicGradient(covariate_data, monitor)
+            elif self.engine == "parameterized":
+                fd = self.parameterizedGradient(covariate_data, monitor)
+            else:
+                # score computed directly, only the hazard is differentiated symbolically
+                fd = lambda x: self.RLL_gradient(x, covariate_data)
 
-        solution_object = scipy.optimize.minimize(self.RLL_minimize, x0=initial, args=(covariate_data,), method='Nelder-Mead')
-        self.mle_array = self.optimizeSolution(fd, solution_object.x)
+            if self.optimizer == "reference":
+                self.mle_array = self.optimizeReference(fd, initial, covariate_data, monitor)
+            else:
+                self.mle_array = self.optimizeGradient(fd, initial, covariate_data, monitor)
+        except BudgetExceeded:
+            log.info("%s (%s) stopped at budget limit %s.", self.shortName, self.metricString, self.budget)
+            self.budgetExceeded = True
+            self.converged = False
+            self.evaluations = monitor.evaluations
+            self.mle_array = monitor.bestX if monitor.bestX is not None else initial
         optimize_stop = time.time()
         self.runtime = optimize_stop - optimize_start
         # if self.converged:
@@ -283,10 +707,26 @@ class Model(ABC):
         #log.info("model parameters =", self.modelParameters)
         #log.info("betas =", self.betas)
 
-        hazard = np.array([self.hazardNumerical(i + 1, self.modelParameters) for i in range(self.n)])
+        hazard = self.hazardArray(np.arange(1, self.n + 1), self.modelParameters)
         self.hazard_array = hazard    # for MVF prediction, don't want to calculate again
-        self.modelFitting(hazard, self.mle_array, covariate_data)
-        self.goodnessOfFit(self.mle_array, covariate_data)
+        # omega, MVF and log-likelihood all use the same per-interval terms
+        intermediates = self.fitIntermediates(hazard, self.betas, covariate_data)
+        self.modelFitting(hazard, self.mle_array, covariate_data, intermediates)
+        self.goodnessOfFit(self.mle_array, covariate_data, intermediates)
+
+    def results(self):
+        """Returns dict of the estimation results, the attributes in resultFields."""
+        return {name: getattr(self, name) for name in self.resultFields}
+
+    def restoreResults(self, results):
+        """Sets estimation results returned by results(), without fitting.
+
+        The fitted parameters are split from mle_array as in runEstimation.
+        """
+        for name, value in results.items():
+            setattr(self, name, value)
+        self.modelParameters = self.mle_array[:self.numParameters]
+        self.betas = self.mle_array[self.numParameters:]
 
     def initialEstimates(self):
         # bEstimate = [self.b0]
@@ -294,27 +734,137 @@ class Model(ABC):
         betaEstimate = [self.beta0 for i in range(self.numCovariates)]
         return np.array(parameterEstimates + betaEstimate)
 
-    def optimizeSolution(self, fd, B):
+    def optimizeReference(self, fd, initial, covariate_data, monitor=None):
+        """Nelder-Mead search, then root finding on the gradient.
+
+        Args:
+            fd: Gradient of the log-likelihood as a function of x.
+            initial: Initial estimates.
+            covariate_data: Covariate data used in the fit.
+            monitor: FitMonitor checked every evaluation, or None.
+
+        Returns:
+            Numpy array of MLEs. If the root solver reaches its iteration
+            limit, the better of the Nelder-Mead and root solver solutions.
+        """
+        if monitor is None:
+            monitor = FitMonitor()
+
+        def objective(x, covariate_data):
+            value = self.RLL_minimize(x, covariate_data)
+            monitor.evaluated(x, value)
+            return value
+
+        self.iterations = 0
+        solution_object = optimize.minimize(objective, x0=initial, args=(covariate_data,), method='Nelder-Mead',
+                                                  callback=self.iterationCallback(monitor))
+        self.iterations = solution_object.nit
+        self.evaluations = solution_object.nfev
+
+        # root has no callback, check before each gradient evaluation
+        def gradient(x):
+            monitor.check()
+            return fd(x)
+        solution = self.optimizeSolution(gradient, solution_object.x, monitor.maxRootIterations)
+        if self.budgetExceeded and not self.RLL_minimize(solution, covariate_data) < solution_object.fun:
+            return solution_object.x
+        return solution
+
+    def optimizeGradient(self, fd, initial, covariate_data, monitor=None):
+        """Minimizes the negative log-likelihood using its gradient.
+
+        Uses the scipy method named by self.optimizer. Each beta is scaled by
+        the largest absolute value of its covariate so that all variables
+        have similar effect on the likelihood, otherwise the first steps
+        overshoot for covariates with large values.
+
+        Args:
+            fd: Gradient of the log-likelihood as a function of x.
+            initial: Initial estimates.
+            covariate_data: Covariate data used in the fit.
+            monitor: FitMonitor checked every evaluation, or None.
+
+        Returns:
+            Numpy array of MLEs.
+        """
+        if monitor is None:
+            monitor = FitMonitor()
+        scale = np.ones(self.numSymbols)
+        if self.numCovariates > 0:
+            cov_max = np.max(np.abs(self.covariateMatrix(covariate_data, self.n)), axis=1)
+            scale[self.numParameters:] = np.where(cov_max > 0, cov_max, 1.0)
+
+        def objective(z):
+            value = -self.RLL(z / scale, covariate_data)
+            if not np.isfinite(value):
+                value = self.invalidObjective
+            monitor.evaluated(z / scale, value)
+            return value
+
+        def gradient(z):
+            return np.nan_to_num(-np.asarray(fd(z / scale), dtype=float) / scale)
+
+        parameterBounds = self.parameterBounds or [(None, None)] * self.numParameters
+        bounds = list(parameterBounds) + [(None, None)] * self.numCovariates
+
+        if self.optimizer == "trust-constr":
+            options = {"maxiter": 5000, "initial_tr_radius": 0.1}
+        else:
+            options = {"maxiter": 15000, "ftol": 1e-12, "gtol": 1e-8}
+
+        self.iterations = 0
+        with np.errstate(all='ignore'):
+            solution_object = optimize.minimize(objective, x0=initial * scale, jac=gradient,
+                                                      method=self.optimizer, bounds=bounds, options=options,
+                                                      callback=self.iterationCallback(monitor))
+        self.iterations = solution_object.nit
+        self.evaluations = solution_object.nfev
+        self.gradientEvaluations = solution_object.njev
+        self.converged = bool(solution_object.success) and solution_object.fun < self.invalidObjective
+        #log.info("\t" + solution_object.message)
+
+        return solution_object.x / scale
+
+    def iterationCallback(self, monitor):
+        """Optimizer callback, counts iterations and checks the monitor.
+
+        The count is kept if the fit stops before the optimizer returns.
+        """
+        def callback(*args):
+            self.iterations += 1
+            monitor.check()
+        return callback
+
+    def optimizeSolution(self, fd, B, maxIterations=None):
         #log.info("Solving for MLEs...")
 
-        sol_object = scipy.optimize.root(fd, x0=B)
+        options = {} if maxIterations is None else {"maxfev": maxIterations}
+        sol_object = optimize.root(fd, x0=B, options=options)
         solution = sol_object.x
         self.converged = sol_object.success
+        self.gradientEvaluations = sol_object.nfev
+        if not sol_object.success and maxIterations is not None and sol_object.nfev >= maxIterations:
+            self.budgetExceeded = True
         #log.info("\t" + sol_object.message)
         
         return solution
 
-    def modelFitting(self, hazard, mle, covariate_data):
-        self.omega = self.calcOmega(hazard, self.betas, covariate_data)
+    def modelFitting(self, hazard, mle, covariate_data, intermediates=None):
+        if intermediates is None:
+            intermediates = self.fitIntermediates(hazard, self.betas, covariate_data)
+        self.omega = self.calcOmega(hazard, self.betas, covariate_data, intermediates)
         #log.info("Calculated omega: %s", self.omega)
 
-        self.mvf_array = self.MVF_all(mle, self.omega, hazard, covariate_data)
+        self.mvf_array = self.MVF_all(mle, self.omega, hazard, covariate_data, intermediates)
         #log.info("MVF values: %s", self.mvf_array)
         self.intensityList = self.intensityFit(self.mvf_array)
         #log.info("Intensity values: %s", self.intensityList)
 
-    def goodnessOfFit(self, mle, covariate_data):
-        self.llfVal = self.RLL(mle, covariate_data)
+    def goodnessOfFit(self, mle, covariate_data, intermediates=None):
+        if intermediates is None or self.engine == "reference":
+            self.llfVal = self.RLL(mle, covariate_data)
+        else:
+            self.llfVal = self.RLL_detection(intermediates[3])
         #log.info("Calculated log-likelihood value: %s", self.llfVal)
 
         p = self.calcP(mle)
@@ -326,8 +876,28 @@ class Model(ABC):
         self.sseVal = self.SSE(self.mvf_array, self.cumulativeFailures)
         #log.info("Calculated SSE: %s", self.sseVal)
 
-    def calcOmega(self, h, betas, covariate_data):
-        # can likely use fewer loops
+    def calcOmega(self, h, betas, covariate_data, intermediates=None):
+        """Omega estimate, total failures over the sum of detection probabilities.
+
+        Only the first n intervals are used, so hazard and covariate data
+        extended for prediction give the omega of the fitted data.
+
+        Args:
+            h: Hazard values, at least n of them.
+            betas: Covariate coefficients.
+            covariate_data: Covariate data, at least as many intervals as h.
+            intermediates: Result of fitIntermediates for the same h, betas and
+                covariate data. Calculated if not given.
+        """
+        if intermediates is None:
+            intermediates = self.fitIntermediates(h, betas, covariate_data)
+        denominator = np.sum(intermediates[3][:self.n])
+        numerator = self.totalFailures
+
+        return numerator / denominator
+
+    def calcOmega_reference(self, h, betas, covariate_data):
+        """Omega calculated with the original loop, reference for calcOmega."""
         prodlist = []
         for i in range(self.n):
             sum1 = 1
@@ -359,11 +929,36 @@ class Model(ABC):
         # number of covariates + number of hazard rate parameters + 1 (omega)
         return len(mle) + 1
 
-    def MVF_all(self, mle, omega, hazard_array, covariate_data):
-        mvf_array = np.array([self.MVF(mle, omega, hazard_array, dataPoints, covariate_data) for dataPoints in range(self.n)])
-        return mvf_array
+    def MVF_all(self, mle, omega, hazard_array, covariate_data, intermediates=None):
+        """Mean value function at every interval, computed in one pass.
+
+        Element i is equal to MVF(mle, omega, hazard_array, i, covariate_data).
+        The curve is the cumulative sum of the per-interval detection
+        probabilities, so the whole array costs O(n).
+
+        Args:
+            mle: Model parameters followed by betas.
+            omega: Omega value used to scale the curve.
+            hazard_array: Hazard values, one per interval. Determines the
+                length of the returned array.
+            covariate_data: Covariate data, at least as many intervals as
+                hazard_array.
+            intermediates: Result of fitIntermediates for the same hazard,
+                betas and covariate data. Calculated if not given.
+
+        Returns:
+            Numpy array of MVF values (float), same length as hazard_array.
+        """
+        if intermediates is None:
+            intermediates = self.fitIntermediates(hazard_array, mle[self.numParameters:], covariate_data)
+        return omega * np.cumsum(intermediates[3])
 
     def MVF(self, x, omega, hazard_array, stop, cov_data):
+        """MVF value at a single interval (stop), using the original loop.
+
+        Kept as a reference for MVF_all, which should be used to calculate
+        more than one point.
+        """
         # gives array with dimensions numCovariates x n, just want n
         # switched x[i + 1] to x[i + self.numParameters] to account for
         # more than 1 model parameter
@@ -2,6 +2,8 @@ import logging as log
 
 import numpy as np
 
+from core.dataSnapshot import asSnapshot
+
 
 def prediction_mvf(model, failures, covariate_data, effortDict):
     """
@@ -21,35 +23,40 @@ def prediction_mvf(model, failures, covariate_data, effortDict):
     else:
         combined_array = np.concatenate((covariate_data, np.array(new_array)), axis=1)
 
-    newHazard = np.array([model.hazardNumerical(i, model.modelParameters) for i in range(model.n, total_points)])  # calculate new values for hazard function
+    newHazard = model.hazardArray(np.arange(model.n, total_points), model.modelParameters)  # calculate new values for hazard function
     hazard = np.concatenate((model.hazard_array, newHazard))
 
 
     ## VERIFY OMEGA VALUE, should we continue updating?
 
-    omega = model.calcOmega(hazard, model.betas, combined_array)
+    intermediates = model.fitIntermediates(hazard, model.betas, combined_array)
+    omega = model.calcOmega(hazard, model.betas, combined_array, intermediates)
 
-    mvf_array = np.array([model.MVF(model.mle_array, omega, hazard, dataPoints, combined_array) for dataPoints in range(total_points)])
+    mvf_array = model.MVF_all(model.mle_array, omega, hazard, combined_array, intermediates)
     x = np.concatenate((model.t, np.arange(model.n + 1, total_points + 1)))
 
     return (x, mvf_array)
 
-def prediction_psse(model, data):
+def prediction_psse(model, full_data):
     """
     Prediction function used for PSSE. Imported covariate data is used.
+
+    full_data: DataSnapshot or dataframe of all intervals used for PSSE, the
+        model is fit to the first model.n of them
     """
 
-    total_points = data.max_interval
-    full_data = data.getData()
-    covariateData = np.array([full_data[name] for name in model.metricNames])
-    newHazard = np.array([model.hazardNumerical(i, model.modelParameters) for i in range(model.n, total_points)])  # calculate new values for hazard function
+    full_data = asSnapshot(full_data, model.metricNames)
+    total_points = len(full_data)
+    covariateData = full_data.covariateData(model.metricNames)
+    newHazard = model.hazardArray(np.arange(model.n, total_points), model.modelParameters)  # calculate new values for hazard function
     hazard = np.concatenate((model.hazard_array, newHazard))
 
 
     ## VERIFY OMEGA VALUE, should we continue updating?
 
-    omega = model.calcOmega(hazard, model.betas, covariateData)
-    mvf_array = np.array([model.MVF(model.mle_array, omega, hazard, dataPoints, covariateData) for dataPoints in range(total_points)])
+    intermediates = model.fitIntermediates(hazard, model.betas, covariateData)
+    omega = model.calcOmega(hazard, model.betas, covariateData, intermediates)
+    mvf_array = model.MVF_all(model.mle_array, omega, hazard, covariateData, intermediates)
     return mvf_array
 
 def prediction_intensity(model, intensity, covariate_data, effortDict):
@@ -70,15 +77,16 @@ def prediction_intensity(model, intensity, covariate_data, effortDict):
         else:
             combined_array = np.concatenate((covariate_data, np.array(new_array)), axis=1)
 
-        newHazard = np.array([model.hazardNumerical(j, model.modelParameters) for j in range(model.n, total_points)])  # calculate new values for hazard function
+        newHazard = model.hazardArray(np.arange(model.n, total_points), model.modelParameters)  # calculate new values for hazard function
         hazard = np.concatenate((model.hazard_array, newHazard))
 
         ## VERIFY OMEGA VALUE, should we continue updating?
-        omega = model.calcOmega(hazard, model.betas, combined_array)
+        intermediates = model.fitIntermediates(hazard, model.betas, combined_array)
+        omega = model.calcOmega(hazard, model.betas, combined_array, intermediates)
 
         #### IGNORE IF 0 !!!!!! ####
 
-        mvf_list.append(model.MVF(model.mle_array, omega, hazard, total_points - 1, combined_array))
+        mvf_list.append(model.MVF_all(model.mle_array, omega, hazard, combined_array, intermediates)[-1])
         calculated_intensity = mvf_list[-1] - mvf_list[-2]
         log.info("calculated intensity:", calculated_intensity)
         log.info("desired intensity:", intensity)
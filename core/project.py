@@ -0,0 +1,225 @@
+"""
+Project files, fitted results that are reopened without fitting again.
+
+A project file is a zip archive of NumPy arrays (.npy members) and a JSON
+description (project.json). It holds the imported sheets, the estimation
+results of each model/metric combination (MLEs, fitted MVF, intensity and
+hazard arrays and goodness-of-fit values), and the PSSE and effort
+allocation results. Opening a project rebuilds the FitResult records from
+the stored arrays. No model is fit, so symengine and the scipy optimizers
+are not imported.
+"""
+
+import importlib
+import io
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from core.dataClass import Data
+from core.allocation import EffortAllocation
+from core.fitResult import FitResult
+from core.dataSnapshot import DataSnapshot
+
+
+# file name extension of project files
+extension = ".csfrat"
+
+
+class Project:
+    """Imported data and results of one session.
+
+    Attributes:
+        data: Data object with the imported sheets.
+        sheet: Index (int) of the sheet the estimation results are fit to.
+        estimationResults: Dict of FitResult records (or fitted Model
+            objects), indexed by the name of the model/metric combination,
+            in the order they were fitted.
+        optimizer: Name of the optimization method of the fits.
+        psseResults: Dict of PSSE values (float, or empty string if the fit
+            failed), indexed by combination name. Empty if not run.
+        psseFraction: Fraction of the data fit for PSSE (float), or None.
+        allocationResults: Dict of [EffortAllocation, Model] lists, indexed
+            by combination name. Empty if not run.
+    """
+
+    version = 1
+
+    def __init__(self, data, sheet, estimationResults, optimizer="reference", psseResults=None,
+                 psseFraction=None, allocationResults=None):
+        """Initializes Project class."""
+        self.data = data
+        self.sheet = sheet
+        self.estimationResults = estimationResults
+        self.optimizer = optimizer
+        self.psseResults = psseResults or {}
+        self.psseFraction = psseFraction
+        self.allocationResults = allocationResults or {}
+
+    def save(self, path):
+        """Writes the project to a file.
+
+        Args:
+            path: Path of the project file, overwritten if it exists.
+        """
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            sheets = []
+            for i, name in enumerate(self.data.sheetNames):
+                frame = self.data.dataSet[name]
+                for j, column in enumerate(frame.columns):
+                    _writeArray(archive, "sheets/{0}/{1}.npy".format(i, j), frame[column].values)
+                sheets.append({"name": name, "columns": list(frame.columns)})
+
+            results = []
+            for i, (name, model) in enumerate(self.estimationResults.items()):
+                results.append({"name": name,
+                                "module": model.modelClass.__module__,
+                                "class": model.modelClass.__name__,
+                                "metricNames": list(model.metricNames),
+                                "optimizer": model.optimizer,
+                                "engine": model.engine,
+                                "n": model.n,
+                                "values": _packValues(archive, "results/{0}/".format(i), model.results())})
+
+            allocations = []
+            for i, (name, (allocation, model)) in enumerate(self.allocationResults.items()):
+                allocations.append({"name": name,
+                                    "type": allocation.allocationType,
+                                    "values": _packValues(archive, "allocations/{0}/".format(i),
+                                                          allocation.results())})
+
+            description = {"version": self.version,
+                           "filename": getattr(self.data, "filename", ""),
+                           "containsHeader": self.data.containsHeader,
+                           "sheets": sheets,
+                           "currentSheet": self.data.currentSheet,
+                           "maxInterval": self.data.max_interval,
+                           "sheet": self.sheet,
+                           "optimizer": self.optimizer,
+                           "results": results,
+                           "psse": {name: _jsonValue(value) for name, value in self.psseResults.items()},
+                           "psseFraction": self.psseFraction,
+                           "allocations": allocations}
+            archive.writestr("project.json", json.dumps(description))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a project file written by save().
+
+        Args:
+            path: Path of the project file.
+
+        Returns:
+            Project object, with FitResult records restored without fitting.
+
+        Raises:
+            ValueError: If the file is not a project file or was written by
+                a newer version.
+        """
+        try:
+            archive = zipfile.ZipFile(path, "r")
+        except zipfile.BadZipFile as error:
+            raise ValueError("{0} is not a project file: {1}".format(path, error))
+
+        with archive:
+            try:
+                description = json.loads(archive.read("project.json").decode())
+            except KeyError:
+                raise ValueError("{0} is not a project file.".format(path))
+            if description["version"] > cls.version:
+                raise ValueError("{0} was written by a newer version (project version {1}).".format(
+                    path, description["version"]))
+
+            data = Data()
+            dataSet = {}
+            for i, sheet in enumerate(description["sheets"]):
+                dataSet[sheet["name"]] = pd.DataFrame(
+                    {column: _readArray(archive, "sheets/{0}/{1}.npy".format(i, j))
+                     for j, column in enumerate(sheet["columns"])},
+                    columns=sheet["columns"])
+            data.filename = description["filename"]
+            data.containsHeader = description["containsHeader"]
+            data.sheetNames = list(dataSet.keys())
+            data.dataSet = dataSet
+            data.currentSheet = description["currentSheet"]
+            data.setNumCovariates()
+            data.setMetricNames()
+            data.getMetricNameCombinations()
+            data.setupMetricNameDictionary()
+            data.max_interval = description["maxInterval"]
+
+            sheet = description["sheet"]
+            fullData = dataSet[data.sheetNames[sheet]]
+            snapshots = {}  # data fit, shared by the records with the same number of intervals
+            estimationResults = {}
+            for record in description["results"]:
+                modelClass = getattr(importlib.import_module(record["module"]), record["class"])
+                n = record["n"]
+                if n not in snapshots:
+                    snapshots[n] = DataSnapshot(fullData[:n])
+                fitted = FitResult(modelClass, record["metricNames"], snapshots[n], record["optimizer"],
+                                   record["engine"])
+                fitted.restoreResults(_unpackValues(archive, record["values"]))
+                estimationResults[record["name"]] = fitted
+
+            allocationResults = {}
+            for record in description["allocations"]:
+                model = estimationResults[record["name"]]
+                allocation = EffortAllocation.fromResults(model, model.covariateData, record["type"],
+                                                          _unpackValues(archive, record["values"]))
+                allocationResults[record["name"]] = [allocation, model]
+
+        return cls(data, sheet, estimationResults, description["optimizer"], description["psse"],
+                   description["psseFraction"], allocationResults)
+
+
+def _writeArray(archive, member, array):
+    """Stores an array as a .npy member of the archive."""
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, np.asarray(array), allow_pickle=False)
+    archive.writestr(member, buffer.getvalue())
+
+
+def _readArray(archive, member):
+    """Reads an array stored by _writeArray."""
+    return np.lib.format.read_array(io.BytesIO(archive.read(member)), allow_pickle=False)
+
+
+def _jsonValue(value):
+    """Converts NumPy scalars to the equivalent Python value."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _packValues(archive, prefix, values):
+    """Stores array and list values as .npy members.
+
+    Returns:
+        Dict that can be written as JSON. Arrays and lists are replaced by
+        {"array": member} or {"list": member}, so unpacking restores the
+        same type.
+    """
+    packed = {}
+    for name, value in values.items():
+        if isinstance(value, (np.ndarray, list)):
+            member = prefix + name + ".npy"
+            _writeArray(archive, member, value)
+            packed[name] = {"list" if isinstance(value, list) else "array": member}
+        else:
+            packed[name] = _jsonValue(value)
+    return packed
+
+
+def _unpackValues(archive, packed):
+    """Reverses _packValues."""
+    values = {}
+    for name, value in packed.items():
+        if isinstance(value, dict) and "array" in value:
+            value = _readArray(archive, value["array"])
+        elif isinstance(value, dict) and "list" in value:
+            value = _readArray(archive, value["list"]).tolist()
+        values[name] = value
+    return values
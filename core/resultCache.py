@@ -0,0 +1,204 @@
+"""
+Cache of fitted model results, kept between runs and sessions.
+
+Pressing Run again with the same data, model and covariates gives the same
+fit, so the results of each fit are stored in an SQLite database in the
+user cache directory. Entries are content addressed: the key is a hash of
+the data arrays used by the fit, the model class and the source code of its
+module, the covariate names, the estimation settings and the initial
+estimates of a warm started fit. A hit rebuilds
+the Model object from the stored MLEs, fitted arrays and goodness-of-fit
+values without calling runEstimation.
+
+The database is limited in size, least recently used entries are removed
+first.
+"""
+
+# For handling debug output
+import logging as log
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.kernelCache import userCacheDirectory, codeVersion
+from core.dataSnapshot import asSnapshot
+
+
+class ResultCache:
+    """Size limited SQLite store of fitted model results.
+
+    Attributes:
+        path: Path (string) of the SQLite database file.
+        maxBytes: Total size of stored results allowed (int). Least recently
+            used results are removed when exceeded.
+        hits: Number of lookups that found a result.
+        misses: Number of lookups that did not.
+    """
+
+    version = 1
+
+    def __init__(self, path=None, maxBytes=64 * 1024**2):
+        """Initializes ResultCache class.
+
+        Args:
+            path: Database file, defaults to "results.sqlite" inside
+                userCacheDirectory().
+            maxBytes: Size limit (bytes) of the stored results.
+        """
+        if path is None:
+            path = os.path.join(userCacheDirectory(), "results.sqlite")
+        self.path = path
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, modelClass, metricNames, data, optimizer="reference", budget=None, engine="vectorized",
+            initial=None):
+        """Creates the key of a fit from its inputs.
+
+        Args:
+            modelClass: Model class (not instance) that is fit.
+            metricNames: List of covariate names of the fit.
+            data: DataSnapshot or pandas dataframe of the data fit.
+            optimizer: Name of the optimization method.
+            budget: FitBudget of the fit, or None.
+            engine: Name of the log-likelihood implementation.
+            initial: Initial estimates of a warm started fit, None if the
+                fit starts from the default initial estimates. A local
+                optimizer can find a different optimum from each.
+
+        Returns:
+            Key as a hexadecimal string.
+        """
+        digest = hashlib.sha1()
+        for part in [str(self.version), modelClass.__module__, modelClass.__name__, codeVersion(modelClass),
+                     ", ".join(metricNames), optimizer, engine, repr(budget),
+                     "default" if initial is None else "warm"]:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        if initial is not None:
+            digest.update(np.ascontiguousarray(initial, dtype=np.float64).tobytes())
+        data = asSnapshot(data, metricNames)
+        digest.update(np.ascontiguousarray(data.t, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(data.failures, dtype=np.int64).tobytes())
+        for name in metricNames:
+            digest.update(np.ascontiguousarray(data.covariateData([name])[0], dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def get(self, modelClass, metricNames, data, optimizer="reference", budget=None, initial=None):
+        """Returns the cached result of a fit, or None if it isn't cached.
+
+        Args:
+            modelClass: Model class (not instance) that is fit.
+            metricNames: List of covariate names of the fit.
+            data: DataSnapshot or pandas dataframe of the data fit.
+            optimizer: Name of the optimization method.
+            budget: FitBudget of the fit, or None.
+            initial: Initial estimates of a warm start, or None.
+
+        Returns:
+            Model object with the stored estimation results as properties,
+            with cached set to True.
+        """
+        m = modelClass(data=data, metricNames=list(metricNames), optimizer=optimizer, budget=budget)
+        key = self.key(modelClass, m.metricNames, data, optimizer, budget, m.engine, initial)
+        try:
+            with self._connect() as connection:
+                row = connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    connection.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+            record = None if row is None else pickle.loads(row[0])
+        except (sqlite3.Error, OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError) as error:
+            log.warning("Could not read cached result of %s: %s", m.combinationName, error)
+            record = None
+        if record is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        m.restoreResults(record)
+        m.cached = True
+        return m
+
+    def put(self, model, initial=None):
+        """Stores the result of a fitted model.
+
+        Results of fits stopped by their budget are not stored, since a
+        time limit stops at a different point each run.
+
+        Args:
+            model: Model object, after runEstimation.
+            initial: Initial estimates the fit was warm started from, or
+                None. Not used if the warm start fell back to the default
+                initial estimates.
+        """
+        if model.budgetExceeded or model.cached:
+            return
+        if not model.warmStarted:
+            initial = None
+        key = self.key(model.__class__, model.metricNames, model.data, model.optimizer, model.budget,
+                       model.engine, initial)
+        value = pickle.dumps(model.results(), protocol=pickle.HIGHEST_PROTOCOL)
+        try:
+            with self._connect() as connection:
+                connection.execute("INSERT OR REPLACE INTO results (key, value, size, used) VALUES (?, ?, ?, ?)",
+                                   (key, value, len(value), time.time()))
+                self._evict(connection)
+        except (sqlite3.Error, OSError) as error:
+            log.warning("Could not write result to cache: %s", error)
+
+    def info(self):
+        """Returns a dict describing the contents of the cache."""
+        entries, size = 0, 0
+        try:
+            with self._connect() as connection:
+                entries, size = connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        except (sqlite3.Error, OSError):
+            pass
+        return {"path": self.path, "entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        """Removes all stored results."""
+        try:
+            with self._connect() as connection:
+                connection.execute("DELETE FROM results")
+        except (sqlite3.Error, OSError):
+            pass
+
+    @contextmanager
+    def _connect(self):
+        """Opens the database, creating it if needed, and commits on success.
+
+        A connection is opened for each operation, so the cache can be used
+        from any thread.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=10)
+        try:
+            connection.execute("CREATE TABLE IF NOT EXISTS results "
+                               "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, used REAL)")
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _evict(self, connection):
+        """Removes least recently used results until below maxBytes."""
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.maxBytes:
+            return
+        for key, size in connection.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+            connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.maxBytes:
+                break
+
+
+# shared by all estimation runs of the application
+resultCache = ResultCache()
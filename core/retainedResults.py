@@ -0,0 +1,126 @@
+"""
+Estimation results kept in memory while switching sheets and intervals.
+
+Results are fit to the data of one sheet, up to the interval selected with
+the tab 1 slider. Each FitResult record is kept under its sheet, interval, model
+class and covariates, together with the estimation settings it was fit with.
+Going back to a sheet or interval that was already analysed shows its
+results again without fitting, and a new run with the same settings only
+fits the combinations that are not kept.
+
+The number of records kept is limited, least recently used ones are
+removed first.
+"""
+
+from collections import OrderedDict
+
+
+class RetainedResults:
+    """Least recently used store of fitted models, for the current session.
+
+    Attributes:
+        maxResults: Number of records kept (int).
+        hits: Number of results returned by view() or matching().
+    """
+
+    def __init__(self, maxResults=2000):
+        """Initializes RetainedResults class.
+
+        Args:
+            maxResults: Number of records kept.
+        """
+        self.maxResults = maxResults
+        self.hits = 0
+        # key -> (name, settings, model), least recently used first
+        self._results = OrderedDict()
+        # (sheet, interval) -> (settings, keys of the results shown last)
+        self._views = {}
+        # (sheet, interval) -> (PSSE values indexed by name, fraction)
+        self._psse = {}
+
+    def key(self, sheet, interval, model):
+        """Key of a fitted model: sheet, interval, model class, covariates."""
+        return (sheet, interval, model.modelClass, tuple(model.metricNames))
+
+    def store(self, sheet, interval, settings, results):
+        """Keeps the results shown for a sheet and interval.
+
+        Args:
+            sheet: Index of the sheet the models are fit to (int).
+            interval: Number of intervals fit (int).
+            settings: Estimation settings of the fits, compared by
+                matching(). None if not known, the results are then only
+                shown again by view().
+            results: Dict of FitResult records, indexed by name of the
+                model/metric combination, in the order shown.
+        """
+        keys = []
+        for name, model in results.items():
+            key = self.key(sheet, interval, model)
+            self._results[key] = (name, settings, model)
+            self._results.move_to_end(key)
+            keys.append(key)
+        self._views[(sheet, interval)] = (settings, keys)
+        self._evict()
+
+    def storePSSE(self, sheet, interval, psseResults, fraction):
+        """Keeps the PSSE values of the results shown for a sheet and interval."""
+        self._psse[(sheet, interval)] = (dict(psseResults), fraction)
+
+    def view(self, sheet, interval):
+        """Returns the results shown last for a sheet and interval.
+
+        Returns:
+            Tuple of the settings they were fit with, a dict of the records
+            that are still kept, indexed by name in the order shown,
+            and a (PSSE values, fraction) tuple or None.
+        """
+        settings, keys = self._views.get((sheet, interval), (None, []))
+        results = OrderedDict()
+        for key in keys:
+            if key in self._results:
+                name, fitSettings, model = self._results[key]
+                self._results.move_to_end(key)
+                results[name] = model
+        self.hits += len(results)
+        psse = self._psse.get((sheet, interval))
+        if psse is not None:
+            values, fraction = psse
+            psse = ({name: values[name] for name in results if name in values}, fraction)
+        return settings, results, psse
+
+    def matching(self, sheet, interval, settings):
+        """Returns dict of all kept results of a sheet and interval fit with the same settings.
+
+        Includes results that are not shown, such as combinations that were
+        deselected. Indexed by name of the model/metric combination.
+        """
+        if settings is None:
+            return {}
+        results = {}
+        for key, (name, fitSettings, model) in list(self._results.items()):
+            if key[:2] == (sheet, interval) and fitSettings == settings:
+                self._results.move_to_end(key)
+                results[name] = model
+        self.hits += len(results)
+        return results
+
+    def info(self):
+        """Returns a dict describing the contents of the store."""
+        return {"results": len(self._results), "views": len(self._views), "maxResults": self.maxResults,
+                "hits": self.hits}
+
+    def clear(self):
+        """Removes all results, called when new data is imported."""
+        self._results.clear()
+        self._views.clear()
+        self._psse.clear()
+
+    def _evict(self):
+        """Removes least recently used results until at most maxResults are kept."""
+        while len(self._results) > self.maxResults:
+            self._results.popitem(last=False)
+
+
+# results of the application session
+retainedResults = RetainedResults()
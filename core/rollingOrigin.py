@@ -0,0 +1,145 @@
+"""
+Rolling origin evaluation of predictive accuracy.
+
+PSSE uses a single cut point: the model is fit to the first intervals and
+its predictions are compared to the rest. Rolling origin evaluation repeats
+this for many cut points, giving the PSSE and one step ahead error of each
+combination at each cut, a matrix of predictive accuracy over time.
+
+The cut points of a combination are evaluated in increasing order, each fit
+starting from the MLEs of the previous cut, which differ by one interval.
+To run in parallel, the cut points are split into contiguous blocks; the
+first cut of each block starts from the MLEs of the fit to all data.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from core.estimationPool import fitModel
+from core.dataSnapshot import asSnapshot
+from core.prediction import prediction_psse
+from core.goodnessOfFit import PSSE
+
+
+def cutPoints(n, start=0.5, stop=0.95, step=1):
+    """Numbers of intervals fit at each cut point.
+
+    Args:
+        n: Number of intervals of the data (int).
+        start: Fraction of the intervals at the first cut.
+        stop: Fraction of the intervals at the last cut.
+        step: Number of intervals between cuts (int).
+
+    Returns:
+        List of ints, at least 5 (the minimum used for PSSE) and at most
+        n - 1, so there is always an interval to predict.
+    """
+    first = max(5, math.ceil(n * start))
+    last = min(n - 1, math.floor(n * stop))
+    return list(range(first, last + 1, step))
+
+
+def cutBlocks(cuts, blocks):
+    """Splits cut points into at most blocks contiguous lists."""
+    blocks = max(1, min(blocks, len(cuts)))
+    return [list(block) for block in np.array_split(cuts, blocks)]
+
+
+def evaluateCuts(modelClass, metricNames, fullData, cuts, optimizer="reference", token=None, budget=None,
+                 initial=None):
+    """Fits a combination at each cut point, run by worker processes.
+
+    Each fit starts from the MLEs of the previous converged fit, the first
+    from initial.
+
+    Args:
+        modelClass: Model class (not instance) to fit.
+        metricNames: List of metric names (strings) used as covariates.
+        fullData: DataSnapshot (or pandas dataframe) of all intervals, the
+            data fit at each cut are views of it.
+        cuts: List of numbers of intervals to fit, increasing.
+        optimizer: Name of the optimization method, one of Model.optimizers.
+        token: CancellationToken for the fits, see fitModel.
+        budget: FitBudget limiting each fit, or None.
+        initial: Initial estimates of the first fit, or None.
+
+    Returns:
+        Numpy arrays of the PSSE, the one step ahead error (predicted minus
+        actual cumulative failures) and convergence of each cut.
+    """
+    fullData = asSnapshot(fullData, metricNames)
+    actual = fullData.cumulativeFailures
+    psse = np.zeros(len(cuts))
+    oneStep = np.zeros(len(cuts))
+    converged = np.zeros(len(cuts), dtype=bool)
+    for j, cut in enumerate(cuts):
+        m = fitModel(modelClass, metricNames, fullData.subset(cut), optimizer, token, budget, initial)
+        fitted = prediction_psse(m, fullData)
+        psse[j] = PSSE(fitted, actual, cut)
+        oneStep[j] = fitted[cut] - actual[cut]
+        converged[j] = m.converged
+        if m.converged:
+            initial = m.mle_array
+    return psse, oneStep, converged
+
+
+class RollingOriginResult:
+    """Matrices of rolling origin evaluation, combinations by cut points.
+
+    Attributes:
+        names: List of model/metric combination names, one per row.
+        cuts: List of numbers of intervals fit, one per column.
+        psse: Numpy array of PSSE values.
+        oneStep: Numpy array of one step ahead errors.
+        converged: Boolean numpy array, True where the fit converged.
+    """
+
+    def __init__(self, names, cuts):
+        """Initializes RollingOriginResult class, values are NaN until set."""
+        self.names = list(names)
+        self.cuts = list(cuts)
+        shape = (len(self.names), len(self.cuts))
+        self.psse = np.full(shape, np.nan)
+        self.oneStep = np.full(shape, np.nan)
+        self.converged = np.zeros(shape, dtype=bool)
+
+    def setBlock(self, name, cuts, psse, oneStep, converged):
+        """Stores the values returned by evaluateCuts for a block of cuts."""
+        row = self.names.index(name)
+        columns = [self.cuts.index(cut) for cut in cuts]
+        self.psse[row, columns] = psse
+        self.oneStep[row, columns] = oneStep
+        self.converged[row, columns] = converged
+
+    def meanPSSE(self):
+        """Mean PSSE over the cut points of each combination."""
+        return np.nanmean(self.psse, axis=1)
+
+    def oneStepRMSE(self):
+        """Root mean square one step ahead error of each combination."""
+        return np.sqrt(np.nanmean(self.oneStep**2, axis=1))
+
+    def summary(self):
+        """Dataframe of the mean PSSE, one step RMSE and its rank (1 is best)."""
+        frame = pd.DataFrame({"Combination": self.names,
+                              "Mean PSSE": self.meanPSSE(),
+                              "One-Step RMSE": self.oneStepRMSE(),
+                              "Converged Cuts": self.converged.sum(axis=1)})
+        frame["Rank"] = frame["One-Step RMSE"].rank(method="min", na_option="bottom").astype(int)
+        return frame
+
+    def frame(self, values):
+        """Dataframe of a matrix, with a column per cut point."""
+        frame = pd.DataFrame(values, columns=[str(cut) for cut in self.cuts])
+        frame.insert(0, "Combination", self.names)
+        return frame
+
+    def matrices(self):
+        """Dataframe of the PSSE and one step error matrices, for export."""
+        psse = self.frame(self.psse)
+        psse.insert(0, "Measure", "PSSE")
+        oneStep = self.frame(self.oneStep)
+        oneStep.insert(0, "Measure", "One-Step Error")
+        return pd.concat([psse, oneStep], ignore_index=True)
@@ -0,0 +1,161 @@
+"""
+Orders estimation jobs by their predicted cost.
+
+In a process pool the total time of a run is at least the time of the
+longest fit. If the longest fits start last, one worker is left running
+them alone after the others are idle. Jobs are sent to the pool longest
+first, using a cost model fitted to the runtimes of previous fits.
+
+The cost of a fit is modelled as
+
+    runtime = rate * n * (numParameters + numCovariates)**2
+
+where n is the number of intervals. A rate is learned for each model class
+and optimization method from the measured Model.runtime of its fits, and
+the runtimes of fits with the same class, method, number of covariates and
+intervals are also kept. The history is saved in the user cache directory,
+so predictions improve between sessions.
+"""
+
+# For handling debug output
+import logging as log
+
+import json
+import os
+
+from core.kernelCache import userCacheDirectory
+
+
+class CostModel:
+    """Predicts the runtime of a fit from the runtimes of previous fits.
+
+    Attributes:
+        path: Path (string) of the JSON file containing the history.
+        smoothing: Weight (float) of a new measurement in the exponential
+            moving averages of runtimes and rates.
+        rates: Dict of [rate, number of fits], indexed by model class name
+            and optimization method.
+        runtimes: Dict of [runtime, number of fits], indexed by model class
+            name, optimization method, number of covariates and intervals.
+    """
+
+    version = 1
+    defaultRate = 1.0e-5    # seconds per unit of work, before any fit is measured
+
+    def __init__(self, path=None, smoothing=0.3):
+        """Initializes CostModel class, loading the saved history.
+
+        Args:
+            path: History file, defaults to "cost_history.json" inside
+                userCacheDirectory().
+            smoothing: Weight of a new measurement in the moving averages.
+        """
+        if path is None:
+            path = os.path.join(userCacheDirectory(), "cost_history.json")
+        self.path = path
+        self.smoothing = smoothing
+        self.rates = {}
+        self.runtimes = {}
+        self.load()
+
+    def work(self, modelClass, numCovariates, n):
+        """Units of work of a fit, without the learned rate."""
+        numSymbols = len(modelClass.parameterEstimates) + numCovariates
+        return n * numSymbols**2
+
+    def predict(self, modelClass, numCovariates, n, optimizer="reference"):
+        """Predicted runtime (seconds) of a fit.
+
+        Uses the measured runtime of the same fit if available, otherwise the
+        rate of the model class and method, otherwise the mean rate of all
+        measured fits.
+
+        Args:
+            modelClass: Model class (not instance) that is fit.
+            numCovariates: Number of covariates of the fit (int).
+            n: Number of intervals of the data (int).
+            optimizer: Name of the optimization method.
+        """
+        name = modelClass.__name__
+        key = self._runtimeKey(name, optimizer, numCovariates, n)
+        if key in self.runtimes:
+            return self.runtimes[key][0]
+
+        rateKey = self._rateKey(name, optimizer)
+        if rateKey in self.rates:
+            rate = self.rates[rateKey][0]
+        elif self.rates:
+            rate = sum(rate for rate, count in self.rates.values()) / len(self.rates)
+        else:
+            rate = self.defaultRate
+        return rate * self.work(modelClass, numCovariates, n)
+
+    def record(self, model):
+        """Adds the measured runtime of a fitted model to the history.
+
+        Args:
+            model: Model object, after runEstimation.
+        """
+        name = model.__class__.__name__
+        runtime = float(model.runtime)
+        rate = runtime / self.work(model.__class__, model.numCovariates, model.n)
+        self._update(self.runtimes, self._runtimeKey(name, model.optimizer, model.numCovariates, model.n), runtime)
+        self._update(self.rates, self._rateKey(name, model.optimizer), rate)
+
+    def order(self, jobs, n, optimizer="reference"):
+        """Returns jobs sorted by predicted runtime, longest first.
+
+        Args:
+            jobs: List of (name, model class, metric combination) tuples.
+            n: Number of intervals of the data.
+            optimizer: Name of the optimization method.
+        """
+        return sorted(jobs, key=lambda job: self.predict(job[1], len(job[2]), n, optimizer), reverse=True)
+
+    def load(self):
+        """Reads the history file, starting empty if it can't be read."""
+        try:
+            with open(self.path) as stream:
+                history = json.load(stream)
+            if history.get("version") == self.version:
+                self.rates = history["rates"]
+                self.runtimes = history["runtimes"]
+        except (OSError, ValueError, KeyError):
+            self.rates = {}
+            self.runtimes = {}
+
+    def save(self):
+        """Writes the history file."""
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w") as stream:
+                json.dump({"version": self.version, "rates": self.rates, "runtimes": self.runtimes}, stream)
+        except OSError:
+            log.warning("Could not write cost history to %s.", self.path)
+
+    def clear(self):
+        """Removes all history, in memory and on disk."""
+        self.rates = {}
+        self.runtimes = {}
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _update(self, table, key, value):
+        """Exponential moving average of value, stored in table[key]."""
+        if key in table:
+            average, count = table[key]
+            table[key] = [average + self.smoothing * (value - average), count + 1]
+        else:
+            table[key] = [value, 1]
+
+    def _rateKey(self, name, optimizer):
+        return "{0}|{1}".format(name, optimizer)
+
+    def _runtimeKey(self, name, optimizer, numCovariates, n):
+        return "{0}|{1}|{2}|{3}".format(name, optimizer, numCovariates, n)
+
+
+# shared by all estimation runs of the application
+costModel = CostModel()
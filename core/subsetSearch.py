@@ -0,0 +1,226 @@
+"""
+Searches for good covariate subsets without fitting every combination.
+
+With k covariates there are 2**k combinations per model, too many to fit
+exhaustively once k is above 10 or so. A search fits combinations in
+rounds: each round proposes the combinations to fit next from the
+information criterion (AIC or BIC) of the combinations already fitted.
+The combinations of a round are independent, so they run in parallel.
+
+Forward stepwise starts from no covariates and adds the covariate that
+improves the criterion most, until no addition improves it. Backward
+stepwise starts from all covariates and removes them the same way. Best
+first expands the fitted combination with the lowest criterion by fitting
+its supersets with one covariate more; combinations whose criterion is
+worse than the best by more than a margin are pruned, so their supersets
+are only fitted if they have a better parent. The number of fits of best
+first can also be bounded.
+"""
+
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+searchStrategies = ["Exhaustive", "Forward Stepwise", "Backward Stepwise", "Best First"]
+criteria = ["AIC", "BIC"]
+
+
+def criterionValue(model, criterion="AIC"):
+    """Information criterion of a fitted model, infinite if not converged.
+
+    Args:
+        model: Model object, after runEstimation.
+        criterion: "AIC" or "BIC".
+    """
+    if not model.converged:
+        return math.inf
+    value = model.aicVal if criterion == "AIC" else model.bicVal
+    if not np.isfinite(value):
+        return math.inf
+    return float(value)
+
+
+def createSearch(strategy, metricNames, criterion="AIC", maxFits=None):
+    """Returns a SubsetSearch for a strategy name, one of searchStrategies.
+
+    Args:
+        strategy: Name of the search strategy, not "Exhaustive".
+        metricNames: List of candidate covariate names.
+        criterion: "AIC" or "BIC".
+        maxFits: Maximum number of fits of a best first search, or None.
+    """
+    if strategy == "Forward Stepwise":
+        return StepwiseSearch(metricNames, criterion, forward=True)
+    if strategy == "Backward Stepwise":
+        return StepwiseSearch(metricNames, criterion, forward=False)
+    if strategy == "Best First":
+        return BestFirstSearch(metricNames, criterion, maxFits=maxFits)
+    raise ValueError("Unknown subset search strategy '{0}'.".format(strategy))
+
+
+class SubsetSearch(ABC):
+    """Base class of searches over the subsets of the candidate covariates.
+
+    A search is driven in rounds: propose() returns the combinations to fit,
+    update() is called with each fitted model, then propose() is called
+    again until it returns an empty list.
+
+    Attributes:
+        metricNames: List of candidate covariate names. Combinations are
+            lists of names in the same order.
+        criterion: "AIC" or "BIC", lower is better.
+        fitted: Dict of criterion values, indexed by combination (tuple).
+    """
+
+    def __init__(self, metricNames, criterion="AIC"):
+        """Initializes SubsetSearch class."""
+        self.metricNames = list(metricNames)
+        self.criterion = criterion
+        self.fitted = {}
+
+    @property
+    def fits(self):
+        """Number of combinations fitted by the search."""
+        return len(self.fitted)
+
+    @property
+    def exhaustiveFits(self):
+        """Number of combinations an exhaustive search would fit."""
+        return 2**len(self.metricNames)
+
+    @abstractmethod
+    def propose(self):
+        """Returns list of combinations (lists) to fit next, empty when done."""
+        pass
+
+    def update(self, combination, model):
+        """Records the criterion of a fitted combination."""
+        self.fitted[tuple(combination)] = criterionValue(model, self.criterion)
+
+    def best(self):
+        """Returns the fitted combination (list) with the lowest criterion."""
+        if not self.fitted:
+            return None
+        return list(min(self.fitted, key=self.fitted.get))
+
+    def report(self):
+        """Text describing the number of fits and the best combination."""
+        best = self.best()
+        name = ", ".join(best) if best else "None"
+        return "{0} of {1} combinations fitted, best {2} ({3})".format(self.fits, self.exhaustiveFits,
+                                                                     self.criterion, name)
+
+    def value(self, combination):
+        """Criterion value of a fitted combination, infinite if not fitted."""
+        return self.fitted.get(tuple(combination), math.inf)
+
+    def _ordered(self, names):
+        """Tuple of names in the order of the candidate covariates."""
+        names = set(names)
+        return tuple(name for name in self.metricNames if name in names)
+
+    def _supersets(self, combination):
+        """Combinations with one candidate covariate more."""
+        return [self._ordered(combination + (name,)) for name in self.metricNames if name not in combination]
+
+    def _subsets(self, combination):
+        """Combinations with one covariate less."""
+        return [tuple(name for name in combination if name != removed) for removed in combination]
+
+    def _unfitted(self, combinations):
+        """Combinations not fitted yet, without duplicates, as lists."""
+        unique = []
+        for c in combinations:
+            if c not in self.fitted and c not in unique:
+                unique.append(c)
+        return [list(c) for c in unique]
+
+
+class StepwiseSearch(SubsetSearch):
+    """Forward or backward stepwise selection.
+
+    Each round fits the neighbours of the current combination, with one
+    covariate added (forward) or removed (backward). The search moves to
+    the best neighbour if it improves the criterion, and stops otherwise.
+
+    Attributes:
+        forward: True to add covariates, False to remove them.
+        current: Current combination (tuple), None before the first round.
+    """
+
+    def __init__(self, metricNames, criterion="AIC", forward=True):
+        """Initializes StepwiseSearch class."""
+        super().__init__(metricNames, criterion)
+        self.forward = forward
+        self.current = None
+        self._round = None
+        self._finished = False
+
+    def propose(self):
+        if self._finished:
+            return []
+        if self._round is None:
+            start = () if self.forward else tuple(self.metricNames)
+            self._round = [start]
+            return [list(start)]
+
+        # move to the best combination of the last round if it improves
+        best = min(self._round, key=self.value)
+        if self.current is None or self.value(best) < self.value(self.current):
+            self.current = best
+        else:
+            self._finished = True
+            return []
+
+        neighbours = self._supersets(self.current) if self.forward else self._subsets(self.current)
+        self._round = [c for c in neighbours if c not in self.fitted]
+        if not self._round:
+            self._finished = True
+        return [list(c) for c in self._round]
+
+
+class BestFirstSearch(SubsetSearch):
+    """Bounded best first search over supersets.
+
+    Each round expands the fitted combination with the lowest criterion
+    that has not been expanded, fitting its supersets with one covariate
+    more. Combinations that did not converge, or whose criterion is worse
+    than the best found by more than margin, are not expanded.
+
+    Attributes:
+        margin: Criterion difference (float) from the best combination
+            above which a combination is pruned. A difference of 2 is the
+            usual threshold of a substantially worse model.
+        maxFits: Maximum number of fits (int), or None for no limit.
+        expanded: Set of expanded combinations (tuples).
+    """
+
+    def __init__(self, metricNames, criterion="AIC", margin=2.0, maxFits=None):
+        """Initializes BestFirstSearch class."""
+        super().__init__(metricNames, criterion)
+        self.margin = margin
+        self.maxFits = maxFits
+        self.expanded = set()
+
+    def propose(self):
+        remaining = math.inf if self.maxFits is None else self.maxFits - self.fits
+        if remaining <= 0:
+            return []
+        if not self.fitted:
+            return [[]]
+
+        bound = min(self.fitted.values()) + self.margin
+        while True:
+            candidates = [c for c, value in self.fitted.items()
+                          if c not in self.expanded and np.isfinite(value) and value <= bound]
+            if not candidates:
+                return []
+            node = min(candidates, key=lambda c: (self.fitted[c], len(c)))
+            self.expanded.add(node)
+            children = self._unfitted(self._supersets(node))
+            if children:
+                if remaining < len(children):
+                    children = children[:int(remaining)]
+                return children
@@ -0,0 +1,68 @@
+"""
+Initial estimates of covariate subsets from their fitted nested parents.
+
+The covariate combinations of a model form a lattice ordered by inclusion.
+A model with covariates (E, F, C) reduces to (E, F) when the beta of C is
+0, so the MLEs of (E, F) with beta_C = 0 are a much better starting point
+than the default initial estimates. Combinations are fitted in increasing
+size, each starting from the best converged parent.
+"""
+
+import numpy as np
+
+
+def parentCombinations(metricNames, combinations):
+    """Returns the nested parents of a combination among the combinations.
+
+    Parents are the largest proper subsets of metricNames in combinations.
+    Usually they have one covariate less, but if those weren't selected the
+    next largest subsets are used.
+
+    Args:
+        metricNames: List of metric names of the combination.
+        combinations: List of metric name lists of all combinations fitted.
+
+    Returns:
+        List of metric name lists, empty if there are no proper subsets.
+    """
+    names = set(metricNames)
+    subsets = [c for c in combinations if set(c) < names]
+    if not subsets:
+        return []
+    size = max(len(c) for c in subsets)
+    return [c for c in subsets if len(c) == size]
+
+
+def bestParent(parents):
+    """Returns the converged parent model with the highest log-likelihood.
+
+    Args:
+        parents: List of fitted Model objects.
+
+    Returns:
+        Model object, or None if no parent converged.
+    """
+    converged = [m for m in parents if m.converged and np.isfinite(m.llfVal)]
+    if not converged:
+        return None
+    return max(converged, key=lambda m: m.llfVal)
+
+
+def nestedEstimates(parent, metricNames):
+    """Initial estimates of a combination from the MLEs of a nested parent.
+
+    Model parameters are the parent's MLEs. Betas of covariates in the
+    parent are its estimates, betas of the added covariates are 0, so the
+    initial log-likelihood equals the parent's.
+
+    Args:
+        parent: Fitted Model object of the same model class, with a subset
+            of the covariates.
+        metricNames: List of metric names of the combination.
+
+    Returns:
+        Numpy array of initial estimates.
+    """
+    betas = [parent.betas[parent.metricNames.index(name)] if name in parent.metricNames else 0.0
+             for name in metricNames]
+    return np.concatenate((np.asarray(parent.modelParameters, dtype=float), np.asarray(betas, dtype=float)))
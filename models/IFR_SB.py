@@ -9,6 +9,9 @@ class IFR_SB(Model):
     beta0 = 0.01
     parameterEstimates = (0.1, )
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10),)
+
     def hazardSymbolic(self, i, args):
         f = 1 - args[0] / i
         return f
@@ -17,3 +20,7 @@ class IFR_SB(Model):
         # alpha, beta
         f = 1 - args[0] / i
         return f
+
+    def hazardArray(self, i, args):
+        f = 1 - args[0] / i
+        return f
@@ -9,6 +9,9 @@ class IFR_Generalized_SB(Model):
     beta0 = 0.01
     parameterEstimates = (0.1, 0.1)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10), (0, None))
+
     def hazardSymbolic(self, i, args):
         # args -> (c, alpha)
         f = 1 - args[0] / ((i - 1) * args[1] + 1)
@@ -18,3 +21,8 @@ class IFR_Generalized_SB(Model):
         # args -> (c, alpha)
         f = 1 - args[0] / ((i - 1) * args[1] + 1)
         return f
+
+    def hazardArray(self, i, args):
+        # args -> (c, alpha)
+        f = 1 - args[0] / ((i - 1) * args[1] + 1)
+        return f
@@ -1,3 +1,5 @@
+import numpy as np
+
 from core.model import Model
 
 
@@ -9,6 +11,9 @@ class S_Distribution(Model):
     beta0 = 0.01
     parameterEstimates = (0.1, 0.1)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10), (1e-10, 1 - 1e-10))
+
     def hazardSymbolic(self, i, args):
         # args -> (p, pi)
         f = args[0] * (1 - args[1]**i)
@@ -18,3 +23,8 @@ class S_Distribution(Model):
         # args -> (p, pi)
         f = args[0] * (1 - args[1]**i)
         return f
+
+    def hazardArray(self, i, args):
+        # args -> (p, pi)
+        f = args[0] * (1 - np.power(args[1], i))
+        return f
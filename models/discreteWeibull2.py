@@ -1,3 +1,5 @@
+import numpy as np
+
 from core.model import Model
 
 
@@ -9,6 +11,9 @@ class DiscreteWeibull2(Model):
     beta0 = 0.01
     parameterEstimates = (0.994,)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10),)
+
     def hazardSymbolic(self, i, args):
         f = 1 - args[0]**(i**2 - (i - 1)**2)
         return f
@@ -16,3 +21,7 @@ class DiscreteWeibull2(Model):
     def hazardNumerical(self, i, args):
         f = 1 - args[0]**(i**2 - (i - 1)**2)
         return f
+
+    def hazardArray(self, i, args):
+        f = 1 - np.power(args[0], i**2 - (i - 1)**2)
+        return f
@@ -1,7 +1,10 @@
 import math
-import symengine
+import numpy as np
 
 from core.model import Model
+from core.lazyImport import LazyModule
+
+symengine = LazyModule("symengine")
 
 
 class DiscreteWeibullType3(Model):
@@ -12,6 +15,9 @@ class DiscreteWeibullType3(Model):
     beta0 = 0.01
     parameterEstimates = (0.1, 0.5)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, None), (None, None))
+
     def hazardSymbolic(self, i, args):
         # args -> (c, b)
         f = 1 - symengine.exp(-args[0] * i**args[1])
@@ -21,3 +27,8 @@ class DiscreteWeibullType3(Model):
         # args -> (c, b)
         f = 1 - math.exp(-args[0] * i**args[1])
         return f
+
+    def hazardArray(self, i, args):
+        # args -> (c, b)
+        f = 1 - np.exp(-args[0] * np.power(i, args[1]))
+        return f
@@ -1,3 +1,5 @@
+import numpy as np
+
 from core.model import Model
 
 
@@ -9,6 +11,9 @@ class Geometric(Model):
     beta0 = 0.01
     parameterEstimates = (0.01,)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10),)
+
     def hazardSymbolic(self, i, args):
         f = args[0]
         return f
@@ -16,3 +21,8 @@ class Geometric(Model):
     def hazardNumerical(self, i, args):
         f = args[0]
         return f
+
+    def hazardArray(self, i, args):
+        # constant hazard, same value at every interval
+        f = args[0] * np.ones_like(i, dtype=float)
+        return f
@@ -9,6 +9,9 @@ class NegativeBinomial2(Model):
     beta0 = 0.01
     parameterEstimates = (0.01,)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((1e-10, 1 - 1e-10),)
+
     def hazardSymbolic(self, i, args):
         f = (i * args[0]**2)/(1 + args[0] * (i - 1))
         return f
@@ -16,3 +19,7 @@ class NegativeBinomial2(Model):
     def hazardNumerical(self, i, args):
         f = (i * args[0]**2)/(1 + args[0] * (i - 1))
         return f
+
+    def hazardArray(self, i, args):
+        f = (i * args[0]**2)/(1 + args[0] * (i - 1))
+        return f
@@ -1,7 +1,10 @@
 import math
-import symengine
+import numpy as np
 
 from core.model import Model
+from core.lazyImport import LazyModule
+
+symengine = LazyModule("symengine")
 
 
 class TruncatedLogistic(Model):
@@ -12,6 +15,9 @@ class TruncatedLogistic(Model):
     beta0 = 0.01
     parameterEstimates = (0.1, 0.1)
 
+    # bounds that keep the hazard in (0, 1)
+    parameterBounds = ((None, None), (1e-10, None))
+
     def hazardSymbolic(self, i, args):
         # args -> (c, d)
         f = (1 - symengine.exp(-1/args[1]))/(1 + symengine.exp(- (i - args[0])/args[1]))
@@ -21,3 +27,8 @@ class TruncatedLogistic(Model):
         # args -> (c, d)
         f = (1 - math.exp(-1/args[1]))/(1 + math.exp(- (i - args[0])/args[1]))
         return f
+
+    def hazardArray(self, i, args):
+        # args -> (c, d)
+        f = (1 - np.exp(-1/args[1]))/(1 + np.exp(- (i - args[0])/args[1]))
+        return f
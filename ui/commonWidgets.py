@@ -1,9 +1,17 @@
+# For handling debug output
+import logging as log
+
 # To check platform
 import sys
 
+import math
+
+from concurrent.futures import as_completed, wait, FIRST_COMPLETED, CancelledError
+from concurrent.futures.process import BrokenProcessPool
+
 # PyQt5 imports for UI elements
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QTableView, \
-                            QProgressBar, QLabel
+                            QProgressBar, QLabel, QPushButton
 #Temp Imports
 ##########################
 from PyQt5.QtWidgets import QTableWidget, QAbstractScrollArea, QHeaderView
@@ -13,8 +21,15 @@ from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtCore import Qt
 
 from core.graphing import PlotWidget
-from core.prediction import prediction_psse
-from core.goodnessOfFit import PSSE
+from core.cancellation import CancellationToken, EstimationCancelled
+from core.estimationPool import PoolRun, fitModel, fitPSSE, failedModel
+from core.scheduler import costModel
+from core.resultCache import resultCache
+from core.fitResult import FitResult
+from core.dataSnapshot import DataSnapshot, asSnapshot
+from core.warmStart import parentCombinations, bestParent, nestedEstimates
+from core.rollingOrigin import RollingOriginResult, cutBlocks, evaluateCuts
+from core.subsetSearch import createSearch
 
 
 class PlotAndTable(QTabWidget):
@@ -141,27 +156,54 @@ class ComputeWidget(QWidget):
         results: pyqtSignal, emits dict containing model objects (with
             estimation results as properties) as values, indexed by name of
             model/metric combination.
+        modelResult: pyqtSignal, emits name of model/metric combination and
+            the model object as soon as the estimation of each combination is
+            complete, or when it is kept from a previous run.
         _progressBar: QProgressBar object, indicates the progress of the
             estimation calculations.
         _numCombinations: Total number of estimation calculations to perform.
             Equal to the number of models selected times the number of metric
-            combinations.
+            combinations, None for a subset search where it is not known in
+            advance.
         _label: QLabel object, text displayed on the progress window showing
             which model/metric combination is currently being calculated, and
             how many combinations have been calculated out of the total.
         _modelCount: The number of combinations that have completed the
             estimation calculations.
+        _calcName: Text describing the current calculation, shown on the
+            progress window.
+        _cancelButton: QPushButton object, stops the estimation. Results of
+            combinations that completed before are kept.
     """
     results = pyqtSignal(dict)
+    modelResult = pyqtSignal(str, object)
 
-    def __init__(self, modelsToRun, metricNames, data, parent=None):
+    def __init__(self, modelsToRun, metricNames, data, optimizer="reference", workers=1, budget=None,
+                 warmStart=False, search="Exhaustive", criterion="AIC", maxFits=None, previous=None, parent=None):
         """Initializes ComputeWidget class.
 
         Args:
             modelsToRun: List of Model objects used for estimation calculation.
-            metricNames: List of metric names as strings used for estimation
-                calculation.
+            metricNames: Iterable of metric combinations (lists of metric
+                names) used for estimation calculation, such as a list or a
+                CombinationSource.
             data: Pandas dataframe containing imported data.
+            optimizer: Name of the optimization method (string), one of
+                Model.optimizers.
+            workers: Number of worker processes (int). Estimation runs on the
+                calculation thread if 1.
+            budget: FitBudget limiting each fit, or None.
+            warmStart: If True, covariate subsets start from the MLEs of
+                their nested parents.
+            search: Name of the subset search strategy, one of
+                subsetSearch.searchStrategies.
+            criterion: Information criterion of the subset search, "AIC" or
+                "BIC".
+            maxFits: Maximum number of fits per model of a best first
+                search, or None.
+            previous: Dict of results of an earlier run with the same data
+                and settings, indexed by name of model/metric combination.
+                Selected combinations found in it are not fit again.
             parent:
         """
         super(ComputeWidget, self).__init__(parent)
@@ -171,18 +213,30 @@ class ComputeWidget(QWidget):
         self.setFixedSize(350, 200)
 
         self._progressBar = QProgressBar(self)
-        self._numCombinations = len(modelsToRun) * len(metricNames)
-        self._progressBar.setMaximum(self._numCombinations)
+        if search == "Exhaustive" and hasattr(metricNames, "__len__"):
+            self._numCombinations = len(modelsToRun) * len(metricNames)
+            self._progressBar.setMaximum(self._numCombinations)
+        else:
+            self._numCombinations = None
+            self._progressBar.setMaximum(0)     # busy indicator, number of fits not known
         self._label = QLabel()
         self._label.setText("Computing results...\nModels completed: {0}".format(0))
         self._modelCount = 0
+        self._calcName = ""
+
+        self._cancelButton = QPushButton("Cancel")
+        self._cancelButton.clicked.connect(self._cancel)
 
         layout.addWidget(self._label)
         layout.addWidget(self._progressBar)
+        layout.addWidget(self._cancelButton)
         layout.setAlignment(Qt.AlignVCenter)
         self.setWindowTitle("Processing...")
 
-        self.computeTask = TaskThread(modelsToRun, metricNames, data)
+        self.computeTask = TaskThread(modelsToRun, metricNames, data, optimizer, workers, budget, warmStart,
+                                      search, criterion, maxFits, previous)
+        self.computeTask.jobCount.connect(self._setJobCount)
+        self.computeTask.modelKept.connect(self.modelResult)     # not counted as completed
         self.computeTask.nextCalculation.connect(self._showCurrentCalculation)
         self.computeTask.modelFinished.connect(self._modelFinished)
         self.computeTask.taskFinished.connect(self._onFinished)
@@ -190,14 +244,41 @@ class ComputeWidget(QWidget):
 
         self.show()
 
+    def _setJobCount(self, count):
+        """Sets the number of combinations to fit, once known."""
+        self._numCombinations = count
+        self._progressBar.setMaximum(max(count, 1))
+        if count == 0:
+            self._progressBar.setValue(1)   # all combinations kept from the previous run
+        self._showCurrentCalculation(self._calcName)
+
     def _showCurrentCalculation(self, calcName):
         """Shows name of model combination currently being calculated """
-        self._label.setText("Computing {0}...\nModels completed: {1} of {2}".format(calcName, self._modelCount, self._numCombinations))
+        self._calcName = calcName
+        self._label.setText("Computing {0}...\n{1}".format(calcName, self._completedText()))
+
+    def _modelFinished(self, runName, model):
+        """Increments count of completed calculations, updates progress bar.
 
-    def _modelFinished(self):
-        """Increments count of completed calculations, updates progress bar."""
+        Emits the finished model so it can be shown before all calculations
+        are complete.
+        """
         self._modelCount += 1
         self._progressBar.setValue(self._modelCount)
+        self._showCurrentCalculation(self._calcName)
+        self.modelResult.emit(runName, model)
+
+    def _cancel(self):
+        """Stops the estimation, called when cancel button is clicked."""
+        self._cancelButton.setDisabled(True)
+        self._label.setText("Cancelling...\n{0}".format(self._completedText()))
+        self.computeTask.cancel()
+
+    def _completedText(self):
+        """Text showing the number of completed combinations."""
+        if self._numCombinations is None:
+            return "Models completed: {0}".format(self._modelCount)
+        return "Models completed: {0} of {1}".format(self._modelCount, self._numCombinations)
 
     def _onFinished(self, result):
         """Emits all estimation results when completed."""
@@ -209,138 +290,589 @@ class TaskThread(QThread):
     """Runs estimation calculations on separate thread.
 
     Attributes:
-        abort: Boolean indicating if the app has been closed. If True, the
-            thread should stop running.
-        modelFinished: pyqtSignal, emits when current model/metric calculation
-            is completed. Tells thread to begin calculation on next
-            combination.
+        abort: Boolean indicating if the estimation has been cancelled. If
+            True, the thread should stop running.
+        modelFinished: pyqtSignal, emits name of model/metric combination and
+            its FitResult record when the calculation of a combination is
+            completed.
         nextCalculation: pyqtSignal, emits string containing the model/metric
             combination name currently being calculated. Displayed on progress
             window.
-        taskFinished: pyqtSignal, emits dict containing model objects (with
-            estimation results as properties) as values, indexed by name of
-            model/metric combination.
+        jobCount: pyqtSignal, emits the number of combinations that will be
+            fit by an exhaustive run, once the selected combinations are read.
+        modelKept: pyqtSignal, emits name of model/metric combination and the
+            FitResult record for each selected combination kept from
+            previous, before any combination is fit.
+        taskFinished: pyqtSignal, emits dict containing FitResult records
+            as values, indexed by name of model/metric combination. Includes the selected combinations
+            kept from previous. If cancelled, only the combinations that
+            completed are included.
         _modelsToRun: List of Model objects used for estimation calculation.
-        _metricNames: List of metric names as strings used for estimation
-            calculation.
+        _metricNames: Iterable of metric combinations used for estimation
+            calculation, read once.
         _data: Pandas dataframe containing imported data.
+        _optimizer: Name of the optimization method used by each fit.
+        _workers: Number of worker processes. If greater than 1, combinations
+            are fit in a process pool and finish in any order.
+        _budget: FitBudget limiting each fit, or None.
+        _warmStart: If True, combinations are fit in increasing number of
+            covariates, each starting from the MLEs of its best converged
+            nested parent.
+        _parents: Dict of the run names of the nested parents of each
+            combination, empty if not warm started.
+        _search: Name of the subset search strategy. If "Exhaustive", the
+            selected combinations are fit, otherwise the covariates of the
+            selected combinations are the candidates of a search.
+        _criterion: Information criterion of the subset search.
+        _maxFits: Maximum number of fits per model of a best first search,
+            or None.
+        searches: Dict of the SubsetSearch of each model class, empty if
+            exhaustive.
+        _previous: Dict of results of an earlier run with the same inputs,
+            indexed by run name. Used by exhaustive runs only, since a
+            subset search decides which combinations to fit as it runs.
+        _snapshot: DataSnapshot of the data fit, shared by the fits on this
+            thread and the FitResult records of all combinations. Jobs of
+            the process pool are sent a pickled copy.
+        _token: CancellationToken of fits run on this thread.
+        _poolToken: CancellationToken of the jobs of this thread in the
+            process pool, if used.
     """
     taskFinished = pyqtSignal(dict)
-    modelFinished = pyqtSignal()
+    modelFinished = pyqtSignal(str, object)
     nextCalculation = pyqtSignal(str)
+    jobCount = pyqtSignal(int)
+    modelKept = pyqtSignal(str, object)
 
-    def __init__(self, modelsToRun, metricNames, data):
+    def __init__(self, modelsToRun, metricNames, data, optimizer="reference", workers=1, budget=None, warmStart=False,
+                 search="Exhaustive", criterion="AIC", maxFits=None, previous=None):
         """Initializes TaskThread class.
 
         Args:
             modelsToRun: List of Model objects used for estimation calculation.
-            metricNames: List of metric names as strings used for estimation
-                calculation.
+            metricNames: Iterable of metric combinations (lists of metric
+                names) used for estimation calculation, such as a list, a
+                CombinationSource or a generator.
             data: Pandas dataframe containing imported data (getData() method already
                 called prior to being passed)
+            optimizer: Name of the optimization method (string), one of
+                Model.optimizers.
+            workers: Number of worker processes (int).
+            budget: FitBudget limiting each fit, or None.
+            warmStart: If True, covariate subsets start from the MLEs of
+                their nested parents.
+            search: Name of the subset search strategy, one of
+                subsetSearch.searchStrategies.
+            criterion: Information criterion of the subset search.
+            maxFits: Maximum number of fits per model of a best first
+                search, or None.
+            previous: Dict of results of an earlier run with the same data
+                and settings, indexed by run name, or None.
         """
         super().__init__()
-        self.abort = False  # True when app closed, so thread stops running
+        self.abort = False  # True when cancelled or app closed, so thread stops running
         self._modelsToRun = modelsToRun
         self._metricNames = metricNames
         self._data = data
+        self._optimizer = optimizer
+        self._workers = workers
+        self._budget = budget
+        self._warmStart = warmStart
+        self._parents = {}
+        self._search = search
+        self._criterion = criterion
+        self._maxFits = maxFits
+        self.searches = {}
+        self._previous = previous or {}
+        self._snapshot = None
+        self._token = CancellationToken()
+        self._poolToken = None
+
+    def cancel(self):
+        """Stops the estimation, including fits that are running.
+
+        Can be called from any thread. Running fits stop at their next
+        optimizer iteration.
+        """
+        self.abort = True
+        self._token.cancel()
+        if self._poolToken is not None:
+            self._poolToken.cancel()
 
     def run(self):
         """Performs estimation for models/metrics.
 
         Called when thread is started.
         """
+        # arrays of the data are created once, used by all fits on this
+        # thread and pickled with each job sent to the pool
+        data = self._snapshot = self._data.getSnapshot()
         result = {}
-        for model in self._modelsToRun:
+        if self._search == "Exhaustive":
+            # combinations are read once, they may be generated
+            modelJobs = {model: [] for model in self._modelsToRun}
             for metricCombination in self._metricNames:
-                # check if application has been closed
-                if self.abort:
-                    return  # get out of run method
-                metricNames = ", ".join(metricCombination)
                 if (metricCombination == ["None"]):
                     metricCombination = []
+                for model in self._modelsToRun:
+                    modelJobs[model].append((self._runName(model, metricCombination), model, list(metricCombination)))
+            jobs = [job for model in self._modelsToRun for job in modelJobs[model]]
+
+            # selected combinations fitted by the previous run are kept, and
+            # can be the nested parents of the new ones
+            kept = [job for job in jobs if job[0] in self._previous]
+            for runName, model, metricCombination in kept:
+                result[runName] = self._previous[runName]
+                self.modelKept.emit(runName, result[runName])
+            self.jobCount.emit(len(jobs) - len(kept))
+            self._runJobs([job for job in jobs if job[0] not in result], data, result, kept)
+        else:
+            jobs = self._runSearch(data, result)
+        costModel.save()    # runtimes of this run improve the next predictions
+
+        # keep combinations in the order they were selected, if cancelled
+        # only the completed combinations are emitted
+        self.taskFinished.emit({runName: result[runName] for runName, model, metricCombination in jobs
+                                if runName in result})
+
+    def _runName(self, model, metricCombination):
+        """Name of a model/metric combination, used in tab 2 to 4 side menus."""
+        metricNames = ", ".join(metricCombination) if metricCombination else "None"
+        return "{0} ({1})".format(model.shortName, metricNames)  # "Model (Metric1, Metric2, ...)"
+
+    def _runJobs(self, jobs, data, result, fitted=()):
+        """Fits jobs in the process pool or on this thread.
 
-                m = model(data=self._data.getData(), metricNames=metricCombination)
-
-                # this is the name used in tab 2 and tab 4 side menus
-                # use shortened name
-                runName = "{0} ({1})".format(m.shortName, metricNames)  # "Model (Metric1, Metric2, ...)"
-                self.nextCalculation.emit(runName)
-
-                # THIS IS WHERE SUBSETS OF COVARIATE DATA CAN BE PASSED
-                # for now, just pass all
-                m.runEstimation(m.covariateData)
-                result[runName] = m
-                self.modelFinished.emit()
-        #print("_____________________________________________")
-
-        self.taskFinished.emit(result)
+        Args:
+            jobs: List of (run name, model class, metric combination) tuples.
+            data: DataSnapshot of the data to fit.
+            result: Dict of FitResult records, indexed by run name. Fitted
+                jobs are added.
+            fitted: Jobs fitted by earlier calls, used as nested parents.
+        """
+        if self._warmStart:
+            self._parents = self._nestedParents(list(fitted) + jobs)
+        jobs = self._cachedResults(jobs, data, result)
+        if self._workers > 1 and len(jobs) > 1:
+            try:
+                with PoolRun(self._workers) as run:
+                    self._runPool(jobs, data, result, run)
+            except BrokenProcessPool:
+                log.warning("Estimation worker process stopped, fitting remaining combinations on this thread.")
+        remaining = [job for job in jobs if job[0] not in result]
+        if self._warmStart:
+            remaining.sort(key=lambda job: len(job[2]))   # parents before subsets
+        self._runSerial(remaining, data, result)
+
+    def _cachedResults(self, jobs, data, result):
+        """Adds results of jobs found in the result cache, returns the jobs to fit.
+
+        Jobs with nested parents are looked up when they are fit, since
+        their initial estimates are only known once the parents are fitted.
+        """
+        remaining = []
+        for job in jobs:
+            runName, model, metricCombination = job
+            if self.abort:
+                return []
+            if self._parents.get(runName) or not self._addCached(runName, model, metricCombination, data, result):
+                remaining.append(job)
+        return remaining
+
+    def _addCached(self, runName, model, metricCombination, data, result, initial=None):
+        """Adds the cached result of a job to result, returns False if it isn't cached."""
+        cached = resultCache.get(model, metricCombination, data, self._optimizer, self._budget, initial)
+        if cached is None:
+            return False
+        self._addResult(runName, cached, result)
+        return True
+
+    def _addResult(self, runName, model, result):
+        """Adds the record of a fitted model to result, the Model object is not kept."""
+        result[runName] = FitResult.fromModel(model, self._snapshot)
+        self.modelFinished.emit(runName, result[runName])
+
+    def _runSearch(self, data, result):
+        """Fits the combinations proposed by a subset search of each model.
+
+        Each round fits the combinations proposed by all models together,
+        so they run in parallel.
+
+        Returns:
+            List of fitted jobs, in the order they were proposed.
+        """
+        selected = set()
+        for combination in self._metricNames:
+            selected.update(combination)
+        candidates = [name for name in self._data.metricNames if name in selected]
+        self.searches = {model: createSearch(self._search, candidates, self._criterion, self._maxFits)
+                         for model in self._modelsToRun}
+        fitted = []
+        while not self.abort:
+            jobs = [(self._runName(model, combination), model, combination)
+                    for model, search in self.searches.items() for combination in search.propose()]
+            if not jobs:
+                break
+            self._runJobs(jobs, data, result, fitted)
+            for runName, model, combination in jobs:
+                if runName in result:
+                    self.searches[model].update(combination, result[runName])
+            fitted.extend(jobs)
+        for model, search in self.searches.items():
+            log.info("%s %s: %s", model.shortName, self._search, search.report())
+        return fitted
+
+    def searchReport(self):
+        """Text describing the fits of each subset search, empty if exhaustive."""
+        return "; ".join("{0} {1}: {2}".format(model.shortName, self._search, search.report())
+                         for model, search in self.searches.items())
+
+    def _runSerial(self, jobs, data, result):
+        """Fits each job on this thread, adding their records to result."""
+        for runName, model, metricCombination in jobs:
+            # check if application has been closed
+            if self.abort:
+                return
+            self.nextCalculation.emit(runName)
+
+            # THIS IS WHERE SUBSETS OF COVARIATE DATA CAN BE PASSED
+            # for now, just pass all
+            initial = self._initialEstimates(runName, metricCombination, result)
+            if self._parents.get(runName) and self._addCached(runName, model, metricCombination, data, result,
+                                                              initial):
+                continue
+            try:
+                fitted = fitModel(model, metricCombination, data, self._optimizer, self._token,
+                                  self._budget, initial)
+            except EstimationCancelled:
+                return
+            costModel.record(fitted)
+            resultCache.put(fitted, initial)
+            self._addResult(runName, fitted, result)
+
+    def _runPool(self, jobs, data, result, run):
+        """Fits jobs in worker processes, adding records to result as they finish.
+
+        Jobs are submitted longest first according to the cost model, so
+        the longest fits don't run alone at the end. If warm started, a job
+        is only submitted when its nested parents are fitted. A fit that
+        raises an error is added as not converged.
+        """
+        self.nextCalculation.emit("{0} combinations on {1} processes".format(len(jobs), self._workers))
+        pool = run.pool
+        self._poolToken = run.token
+        if self.abort:
+            return
+        pending = costModel.order(jobs, len(data), self._optimizer)
+        futures = {}
+        while pending or futures:
+            ready = [job for job in pending if all(name in result for name in self._parents.get(job[0], []))]
+            for job in ready:
+                runName, model, metricCombination = job
+                pending.remove(job)
+                initial = self._initialEstimates(runName, metricCombination, result)
+                if self._parents.get(runName) and self._addCached(runName, model, metricCombination, data,
+                                                                  result, initial):
+                    continue
+                future = pool.submit(fitModel, model, metricCombination, data, self._optimizer,
+                                     self._poolToken, self._budget, initial)
+                futures[future] = (runName, model, metricCombination, initial)
+
+            done, notDone = wait(futures, return_when=FIRST_COMPLETED)
+            # check if estimation has been cancelled
+            if self.abort:
+                for f in futures:
+                    f.cancel()
+                # running fits stop at their next iteration, wait so the
+                # workers are free for the next run
+                wait(futures)
+                return
+            for future in done:
+                runName, model, metricCombination, initial = futures.pop(future)
+                try:
+                    fitted = future.result()
+                except BrokenProcessPool:
+                    raise
+                except (EstimationCancelled, CancelledError):
+                    continue    # pool stopped, fit on this thread
+                except Exception:
+                    log.warning("Fit of %s failed, added as not converged.", runName, exc_info=True)
+                    self._addResult(runName, failedModel(model, metricCombination, data, self._optimizer,
+                                                         self._budget), result)
+                    continue
+                costModel.record(fitted)
+                resultCache.put(fitted, initial)
+                self._addResult(runName, fitted, result)
+
+    def _nestedParents(self, jobs):
+        """Returns dict of the run names of the nested parents of each job."""
+        parents = {}
+        for runName, model, metricCombination in jobs:
+            combinations = [c for r, m, c in jobs if m is model]
+            parentCombos = parentCombinations(metricCombination, combinations)
+            parents[runName] = [r for r, m, c in jobs if m is model and c in parentCombos]
+        return parents
+
+    def _initialEstimates(self, runName, metricCombination, result):
+        """Initial estimates from the best fitted parent, None if there is none."""
+        parent = bestParent([result[name] for name in self._parents.get(runName, []) if name in result])
+        if parent is None:
+            return None
+        return nestedEstimates(parent, metricCombination)
 
 
 class PSSEThread(QThread):
-    """Runs estimation calculations on separate thread.
+    """Refits estimation results to a subset of the data, to calculate PSSE.
+
+    Each combination starts from the MLEs of its fit to all of the data,
+    which are close to the MLEs of the subset. Fits run in the process pool
+    of the estimation if more than one worker is used, so the compiled
+    kernels of the workers are reused.
 
     Attributes:
-        abort: Boolean indicating if the app has been closed. If True, the
-            thread should stop running.
-        modelFinished: pyqtSignal, emits when current model/metric calculation
-            is completed. Tells thread to begin calculation on next
-            combination.
-        taskFinished: pyqtSignal, emits dict containing model objects (with
-            estimation results as properties) as values, indexed by name of
+        abort: Boolean indicating if the PSSE has been cancelled or the app
+            has been closed. If True, the thread should stop running.
+        results: pyqtSignal, emits dict containing PSSE values, indexed by name
+            of model/metric combination, and the fraction of the data used.
+        _estimationResults: Dict of FitResult records, indexed by name of
             model/metric combination.
-        _modelsToRun: List of Model objects used for estimation calculation.
-        _metricNames: List of metric names as strings used for estimation
-            calculation.
-        _data: Pandas dataframe containing imported data.
+        _data: Data object containing imported data.
+        _fraction: Fraction of the intervals used for the refits.
+        _reused: Dict of PSSE values of combinations that are not refit,
+            computed with the same fraction by an earlier run.
+        _optimizer: Name of the optimization method used by each fit.
+        _budget: FitBudget limiting each fit, or None.
+        _workers: Number of worker processes.
+        _token: CancellationToken of fits run on this thread.
+        _poolToken: CancellationToken of the jobs of this thread in the
+            process pool, if used.
     """
-    results = pyqtSignal(dict)
+    results = pyqtSignal(dict, float)
 
-    def __init__(self, modelsToRun, metricNames, data, fraction):
-        """Initializes TaskThread class.
+    def __init__(self, estimationResults, data, fraction, optimizer="reference", budget=None, workers=1, reused=None):
+        """Initializes PSSEThread class.
 
         Args:
-            modelsToRun: List of Model objects used for estimation calculation.
-            metricNames: List of metric names as strings used for estimation
-                calculation.
-            data: Pandas dataframe containing imported data (getData() method already
-                called prior to being passed)
+            estimationResults: Dict of FitResult records (or fitted Model
+                objects), indexed by name of model/metric combination.
+            data: Data object containing imported data.
             fraction: fraction of data to use for PSSE
+            optimizer: Name of the optimization method (string), one of
+                Model.optimizers.
+            budget: FitBudget limiting each fit, or None.
+            workers: Number of worker processes (int).
+            reused: Dict of PSSE values of combinations that are not refit,
+                or None.
         """
         super().__init__()
-        self.abort = True  # True when app closed, so thread stops running
-        self._modelsToRun = modelsToRun
-        self._metricNames = metricNames
+        self.abort = False  # True when cancelled or app closed, so thread stops running
+        self._estimationResults = dict(estimationResults)     # not changed by a new estimation
         self._data = data
         self._fraction = fraction
+        self._reused = dict(reused or {})
+        self._optimizer = optimizer
+        self._budget = budget
+        self._workers = workers
+        self._token = CancellationToken()
+        self._poolToken = None
+
+    def cancel(self):
+        """Stops the PSSE fits, results are not emitted."""
+        self.abort = True
+        self._token.cancel()
+        if self._poolToken is not None:
+            self._poolToken.cancel()
 
     def run(self):
-        """Performs estimation for models/metrics.
+        """Performs PSSE fits of all estimation results.
 
         Called when thread is started.
         """
-        result = {}
-        for model in self._modelsToRun:
-            for metricCombination in self._metricNames:
-                # check if application has been closed
-                if self.abort:
-                    return  # get out of run method
-                metricNames = ", ".join(metricCombination)
-                if (metricCombination == ["None"]):
-                    metricCombination = []
+        jobs = []
+        for runName, model in self._estimationResults.items():
+            if runName in self._reused:
+                continue
+            # start from the estimates of all data, if they converged
+            initial = model.mle_array if model.converged else None
+            jobs.append((runName, model.modelClass, model.metricNames, initial))
+
+        subset = DataSnapshot(self._data.getDataSubset(self._fraction))
+        fullData = self._data.getSnapshot()
+        result = dict(self._reused)
+        if self._workers > 1 and len(jobs) > 1:
+            try:
+                with PoolRun(self._workers) as run:
+                    self._runPool(jobs, subset, fullData, result, run)
+            except BrokenProcessPool:
+                log.warning("Estimation worker process stopped, fitting remaining PSSE combinations on this thread.")
+        for runName, modelClass, metricCombination, initial in jobs:
+            # check if PSSE cancelled or application has been closed
+            if self.abort:
+                return  # get out of run method
+            if runName in result:
+                continue
+            try:
+                result[runName] = fitPSSE(modelClass, metricCombination, subset, fullData, self._optimizer,
+                                          self._token, self._budget, initial)
+            except EstimationCancelled:
+                return
+            except Exception:
+                log.warning("PSSE fit of %s failed.", runName, exc_info=True)
+                result[runName] = ""
+
+        self.results.emit(result, self._fraction)
+
+    def _runPool(self, jobs, subset, fullData, result, run):
+        """Fits jobs in worker processes, adding PSSE values to result.
+
+        The PSSE of a fit that raises an error is left empty.
+        """
+        pool = run.pool
+        self._poolToken = run.token
+        if self.abort:
+            return
+        futures = {pool.submit(fitPSSE, modelClass, metricCombination, subset, fullData, self._optimizer,
+                               self._poolToken, self._budget, initial): runName
+                   for runName, modelClass, metricCombination, initial in jobs}
+        for future in as_completed(futures):
+            if self.abort:
+                for f in futures:
+                    f.cancel()
+                wait(futures)
+                return
+            runName = futures[future]
+            try:
+                result[runName] = future.result()
+            except BrokenProcessPool:
+                raise
+            except (EstimationCancelled, CancelledError):
+                continue    # pool stopped, fit on this thread
+            except Exception:
+                log.warning("PSSE fit of %s failed.", runName, exc_info=True)
+                result[runName] = ""
+
+
+class RollingOriginThread(QThread):
+    """Runs rolling origin evaluation of estimation results on separate thread.
+
+    The cut points of each combination are split into contiguous blocks, so
+    blocks run in parallel in the process pool while the fits within a block
+    are warm started from the previous cut.
 
-                m = model(data=self._data.getDataSubset(self._fraction), metricNames=metricCombination)
+    Attributes:
+        abort: Boolean indicating if the evaluation has been cancelled or the
+            app has been closed. If True, the thread should stop running.
+        results: pyqtSignal, emits RollingOriginResult when complete.
+        _estimationResults: Dict of FitResult records, indexed by name of
+            model/metric combination.
+        _fullData: DataSnapshot of all intervals.
+        _cuts: List of numbers of intervals fit at each cut point.
+        _optimizer: Name of the optimization method used by each fit.
+        _budget: FitBudget limiting each fit, or None.
+        _workers: Number of worker processes.
+        _token: CancellationToken of fits run on this thread.
+        _poolToken: CancellationToken of the jobs of this thread in the
+            process pool, if used.
+    """
+    results = pyqtSignal(object)
+
+    def __init__(self, estimationResults, fullData, cuts, optimizer="reference", budget=None, workers=1):
+        """Initializes RollingOriginThread class.
 
-                # this is the name used in tab 2 and tab 4 side menus
-                # use shortened name
-                runName = "{0} ({1})".format(m.shortName, metricNames)  # "Model (Metric1, Metric2, ...)"
+        Args:
+            estimationResults: Dict of FitResult records (or fitted Model
+                objects), indexed by name of model/metric combination.
+            fullData: DataSnapshot or pandas dataframe of all intervals.
+            cuts: List of numbers of intervals fit at each cut point.
+            optimizer: Name of the optimization method (string), one of
+                Model.optimizers.
+            budget: FitBudget limiting each fit, or None.
+            workers: Number of worker processes (int).
+        """
+        super().__init__()
+        self.abort = False
+        self._estimationResults = dict(estimationResults)
+        self._fullData = asSnapshot(fullData)     # arrays shared by all cuts
+        self._cuts = cuts
+        self._optimizer = optimizer
+        self._budget = budget
+        self._workers = workers
+        self._token = CancellationToken()
+        self._poolToken = None
+
+    def cancel(self):
+        """Stops the evaluation, results are not emitted."""
+        self.abort = True
+        self._token.cancel()
+        if self._poolToken is not None:
+            self._poolToken.cancel()
 
-                # THIS IS WHERE SUBSETS OF COVARIATE DATA CAN BE PASSED
-                # for now, just pass all
-                m.runEstimation(m.covariateData)
+    def run(self):
+        """Evaluates all combinations at all cut points.
 
-                fitted_array = prediction_psse(m, self._data)
-                psse_val = PSSE(fitted_array, self._data.getData()['CFC'].values, m.n)
-                result[runName] = psse_val
+        Called when thread is started.
+        """
+        result = RollingOriginResult(self._estimationResults.keys(), self._cuts)
+
+        # split cuts so there are about two blocks per worker
+        blocks = 1
+        if self._workers > 1:
+            blocks = math.ceil(2 * self._workers / max(1, len(self._estimationResults)))
+        jobs = []
+        for runName, model in self._estimationResults.items():
+            initial = model.mle_array if model.converged else None
+            for cuts in cutBlocks(self._cuts, blocks):
+                jobs.append((runName, model.modelClass, model.metricNames, cuts, initial))
+
+        done = set()
+        if self._workers > 1 and len(jobs) > 1:
+            try:
+                with PoolRun(self._workers) as run:
+                    self._runPool(jobs, result, done, run)
+            except BrokenProcessPool:
+                log.warning("Estimation worker process stopped, evaluating remaining cut points on this thread.")
+        for index, (runName, modelClass, metricNames, cuts, initial) in enumerate(jobs):
+            if self.abort:
+                return
+            if index in done:
+                continue
+            try:
+                values = evaluateCuts(modelClass, metricNames, self._fullData, cuts, self._optimizer,
+                                      self._token, self._budget, initial)
+            except EstimationCancelled:
+                return
+            result.setBlock(runName, cuts, *values)
 
         self.results.emit(result)
+
+    def _runPool(self, jobs, result, done, run):
+        """Evaluates blocks of cut points in worker processes.
+
+        Adds values to result, and the indices of finished jobs to done. The
+        values of a block that raises an error are left NaN.
+        """
+        pool = run.pool
+        self._poolToken = run.token
+        if self.abort:
+            return
+        futures = {pool.submit(evaluateCuts, modelClass, metricNames, self._fullData, cuts, self._optimizer,
+                               self._poolToken, self._budget, initial): index
+                   for index, (runName, modelClass, metricNames, cuts, initial)
+                   in sorted(enumerate(jobs), key=lambda job: -job[1][3][-1])}
+        for future in as_completed(futures):
+            if self.abort:
+                for f in futures:
+                    f.cancel()
+                wait(futures)
+                return
+            index = futures[future]
+            runName, modelClass, metricNames, cuts, initial = jobs[index]
+            try:
+                result.setBlock(runName, cuts, *future.result())
+            except BrokenProcessPool:
+                raise
+            except (EstimationCancelled, CancelledError):
+                continue    # pool stopped, evaluate on this thread
+            except Exception:
+                log.warning("Rolling origin fits of %s failed at cuts %s.", runName, cuts, exc_info=True)
+            done.add(index)
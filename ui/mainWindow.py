@@ -12,13 +12,14 @@ import sys
 
 # PyQt5 imports for UI elements
 from PyQt5.QtWidgets import QMainWindow, qApp, QWidget, QTabWidget, \
-                            QVBoxLayout, QAction, QActionGroup, QFileDialog
+                            QVBoxLayout, QAction, QActionGroup, QFileDialog, \
+                            QMessageBox
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QIcon
 
 # Local imports
 import models
-from ui.commonWidgets import ComputeWidget, PSSEThread
+from ui.commonWidgets import ComputeWidget, PSSEThread, RollingOriginThread
 from ui.tab1 import Tab1
 from ui.tab2 import Tab2
 from ui.tab3 import Tab3
@@ -26,7 +27,14 @@ from ui.tab4 import Tab4
 from core.dataClass import Data
 from core.allocation import EffortAllocation
 from core.goodnessOfFit import PSSE
+from core.kernelCache import kernelCache
+from core.resultCache import resultCache
+from core.retainedResults import retainedResults
+from core.estimationPool import shutdownPool
+from core.project import Project
+import core.project as project
 import core.prediction as prediction
+import core.rollingOrigin as rollingOrigin
 
 
 class MainWindow(QMainWindow):
@@ -74,6 +82,13 @@ class MainWindow(QMainWindow):
         allocationResults: A dict containing the results of the effort
             allocation, indexed by the name of the model/metric combination
             as a string.
+        optimizer: Name of the optimization method (string) selected for the
+            last estimation, also used for the PSSE fits.
+        budget: FitBudget of each fit of the last estimation, or None.
+        workers: Number of worker processes of the last estimation, also used
+            for the PSSE fits.
+        rollingOriginResult: RollingOriginResult of the last rolling origin
+            evaluation, or None.
     """
 
     # signals
@@ -97,6 +112,16 @@ class MainWindow(QMainWindow):
         # set data
         self.data = Data()
         self.selectedModelNames = []
+        self.optimizer = "reference"   # optimization method of the last estimation
+        self.budget = None              # limits of each fit of the last estimation
+        self.workers = 1                # worker processes of the last estimation
+        self.estimationSheet = 0        # sheet the estimation results are fit to
+        self.estimationInterval = 0     # and number of intervals fit
+        self.estimationSettings = None  # estimation settings of the results shown
+        self.rollingOriginResult = None
+        self.psseResults = {}
+        self.psseFraction = None        # fraction of the data fit for psseResults
+        self.allocationResults = {}
 
         # flags
         self.dataLoaded = False
@@ -114,6 +139,7 @@ class MainWindow(QMainWindow):
         self._main.tab2.sideMenu.intensityChangedSignal.connect(self.updatePredictionPlotIntensity)
         self._main.tab3.sideMenu.modelChangedSignal.connect(self.changePlot2AndUpdateComparisonTable)
         self._main.tab3.sideMenu.runPSSESignal.connect(self.runPSSE)
+        self._main.tab3.sideMenu.runRollingOriginSignal.connect(self.runRollingOrigin)
         self._main.tab3.sideMenu.spinBoxChangedSignal.connect(self.runGoodnessOfFit)
         self._main.tab4.sideMenu.runAllocation1Signal.connect(self.runAllocation1)
         self._main.tab4.sideMenu.runAllocation2Signal.connect(self.runAllocation2)
@@ -175,6 +201,15 @@ class MainWindow(QMainWindow):
         openFile.setStatusTip("Import data file")
         openFile.triggered.connect(self.fileOpened)
 
+        # projects
+        openProject = QAction("Open Project...", self)
+        openProject.setStatusTip("Restore data and results saved in a project file")
+        openProject.triggered.connect(self.openProject)
+        saveProject = QAction("Save Project...", self)
+        saveProject.setShortcut("Ctrl+S")
+        saveProject.setStatusTip("Save data and results to a project file")
+        saveProject.triggered.connect(self.saveProject)
+
         # export table (tab 2)
         exportTable2 = QAction("Export Table (Tab 2)", self)
         # exportTable.setShortcut("Ctrl+E")
@@ -187,6 +222,21 @@ class MainWindow(QMainWindow):
         exportTable3.setStatusTip("Export tab 3 table to csv")
         exportTable3.triggered.connect(self.exportTable3)
 
+        # export rolling origin matrices (tab 3)
+        exportRollingOrigin = QAction("Export Rolling-Origin Matrices", self)
+        exportRollingOrigin.setStatusTip("Export PSSE and one step ahead error at each cut point to csv")
+        exportRollingOrigin.triggered.connect(self.exportRollingOrigin)
+
+        # kernel cache
+        kernelCacheAction = QAction("Kernel Cache...", self)
+        kernelCacheAction.setStatusTip("Inspect or clear cached gradient kernels")
+        kernelCacheAction.triggered.connect(self.showKernelCache)
+
+        # result cache
+        resultCacheAction = QAction("Result Cache...", self)
+        resultCacheAction.setStatusTip("Inspect or clear cached estimation results")
+        resultCacheAction.triggered.connect(self.showResultCache)
+
         # exit
         exitApp = QAction("Exit", self)
         exitApp.setShortcut("Ctrl+Q")
@@ -195,9 +245,15 @@ class MainWindow(QMainWindow):
 
         # add actions to file menu
         fileMenu.addAction(openFile)
+        fileMenu.addAction(openProject)
+        fileMenu.addAction(saveProject)
         fileMenu.addSeparator()
         fileMenu.addAction(exportTable2)
         fileMenu.addAction(exportTable3)
+        fileMenu.addAction(exportRollingOrigin)
+        fileMenu.addSeparator()
+        fileMenu.addAction(kernelCacheAction)
+        fileMenu.addAction(resultCacheAction)
         fileMenu.addSeparator()
         fileMenu.addAction(exitApp)
 
@@ -285,17 +341,127 @@ class MainWindow(QMainWindow):
         #log.info("Covariate Tool application closed.")
 
         # --- stop running threads ---
-        # stop model estimation thread
+        self.stopEstimation()
+        self.stopPSSE()
+        self.stopRollingOrigin()
+
+        # stop estimation worker processes
+        shutdownPool()
+
+        qApp.quit()
+
+    def showKernelCache(self):
+        """Shows contents of the gradient kernel cache, allows clearing it."""
+        info = kernelCache.info()
+        msgBox = QMessageBox()
+        msgBox.setIcon(QMessageBox.Information)
+        msgBox.setWindowTitle("Kernel Cache")
+        msgBox.setText("Cached gradient kernels")
+        msgBox.setInformativeText("Location: {0}\nIn memory: {1}\nOn disk: {2} ({3:.1f} MB)\nHits: {4}, misses: {5}".format(
+            info["directory"], info["memoryEntries"], info["diskEntries"], info["diskBytes"] / 1024**2,
+            info["hits"], info["misses"]))
+        clearButton = msgBox.addButton("Clear Cache", QMessageBox.DestructiveRole)
+        msgBox.addButton(QMessageBox.Close)
+        msgBox.exec_()
+
+        if msgBox.clickedButton() == clearButton:
+            kernelCache.clear()
+            log.info("Kernel cache cleared.")
+
+    def showResultCache(self):
+        """Shows contents of the estimation result cache, allows clearing it."""
+        info = resultCache.info()
+        retained = retainedResults.info()
+        msgBox = QMessageBox()
+        msgBox.setIcon(QMessageBox.Information)
+        msgBox.setWindowTitle("Result Cache")
+        msgBox.setText("Cached estimation results")
+        msgBox.setInformativeText("Location: {0}\nResults: {1} ({2:.1f} MB)\nHits: {3}, misses: {4}".format(
+            info["path"], info["entries"], info["bytes"] / 1024**2, info["hits"], info["misses"])
+            + "\nIn memory: {0} of {1}, hits: {2}".format(
+                retained["results"], retained["maxResults"], retained["hits"]))
+        clearButton = msgBox.addButton("Clear Cache", QMessageBox.DestructiveRole)
+        msgBox.addButton(QMessageBox.Close)
+        msgBox.exec_()
+
+        if msgBox.clickedButton() == clearButton:
+            resultCache.clear()
+            log.info("Result cache cleared.")
+
+    def stopEstimation(self):
+        """Cancels a model estimation that is still running, results not shown."""
         try:
-            # self.computeWidget.computeTask.quit()
-            self.computeWidget.computeTask.abort = True
+            self.computeWidget.blockSignals(True)
+            self.computeWidget.computeTask.cancel()
             self.computeWidget.computeTask.wait()
         except AttributeError:
             # should catch if computeWidget not an attribute of mainWindow,
             # or if computeTask not yet an attribute of computeWidget
             pass
 
-        qApp.quit()
+    def saveProject(self):
+        """Saves the imported data and results to a project file."""
+        if not self.estimationComplete:
+            log.warning("Estimation not complete, no results to save.")
+            return
+        path = QFileDialog.getSaveFileName(self, "Save project", "project" + project.extension,
+                                           filter="C-SFRAT Project (*{0})".format(project.extension))
+        if path[0]:
+            saved = Project(self.data, self.estimationSheet, self.estimationResults, self.optimizer,
+                            self.psseResults if self.psseComplete else {}, self.psseFraction, self.allocationResults)
+            try:
+                saved.save(path[0])
+            except (OSError, ValueError) as error:
+                log.warning("Could not save project %s: %s", path[0], error)
+                return
+            self.statusBar().showMessage("Project saved to {0}".format(path[0]))
+
+    def openProject(self):
+        """Opens file dialog, restores the project file selected."""
+        files = QFileDialog.getOpenFileName(self, "Open project", "",
+                                            filter="C-SFRAT Project (*{0})".format(project.extension))
+        if files[0]:
+            self.loadProject(files[0])
+
+    def loadProject(self, path):
+        """Restores data and results of a project file to tabs 1 to 4.
+
+        The results are added as if each combination had just been fitted,
+        but no model is fit and PSSE is not run again.
+
+        Args:
+            path: Path of the project file.
+        """
+        try:
+            saved = Project.load(path)
+        except (OSError, KeyError, ValueError) as error:
+            log.warning("Could not open project %s: %s", path, error)
+            return
+
+        self.stopEstimation()
+        self.stopPSSE()
+        self.data = saved.data
+        self.dataLoaded = True
+        self.importFile()
+        sheet = saved.data.currentSheet
+        self._main.tab1.sideMenu.sheetSelect.setCurrentIndex(sheet)    # shows the saved sheet
+        maxInterval = saved.data.max_interval
+        self._main.tab1.sideMenu.slider.setValue(maxInterval)          # and the saved subset
+        self.subsetData(maxInterval)
+
+        self.optimizer = saved.optimizer
+        self.estimationSheet = saved.sheet
+        results = saved.estimationResults
+        self.estimationInterval = next(iter(results.values())).n if results else maxInterval
+        self.estimationSettings = None  # settings of the fits not saved, a new run fits again
+        psse = (saved.psseResults, saved.psseFraction) if saved.psseResults else None
+        self._showResults(results, psse)
+        retainedResults.store(self.estimationSheet, self.estimationInterval, None, results)
+        self.allocationResults = saved.allocationResults
+        if self.allocationResults:
+            allocationType = next(iter(self.allocationResults.values()))[0].allocationType
+            self._main.tab4.addResultsToTable(self.allocationResults, self.data, allocationType)
+        self.statusBar().showMessage("Project restored from {0}".format(path))
 
     #region Importing, plotting
     def fileOpened(self):
@@ -322,6 +488,8 @@ class MainWindow(QMainWindow):
         Updates sheet select on tab 1 with sheet names (if applicable). Calls
         setDataView method to update tab 1 plot and table.
         """
+        retainedResults.clear()         # results of the previous file don't apply to the next
+
         # clear sheet names from previous file
         self._main.tab1.sideMenu.sheetSelect.clear()
         # add sheet names from new file
@@ -350,6 +518,7 @@ class MainWindow(QMainWindow):
         self._main.tab2.plotAndTable.plotWidget.changePlotType(self.plotViewIndex)
 
         self.setMetricList()
+        self._showRetainedResults()
 
     def createPlots(self):
         """
@@ -370,8 +539,8 @@ class MainWindow(QMainWindow):
         """Updates tab 1 list widget with metric names on current sheet."""
         self._main.tab1.sideMenu.metricListWidget.clear()
         if self.dataLoaded:
-            # data class stores all combinations of metric names
-            self._main.tab1.sideMenu.metricListWidget.addItems(self.data.metricNameCombinations)
+            # data class generates combinations of metric names, shown a page at a time
+            self._main.tab1.sideMenu.setCombinations(self.data.metricNameCombinations)
             # log.info("%d covariate metrics on this sheet: %s", self.data.numCovariates,
             #                                                    self.data.metricNames)
 
@@ -389,6 +558,56 @@ class MainWindow(QMainWindow):
 
         self._main.tab1.plotAndTable.plotWidget.subsetPlots(x, y_mvf, y_intensity)
         self._main.tab2.plotAndTable.plotWidget.subsetPlots(x, y_mvf, y_intensity)
+        self._showRetainedResults()
+
+    def _showRetainedResults(self):
+        """Shows the results kept for the current sheet and interval.
+
+        Results fit to another sheet or interval are removed from tabs 1 to
+        4. If the current sheet and interval were analysed before, their
+        results are shown again without fitting.
+        """
+        view = (self.data.currentSheet, self.data.max_interval)
+        if not self.dataLoaded or view == (self.estimationSheet, self.estimationInterval):
+            return
+        try:
+            if self.computeWidget.computeTask.isRunning():
+                return  # results of the run are shown when it completes
+        except AttributeError:
+            pass    # no estimation run yet
+
+        self.stopPSSE()
+        self.estimationSettings, results, psse = retainedResults.view(*view)
+        self.estimationSheet, self.estimationInterval = view
+        self._showResults(results, psse)
+
+    def _showResults(self, results, psse=None):
+        """Shows fitted results in tabs 1 to 4, replacing the current ones.
+
+        Args:
+            results: Dict of FitResult records, indexed by name of the
+                model/metric combination, in the order shown.
+            psse: Tuple of PSSE values indexed by name and the fraction of
+                the data they were fit to, or None if PSSE is not run.
+        """
+        self._clearResults()
+        for name, model in results.items():
+            self.onModelResult(name, model)
+        self.estimationComplete = bool(results)
+        if not results:
+            self._main.tab3.sideMenu.psseButton.setDisabled(True)
+            self._main.tab4.sideMenu.allocation1Button.setDisabled(True)
+            self._main.tab4.sideMenu.allocation2Button.setDisabled(True)
+            return
+
+        self._enableResultControls()
+        self._main.tab3.finishResults(self.estimationResults, export=False)
+        if psse:
+            values, fraction = psse
+            self._main.tab3.sideMenu.psseParameterSpinBox.setValue(fraction)
+            self.onPSSEComplete(values, fraction)
+        else:
+            self._main.tab3.sideMenu.psseButton.setEnabled(True)
 
     def redrawPlot(self, tabNumber):
         """Redraws plot for the provided tab number.
@@ -504,8 +723,6 @@ class MainWindow(QMainWindow):
         selectedNums = [x.split('. ', 1)[0] for x in selectedModels]
         selectedNames = [x.split('. ', 1)[1] for x in selectedModels]
 
-        self.updateComparisonTable(selectedNums, selectedNames)
-
         self._main.tab2.plotAndTable.plotWidget.updateLines(selectedNames)
 
         # pass selected nums to tab 2 tableView
@@ -514,6 +731,8 @@ class MainWindow(QMainWindow):
 
         self.selectedModelNames = selectedNames
 
+        self.updateComparisonTable(selectedNums, selectedNames)
+
     def updateComparisonTable(self, selectedNums, selectedNames):
 
         self._main.tab3.updateTableView(selectedNums)
@@ -546,44 +765,187 @@ class MainWindow(QMainWindow):
         self._main.tab4.sideMenu.allocation2Button.setDisabled(True)
         modelsToRun = modelDetails["modelsToRun"]
         metricNames = modelDetails["metricNames"]
+        self.optimizer = modelDetails.get("optimizer", "reference")    # PSSE fits use the same method
+        self.budget = modelDetails.get("budget")                        # and the same budget
+        self.workers = modelDetails.get("workers", 1)                  # PSSE fits run on the same pool
+        warmStart = modelDetails.get("warmStart", False)
+        search = modelDetails.get("search", "Exhaustive")
+        criterion = modelDetails.get("criterion", "AIC")
+        maxFits = modelDetails.get("maxFits")
 
 
         # ******* NEED TO CLEAR PLOTS AND TABLES *******
 
         if self.data:
+            self.stopPSSE()                 # PSSE of previous results no longer needed
+
+            # combinations already fit to this sheet and interval with the
+            # same settings are kept, only new ones are fit
+            view = (self.data.currentSheet, self.data.max_interval)
+            settings = (self.optimizer, repr(self.budget), warmStart)
+            previous = {}
+            if search == "Exhaustive":
+                previous = retainedResults.matching(*view, settings)
+            # results shown stay in place if they are all kept, the others
+            # are removed when the run completes
+            shown = self.estimationComplete and view == (self.estimationSheet, self.estimationInterval)
+            if previous and shown and all(previous.get(name) is model for name, model in self.estimationResults.items()):
+                self.stopRollingOrigin()
+                self.rollingOriginResult = None
+                self._main.tab3.sideMenu.rollingOriginButton.setDisabled(True)
+                self.psseComplete = False   # new combinations need PSSE
+            else:
+                self._clearResults()
+            self.estimationSettings = settings
             self.estimationComplete = False # estimation not complete since it just started running
-            self.psseComplete = False       # must re-run PSSE after fitting new models
-            self.selectedModelNames = []    # clear selected models, since none are selected when new models are fitted
-
-            # need to block signals so update signal doesn't fire when list widgets are cleared
-            self._main.tab2.sideMenu.modelListWidget.blockSignals(True)
-            self._main.tab3.sideMenu.modelListWidget.blockSignals(True)
-            self._main.tab2.sideMenu.modelListWidget.clear()    # clear tab 2 list containing
-                                                                # previously computed models,
-                                                                # only added when calculations complete
-            self._main.tab3.sideMenu.modelListWidget.clear()
-            self._main.tab4.sideMenu.modelListWidget.clear()
-
-            self.computeWidget = ComputeWidget(modelsToRun, metricNames, self.data)
+            self.estimationSheet, self.estimationInterval = view
+
+            self.computeWidget = ComputeWidget(modelsToRun, metricNames, self.data, self.optimizer, self.workers, self.budget,
+                                               warmStart, search, criterion, maxFits, previous)
+            self.computeWidget.modelResult.connect(self.onModelResult)     # emitted as each combination completes
             self.computeWidget.results.connect(self.onEstimationComplete)   # signal emitted when estimation complete
 
+    def _clearResults(self):
+        """Removes results of the previous estimation from tabs 1 to 4."""
+        self.stopRollingOrigin()
+        self.rollingOriginResult = None
+        self._main.tab3.sideMenu.rollingOriginButton.setDisabled(True)
+        self.psseComplete = False       # must re-run PSSE after fitting new models
+        self.psseResults = {}
+        self.psseFraction = None
+        self.allocationResults = {}
+        self.selectedModelNames = []    # clear selected models, since none are selected when new models are fitted
+
+        self.estimationResults = {}     # filled as each combination completes
+        self._clearLists()
+
+        # remove lines and table values of previous results
+        self._main.tab1.plotAndTable.plotWidget.clearLines()
+        self._main.tab2.plotAndTable.plotWidget.clearLines()
+        self._main.tab2.clearResults()
+        self._main.tab3.clearResults()
+
+    def _clearLists(self):
+        """Removes all results from the tab 2 to 4 side menu lists."""
+        # need to block signals so update signal doesn't fire when list widgets are cleared
+        self._main.tab2.sideMenu.modelListWidget.blockSignals(True)
+        self._main.tab3.sideMenu.modelListWidget.blockSignals(True)
+        self._main.tab2.sideMenu.clearSelectedModels()      # clear tab 2 list containing
+                                                            # previously computed models,
+                                                            # added as calculations complete
+        self._main.tab3.sideMenu.modelListWidget.clear()
+        self._main.tab4.sideMenu.modelListWidget.clear()
+        self._main.tab2.sideMenu.modelListWidget.blockSignals(False)
+        self._main.tab3.sideMenu.modelListWidget.blockSignals(False)
+
+    def _removeResults(self, names):
+        """Removes results from tabs 1 to 4, keeping the others in place.
+
+        The side menu lists are numbered by position in the tables, so they
+        are numbered again and their selection is cleared.
+
+        Args:
+            names: List of names of model/metric combinations to remove.
+        """
+        rows = [i for i, name in enumerate(self.estimationResults) if name in names]
+        allocationType = None
+        if self.allocationResults:
+            allocationType = next(iter(self.allocationResults.values()))[0].allocationType
+        for name in names:
+            del self.estimationResults[name]
+            self.psseResults.pop(name, None)
+            self.allocationResults.pop(name, None)
+            self._main.tab1.plotAndTable.plotWidget.removeLine(name)
+            self._main.tab2.plotAndTable.plotWidget.removeLine(name)
+        self._main.tab2.removeResults(names)
+        self._main.tab3.removeResults(rows)
+        if allocationType is not None:
+            self._main.tab4.addResultsToTable(self.allocationResults, self.data, allocationType)
+
+        self._clearLists()
+        for number, (name, model) in enumerate(self.estimationResults.items(), 1):
+            if model.converged:
+                self._addToLists(number, name)
+        self.selectedModelNames = []
+        self._main.tab2.plotAndTable.plotWidget.updateLines([])
+        self._main.tab2.updateTableView([str(i) for i in range(1, len(self.estimationResults) + 1)])
+
+    def onModelResult(self, name, model):
+        """Adds the result of one model/metric combination to tabs 1 to 4.
+
+        Called as soon as the estimation of the combination is complete, so
+        results can be viewed before all combinations are calculated.
+
+        Args:
+            name: Name of the model/metric combination (string).
+            model: FitResult record of the combination.
+        """
+        if self.estimationResults.get(name) is model:
+            return  # kept by an incremental run, already shown
+        self.estimationResults[name] = model
+
+        # create lines for plots, shown when selected
+        self._main.tab1.plotAndTable.plotWidget.addLine(name, model)
+        self._main.tab2.plotAndTable.plotWidget.addLine(name, model)
+
+        # table column/row for every result
+        self._main.tab2.addResult(name, model)
+        self._main.tab3.addResult(model)
+
+        # only converged models can be selected, numbered by their position
+        # in the tables
+        if model.converged:
+            self._addToLists(len(self.estimationResults), name)
+
+    def _addToLists(self, number, name):
+        """Adds a result to the tab 2 to 4 side menu lists."""
+        listName = "{0}. {1}".format(number, name)
+        self._main.tab2.sideMenu.addSelectedModels([listName])  # add model to tab 2 list
+                                                                # so it can be selected
+        self._main.tab3.sideMenu.addSelectedModels([listName])  # add model to tab 3 list
+                                                                # so it can be selected for comparison
+        self._main.tab4.sideMenu.addSelectedModels([listName])  # add model to tab 4 list so it
+                                                                # can be selected for allocation
+
     def onEstimationComplete(self, results):
         """
         description to be created at a later time
 
+        Lines, table values and list entries of each model are already added
+        by onModelResult.
+
         Args:
             results: A dict containing model objects of model/metric
                 combinations that estimation run on, indexed by name of
                 combination as a string.
         """
         self.estimationComplete = True
-        self.estimationResults = results
+
+        # results kept from the previous run that were not selected again
+        dropped = [name for name in self.estimationResults if name not in results]
+        if dropped:
+            self._removeResults(dropped)
+        retainedResults.store(self.estimationSheet, self.estimationInterval, self.estimationSettings,
+                              self.estimationResults)
 
         # run PSSE on data along with model fitting
         self.runPSSE(self._main.tab3.sideMenu.psseParameterSpinBox.value())
 
+        self._enableResultControls()
+
+        # comparison uses all results
+        self._main.tab3.finishResults(self.estimationResults)
+
+        # number of fits of a subset search
+        self.statusBar().showMessage(self.computeWidget.computeTask.searchReport())
+        #log.debug("Estimation results: %s", results)
+        #log.info("Estimation complete.")
+
+    def _enableResultControls(self):
+        """Enables the controls that need estimation results."""
         self._main.tab1.sideMenu.runButton.setEnabled(True)  # re-enable button, can run another estimation
         # self._main.tab3.sideMenu.psseButton.setEnabled(True)    # enable PSSE button now that we have fitted models
+        self._main.tab3.sideMenu.rollingOriginButton.setEnabled(True)
         self._main.tab4.sideMenu.allocation1Button.setEnabled(True)     # re-enable allocation buttons, can't run
         self._main.tab4.sideMenu.allocation2Button.setEnabled(True)     # if estimation not complete
 
@@ -594,40 +956,6 @@ class MainWindow(QMainWindow):
             # enable intensity spin box
             self._main.tab2.sideMenu.reliabilitySpinBox.setEnabled(True)
 
-        # create lines for each plot
-        self._main.tab1.plotAndTable.plotWidget.createLines(results)
-        self._main.tab2.plotAndTable.plotWidget.createLines(results)
-
-        convergedNames = []
-        nonConvergedNames = []
-        for key, model in results.items():
-            if model.converged:
-                convergedNames.append(key)
-            else:
-                nonConvergedNames.append(key)
-
-        ##log.info("DID NOT CONVERGE: %s", nonConvergedNames)
-
-        for i in range(1, len(convergedNames)+1):
-            convergedNames[i-1] = "{0}. {1}".format(i, convergedNames[i-1])
-
-        self._main.tab2.sideMenu.addSelectedModels(convergedNames)  # add models to tab 2 list
-                                                                    # so they can be selected
-
-        self._main.tab2.updateModel(self.estimationResults)
-
-        self._main.tab3.updateModel(self.estimationResults)   # add converged results to model containing all result data
-        self._main.tab3.sideMenu.addSelectedModels(convergedNames)  # add models to tab 3 list
-                                                                    # so they can be selected for comparison
-        # self._main.tab3.addResultsToTable(results)
-        self._main.tab4.sideMenu.addSelectedModels(convergedNames)  # add models to tab 4 list so they
-                                                                    # can be selected for allocation
-        # can re-enable signals for list widgets now
-        self._main.tab2.sideMenu.modelListWidget.blockSignals(False)
-        self._main.tab3.sideMenu.modelListWidget.blockSignals(False)
-        #log.debug("Estimation results: %s", results)
-        #log.info("Estimation complete.")
-
     def runGoodnessOfFit(self):
         """Adds goodness of fit measures from estimation to tab 3 table."""
 
@@ -791,27 +1119,35 @@ class MainWindow(QMainWindow):
         """
         
         if self.data:
+            self.stopPSSE()
+
             # disable PSSE button until model fitting completes
             self._main.tab3.sideMenu.psseButton.setDisabled(True)
 
             self.psseComplete = False
 
-            modelsToRun = []
-            metricNames = []
+            # PSSE values of results kept by an incremental run are reused
+            reused = {}
+            if fraction == self.psseFraction:
+                reused = {name: value for name, value in self.psseResults.items() if name in self.estimationResults}
 
-            for key, model in self.estimationResults.items():
-                # need to get model classes, to instantiate new objects
-                if models.modelList[model.__class__.__name__] not in modelsToRun:
-                    modelsToRun.append(models.modelList[model.__class__.__name__])
-                # only want the first instances of metrics, otherwise we'll get duplicates
-                if model.metricNames not in metricNames:
-                    metricNames.append(model.metricNames)
-
-            self.psse_thread = PSSEThread(modelsToRun, metricNames, self.data, fraction)
+            # each estimation result is refit to the subset, starting from its MLEs
+            self.psse_thread = PSSEThread(self.estimationResults, self.data, fraction, self.optimizer, self.budget,
+                                          self.workers, reused)
             self.psse_thread.results.connect(self.onPSSEComplete)   # signal emitted when estimation complete
             self.psse_thread.start()
 
-    def onPSSEComplete(self, results):
+    def stopPSSE(self):
+        """Cancels PSSE fits that are still running, without results."""
+        try:
+            self.psse_thread.blockSignals(True)
+            self.psse_thread.cancel()
+            self.psse_thread.wait()
+        except AttributeError:
+            # PSSE not run yet
+            pass
+
+    def onPSSEComplete(self, results, fraction):
         """
         Called when PSSE thread is done running
 
@@ -819,9 +1155,13 @@ class MainWindow(QMainWindow):
             results: A dict containing model objects of model/metric
                 combinations that estimation run on, indexed by name of
                 combination as a string.
+            fraction: Fraction of the data fit for PSSE.
         """
         
-        self.psseResults = results
+        # same order as the rows of the tab 3 table
+        self.psseResults = {name: results.get(name, "") for name in self.estimationResults}
+        self.psseFraction = fraction
+        retainedResults.storePSSE(self.estimationSheet, self.estimationInterval, self.psseResults, fraction)
         self._main.tab3.addResultsPSSE(self.psseResults)
         self.psseComplete = True
 
@@ -830,6 +1170,62 @@ class MainWindow(QMainWindow):
         # enable PSSE weight spinbox
         self._main.tab3.sideMenu.psseSpinBox.setEnabled(True)
 
+    def runRollingOrigin(self, start, stop):
+        """Begins rolling origin evaluation of the estimation results.
+
+        Args:
+            start: Fraction of the intervals fit at the first cut point.
+            stop: Fraction of the intervals fit at the last cut point.
+        """
+        if self.data and self.estimationComplete:
+            self.stopRollingOrigin()
+            fullData = self.data.getSnapshot()
+            cuts = rollingOrigin.cutPoints(len(fullData), start, stop)
+            if not cuts:
+                log.warning("No cut points between %s and %s of the data.", start, stop)
+                return
+
+            # disable button until evaluation completes
+            self._main.tab3.sideMenu.rollingOriginButton.setDisabled(True)
+
+            self.rolling_thread = RollingOriginThread(self.estimationResults, fullData, cuts, self.optimizer,
+                                                      self.budget, self.workers)
+            self.rolling_thread.results.connect(self.onRollingOriginComplete)
+            self.rolling_thread.start()
+
+    def stopRollingOrigin(self):
+        """Cancels a rolling origin evaluation that is still running."""
+        try:
+            self.rolling_thread.blockSignals(True)
+            self.rolling_thread.cancel()
+            self.rolling_thread.wait()
+        except AttributeError:
+            # rolling origin evaluation not run yet
+            pass
+
+    def onRollingOriginComplete(self, result):
+        """
+        Called when rolling origin thread is done running
+
+        Args:
+            result: RollingOriginResult, with a row per combination in the
+                same order as the estimation results.
+        """
+        self.rollingOriginResult = result
+        self._main.tab3.addResultsRollingOrigin(result)
+        self._main.tab3.sideMenu.rollingOriginButton.setEnabled(True)
+
+    def exportRollingOrigin(self):
+        """Exports the PSSE and one step ahead error matrices to csv."""
+        if self.rollingOriginResult is None:
+            log.warning("Rolling origin evaluation not run.")
+            return
+        path = QFileDialog.getSaveFileName(self,
+            'Export rolling origin results', 'rolling_origin.csv', filter='CSV (*.csv)')
+
+        if path[0]:
+            self.rollingOriginResult.matrices().to_csv(path[0], index=False)
+
     def exportTable2(self):
         path = QFileDialog.getSaveFileName(self,
             'Export model results', 'model_results.csv', filter='CSV (*.csv)')
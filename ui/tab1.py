@@ -1,14 +1,22 @@
 # For handling debug output
 import logging as log
 
+from itertools import chain
+
 # PyQt5 imports for UI elements
 from PyQt5.QtWidgets import QMessageBox, QWidget, QHBoxLayout, QVBoxLayout, \
                             QLabel, QGroupBox, QComboBox, QListWidget, QPushButton, \
-                            QAbstractItemView, QDoubleSpinBox, QSlider
+                            QAbstractItemView, QDoubleSpinBox, QSlider, QSpinBox, QCheckBox, \
+                            QLineEdit, QListWidgetItem
 from PyQt5.QtCore import pyqtSignal, Qt
 
 # Local imports
 import models
+from core.model import Model
+from core.budget import FitBudget
+from core.estimationPool import defaultWorkerCount
+from core.subsetSearch import searchStrategies, criteria
+from core.combinations import CombinationSource, combinationName
 from ui.commonWidgets import PlotAndTable
 from core.dataClass import PandasModel
 
@@ -56,18 +64,49 @@ class SideMenu1(QVBoxLayout):
         confidenceSpinBox: QDoubleSpinBox, for specifying the confidence
             level of the Laplace trend test.
         modelListWidget: QListWidget containing names of loaded models.
-        metricListWidget: QListWidget containing names of covariate metrics
-            from imported data.
-        selectAllButton: QPushButton that selects all metrics in the
-            metricListWidget.
-        clearAllButton: QPushButton that de-selects all metrics in the
-            metricListWidget.
+        metricListWidget: QListWidget containing one page of the covariate
+            metric combinations of the imported data.
+        combinations: CombinationSource of all metric combinations.
+        filterEdit: QLineEdit object, text the combinations shown must
+            contain.
+        minSizeSpinBox: QSpinBox object, minimum number of covariates of the
+            combinations shown.
+        maxSizeSpinBox: QSpinBox object, maximum number of covariates of the
+            combinations shown.
+        pageLabel: QLabel object, shows the page of combinations shown.
+        previousPageButton: QPushButton that shows the previous page.
+        nextPageButton: QPushButton that shows the next page.
+        selectAllButton: QPushButton that selects all combinations matching
+            the filters, on all pages.
+        clearAllButton: QPushButton that de-selects all combinations.
+        searchSelect: QComboBox object, for selecting the covariate subset
+            search strategy. Exhaustive fits the selected combinations,
+            other strategies search subsets of their covariates.
+        criterionSelect: QComboBox object, for selecting the information
+            criterion minimized by the subset search.
+        maxFitsSpinBox: QSpinBox object, maximum fits per model of the best
+            first search, 0 for no limit.
+        optimizerSelect: QComboBox object, for selecting the optimization
+            method used by the estimation.
+        workerSpinBox: QSpinBox object, specifies the number of worker
+            processes the estimation runs on.
+        timeLimitSpinBox: QDoubleSpinBox object, maximum wall time in seconds
+            of each fit, 0 for no limit.
+        evaluationLimitSpinBox: QSpinBox object, maximum log-likelihood
+            evaluations of each fit, 0 for no limit.
+        rootLimitSpinBox: QSpinBox object, maximum root solver iterations of
+            each fit, 0 for no limit.
+        warmStartCheckBox: QCheckBox object, if checked covariate subsets
+            start from the estimates of their nested parents.
         sheetChangedSignal: pyqtSignal, emits view type (string) and view index
             (int) when view mode is changed.
         confidenceSignal: pyqtSignal, emits Laplace confidence interval (float)
             when confidence spin box changed.
-        runModelSignal: pyqtSignal, emits dict of model and metric names used
-            for the estimation calculation when Run Estimation button pressed.
+        runModelSignal: pyqtSignal, emits dict of model and metric names,
+            subset search settings, optimization method, number of worker
+            processes and budget of each fit, and if subsets are warm
+            started, used for the estimation calculation when Run Estimation
+            button pressed.
     """
 
     # signals
@@ -77,26 +116,74 @@ class SideMenu1(QVBoxLayout):
     runModelSignal = pyqtSignal(dict)
     sliderSignal = pyqtSignal(int)
 
+    pageSize = 100      # combinations shown per page of the metric list
+
     def __init__(self):
         """Initializes tab 1 side menu UI elements."""
         super().__init__()
+        self.combinations = CombinationSource([])
+        self._filtered = self.combinations      # combinations matching the filters
+        self._filteredCount = 1
+        self._page = 0
+        self._pageCombinations = []             # combination of each row of the list widget
+        self._selected = []                     # selected combinations (tuples), in order clicked
+        self._selectAllSource = None            # source of all combinations selected with select all
         self._setupSideMenu()
-    
+
+    def setCombinations(self, combinations):
+        """Sets the metric combinations shown, clearing the selection and filters.
+
+        Called when data is loaded or the sheet is changed.
+
+        Args:
+            combinations: CombinationSource of all metric combinations.
+        """
+        self.combinations = combinations
+        numMetrics = len(combinations.metricNames)
+        for spinBox, value in [(self.minSizeSpinBox, 0), (self.maxSizeSpinBox, numMetrics)]:
+            spinBox.blockSignals(True)
+            spinBox.setMaximum(numMetrics)
+            spinBox.setValue(value)
+            spinBox.blockSignals(False)
+        self.filterEdit.blockSignals(True)
+        self.filterEdit.clear()
+        self.filterEdit.blockSignals(False)
+        self._selected = []
+        self._selectAllSource = None
+        self._applyFilter()
+
+    def selectedCombinations(self):
+        """Returns the selected metric combinations.
+
+        Returns:
+            List of combinations (lists of metric names) in the order they
+            were clicked. If select all was pressed, an iterable generating
+            the combinations instead.
+        """
+        selected = [list(c) for c in self._selected]
+        if self._selectAllSource is None:
+            return selected
+        if not selected:
+            return self._selectAllSource
+        return chain(self._selectAllSource, selected)
+
     def selectAll(self):
-        """Selects all items in metricListWidget.
+        """Selects all combinations matching the filters, on all pages.
         
         Called when select all button is pressed.
         """
-        self.metricListWidget.selectAll()
-        self.metricListWidget.repaint()
+        self._selectAllSource = self._filtered
+        self._selected = []
+        self._showPage()
 
     def clearAll(self):
-        """Clears all items in metricListWidget.
+        """Clears the selection of all combinations.
         
         Called when clear all button is pressed.
         """
-        self.metricListWidget.clearSelection()
-        self.metricListWidget.repaint()
+        self._selectAllSource = None
+        self._selected = []
+        self._showPage()
 
     def updateSlider(self, max_value):
         """
@@ -132,6 +219,10 @@ class SideMenu1(QVBoxLayout):
         metricsGroup.setLayout(self._setupMetricsGroup())
         self.addWidget(metricsGroup, 2)
 
+        optimizerGroup = QGroupBox("Estimation Settings")
+        optimizerGroup.setLayout(self._setupOptimizerGroup())
+        self.addWidget(optimizerGroup)
+
         self.runButton = QPushButton("Run Estimation")
         self.runButton.clicked.connect(self._emitRunModelSignal)
         self.addWidget(self.runButton, 1)
@@ -200,10 +291,43 @@ class SideMenu1(QVBoxLayout):
             A QVBoxLayout containing the created metrics group.
         """
         metricsGroupLayout = QVBoxLayout()
-        self.metricListWidget = QListWidget()   # metric names added dynamically from data when loaded
+
+        self.filterEdit = QLineEdit()
+        self.filterEdit.setPlaceholderText("Filter, e.g. \"E F\"")
+        self.filterEdit.setToolTip("Show combinations whose name contains each word")
+        self.filterEdit.textChanged.connect(self._applyFilter)
+        metricsGroupLayout.addWidget(self.filterEdit)
+
+        sizeLayout = QHBoxLayout()
+        self.minSizeSpinBox = QSpinBox()
+        self.maxSizeSpinBox = QSpinBox()
+        self.minSizeSpinBox.setToolTip("Minimum number of covariates of the combinations shown")
+        self.maxSizeSpinBox.setToolTip("Maximum number of covariates of the combinations shown")
+        self.minSizeSpinBox.valueChanged.connect(self._applyFilter)
+        self.maxSizeSpinBox.valueChanged.connect(self._applyFilter)
+        sizeLayout.addWidget(QLabel("Covariates"), 4)
+        sizeLayout.addWidget(self.minSizeSpinBox, 3)
+        sizeLayout.addWidget(QLabel("to"), 1)
+        sizeLayout.addWidget(self.maxSizeSpinBox, 3)
+        metricsGroupLayout.addLayout(sizeLayout)
+
+        self.metricListWidget = QListWidget()   # one page of combinations, added when data is loaded
         self.metricListWidget.setSelectionMode(QAbstractItemView.MultiSelection)     # able to select multiple metrics
+        self.metricListWidget.itemSelectionChanged.connect(self._pageSelectionChanged)
         metricsGroupLayout.addWidget(self.metricListWidget)
 
+        pageLayout = QHBoxLayout()
+        self.previousPageButton = QPushButton("<")
+        self.nextPageButton = QPushButton(">")
+        self.pageLabel = QLabel("")
+        self.pageLabel.setAlignment(Qt.AlignCenter)
+        self.previousPageButton.clicked.connect(lambda: self._changePage(-1))
+        self.nextPageButton.clicked.connect(lambda: self._changePage(1))
+        pageLayout.addWidget(self.previousPageButton, 2)
+        pageLayout.addWidget(self.pageLabel, 6)
+        pageLayout.addWidget(self.nextPageButton, 2)
+        metricsGroupLayout.addLayout(pageLayout)
+
         buttonLayout = QHBoxLayout()
         self.selectAllButton = QPushButton("Select All")
         self.clearAllButton = QPushButton("Clear All")
@@ -213,8 +337,157 @@ class SideMenu1(QVBoxLayout):
         buttonLayout.addWidget(self.clearAllButton, 50)
         metricsGroupLayout.addLayout(buttonLayout)
 
+        # subsets of the covariates of the selected combinations are searched
+        searchLayout = QHBoxLayout()
+        self.searchSelect = QComboBox()
+        self.searchSelect.addItems(searchStrategies)
+        self.searchSelect.setToolTip("Exhaustive: fit the selected combinations\n"
+                                     "Stepwise, Best First: search subsets of the selected covariates")
+        self.searchSelect.currentTextChanged.connect(self._searchChanged)
+        self.criterionSelect = QComboBox()
+        self.criterionSelect.addItems(criteria)
+        self.criterionSelect.setToolTip("Information criterion minimized by the search")
+        searchLayout.addWidget(QLabel("Subset Search"), 4)
+        searchLayout.addWidget(self.searchSelect, 4)
+        searchLayout.addWidget(self.criterionSelect, 2)
+        metricsGroupLayout.addLayout(searchLayout)
+
+        maxFitsLayout = QHBoxLayout()
+        self.maxFitsSpinBox = QSpinBox()
+        self.maxFitsSpinBox.setMaximum(1000000)
+        self.maxFitsSpinBox.setSpecialValueText("None")     # shown for 0, no limit
+        self.maxFitsSpinBox.setToolTip("Maximum number of fits per model of the best first search")
+        maxFitsLayout.addWidget(QLabel("Max Fits per Model"), 7)
+        maxFitsLayout.addWidget(self.maxFitsSpinBox, 3)
+        metricsGroupLayout.addLayout(maxFitsLayout)
+        self._searchChanged(self.searchSelect.currentText())
+
         return metricsGroupLayout
 
+    def _searchChanged(self, strategy):
+        """Enables the search settings used by the selected strategy."""
+        self.criterionSelect.setEnabled(strategy != "Exhaustive")
+        self.maxFitsSpinBox.setEnabled(strategy == "Best First")
+
+    def _applyFilter(self):
+        """Shows the first page of combinations matching the filters."""
+        minSize = min(self.minSizeSpinBox.value(), self.maxSizeSpinBox.value())
+        maxSize = max(self.minSizeSpinBox.value(), self.maxSizeSpinBox.value())
+        self._filtered = self.combinations.filtered(minSize, maxSize, self.filterEdit.text())
+        self._filteredCount = len(self._filtered)
+        self._page = 0
+        self._showPage()
+
+    def _changePage(self, step):
+        """Shows the next (step 1) or previous (step -1) page."""
+        self._page = max(0, min(self._page + step, self._numPages() - 1))
+        self._showPage()
+
+    def _numPages(self):
+        return max(1, -(-self._filteredCount // self.pageSize))
+
+    def _showPage(self):
+        """Fills the list widget with the current page of combinations."""
+        self._pageCombinations = [tuple(c) for c in self._filtered.page(self._page, self.pageSize)]
+        self.metricListWidget.blockSignals(True)
+        self.metricListWidget.clear()
+        for combination in self._pageCombinations:
+            item = QListWidgetItem(combinationName(combination))
+            self.metricListWidget.addItem(item)
+            item.setSelected(self._isSelected(combination))
+        self.metricListWidget.blockSignals(False)
+
+        pages = self._numPages()
+        self.pageLabel.setText("Page {0} of {1} ({2})".format(self._page + 1, pages, self._filteredCount))
+        self.previousPageButton.setEnabled(self._page > 0)
+        self.nextPageButton.setEnabled(self._page + 1 < pages)
+
+    def _isSelected(self, combination):
+        if combination in self._selected:
+            return True
+        return self._selectAllSource is not None and combination in self._selectAllSource
+
+    def _pageSelectionChanged(self):
+        """Updates the selection from the items of the current page."""
+        for row, combination in enumerate(self._pageCombinations):
+            selected = self.metricListWidget.item(row).isSelected()
+            if selected == self._isSelected(combination):
+                continue
+            if selected:
+                self._selected.append(combination)
+            elif combination in self._selected:
+                self._selected.remove(combination)
+            else:
+                self._selectAllSource = self._selectAllSource.excluding([combination])
+
+    def _hasSelection(self):
+        if self._selected:
+            return True
+        return self._selectAllSource is not None and next(iter(self._selectAllSource), None) is not None
+
+    def _setupOptimizerGroup(self):
+        """Creates widgets for selecting the optimization method and workers.
+
+        Returns:
+            A QVBoxLayout containing the created optimizer group.
+        """
+        optimizerGroupLayout = QVBoxLayout()
+        optimizerGroupLayout.addWidget(QLabel("Optimization Method"))
+        self.optimizerSelect = QComboBox()
+        self.optimizerSelect.addItems(Model.optimizers)
+        self.optimizerSelect.setCurrentText("reference")
+        self.optimizerSelect.setToolTip("reference (default): Nelder-Mead followed by root finding on the gradient\n"
+                                        "L-BFGS-B, trust-constr: bounded minimization using the gradient")
+        optimizerGroupLayout.addWidget(self.optimizerSelect)
+
+        workerLayout = QHBoxLayout()
+        self.workerSpinBox = QSpinBox()
+        self.workerSpinBox.setMinimum(1)
+        self.workerSpinBox.setMaximum(max(64, defaultWorkerCount()))
+        self.workerSpinBox.setValue(defaultWorkerCount())
+        self.workerSpinBox.setToolTip("Number of processes used to fit combinations in parallel, one per CPU\n"
+                                      "by default. The estimates are the same as with one process")
+        workerLayout.addWidget(QLabel("Worker Processes"), 7)
+        workerLayout.addWidget(self.workerSpinBox, 3)
+        optimizerGroupLayout.addLayout(workerLayout)
+
+        self.warmStartCheckBox = QCheckBox("Warm Start Covariate Subsets")
+        self.warmStartCheckBox.setChecked(False)
+        self.warmStartCheckBox.setToolTip("Fit combinations in increasing number of covariates, each starting\n"
+                                          "from the estimates of a fitted combination with one covariate less.\n"
+                                          "Faster, but a fit can reach a different optimum than from the default estimates")
+        optimizerGroupLayout.addWidget(self.warmStartCheckBox)
+
+        # per fit budget, fits that reach a limit keep their best parameters
+        self.timeLimitSpinBox = QDoubleSpinBox()
+        self.timeLimitSpinBox.setMaximum(86400.0)
+        self.timeLimitSpinBox.setSuffix(" s")
+        self.evaluationLimitSpinBox = QSpinBox()
+        self.evaluationLimitSpinBox.setMaximum(10000000)
+        self.rootLimitSpinBox = QSpinBox()
+        self.rootLimitSpinBox.setMaximum(10000000)
+        limits = [("Time Limit per Fit", self.timeLimitSpinBox, "Maximum wall time of each fit"),
+                  ("Max Evaluations", self.evaluationLimitSpinBox, "Maximum log-likelihood evaluations of each fit"),
+                  ("Max Root Iterations", self.rootLimitSpinBox, "Maximum root solver iterations of each fit (reference method)")]
+        for text, spinBox, toolTip in limits:
+            spinBox.setSpecialValueText("None")     # shown for 0, no limit
+            spinBox.setToolTip(toolTip)
+            limitLayout = QHBoxLayout()
+            limitLayout.addWidget(QLabel(text), 7)
+            limitLayout.addWidget(spinBox, 3)
+            optimizerGroupLayout.addLayout(limitLayout)
+
+        return optimizerGroupLayout
+
+    def fitBudget(self):
+        """Returns FitBudget of the limits set, None if there are no limits."""
+        maxTime = self.timeLimitSpinBox.value() or None
+        maxEvaluations = self.evaluationLimitSpinBox.value() or None
+        maxRootIterations = self.rootLimitSpinBox.value() or None
+        if maxTime is None and maxEvaluations is None and maxRootIterations is None:
+            return None
+        return FitBudget(maxTime, maxEvaluations, maxRootIterations)
+
     def _emitRunModelSignal(self):
         """Emits signal that begins estimation with selected models & metrics.
 
@@ -232,13 +505,19 @@ class SideMenu1(QVBoxLayout):
         modelsToRun = [model for model in models.modelList.values() if model.name in selectedModelNames]
 
         # get selected metric names (IMPORTANT: returned in order they were clicked)
-        selectedMetricNames = [item.text().split(", ") for item in self.metricListWidget.selectedItems()]
-            # split combinations
+        selectedMetricNames = self.selectedCombinations()
 
         # only emit the run signal if at least one model and at least one metric chosen
-        if selectedModelNames and selectedMetricNames:
+        if selectedModelNames and self._hasSelection():
             self.runModelSignal.emit({"modelsToRun": modelsToRun,
-                                      "metricNames": selectedMetricNames})
+                                      "metricNames": selectedMetricNames,
+                                      "search": self.searchSelect.currentText(),
+                                      "criterion": self.criterionSelect.currentText(),
+                                      "maxFits": self.maxFitsSpinBox.value() or None,
+                                      "optimizer": self.optimizerSelect.currentText(),
+                                      "workers": self.workerSpinBox.value(),
+                                      "budget": self.fitBudget(),
+                                      "warmStart": self.warmStartCheckBox.isChecked()})
 
             log.info("Run models signal emitted. Models = %s, metrics = %s", selectedModelNames, selectedMetricNames)
 
@@ -105,38 +105,53 @@ class Tab2(QWidget):
         Call whenever model fitting is run
         Model always contains all result data
         """
+        self.clearResults()
+        for key, model in results.items():
+            self.addResult(key, model)
 
-        # lists with number of columns equal to number of combinations in results
-        mvf_list = []
-        intensity_list = []
+    def clearResults(self):
+        """
+        Removes fitted values of previous results from the table, called when
+        model fitting starts
+        """
+        self.column_names = ["Interval"]
+        self.dataframeMVF = pd.DataFrame(columns=self.column_names)
+        self.dataframeIntensity = pd.DataFrame(columns=self.column_names)
+        self.modelMVF.setAllData(self.dataframeMVF)
+        self.modelIntensity.setAllData(self.dataframeIntensity)
 
-        # first column is always intervals
-        # get from first value in dictionary, so we don't need to know the key
-        column_names = ["Interval"]
-        mvf_list.append(list(results.values())[0].t)
-        intensity_list.append(list(results.values())[0].t)
+        self.plotAndTable.tableWidget.model().layoutChanged.emit()
 
-        # temp data frame, need to transpose afterward
+    def addResult(self, key, model):
+        """
+        Adds MVF and intensity columns for one model, called as soon as the
+        model fitting of the combination is complete
+        """
+        # first column is always intervals
+        if len(self.dataframeMVF.index) == 0:
+            self.dataframeMVF = pd.DataFrame({"Interval": model.t})
+            self.dataframeIntensity = pd.DataFrame({"Interval": model.t})
 
-        ## MVF
-        # iterate over selected models
-        # store intensity values and names
-        for key, model in results.items():
-            mvf_list.append(model.mvf_array)
-            intensity_list.append(model.intensityList)
-            column_names.append(key)
+        self.dataframeMVF[key] = model.mvf_array
+        self.dataframeIntensity[key] = model.intensityList
+        self.column_names.append(key)
 
-        temp_df = pd.DataFrame(mvf_list)
-        self.dataframeMVF = temp_df.transpose()
-        self.dataframeMVF.columns = column_names
         self.modelMVF.setAllData(self.dataframeMVF)
-
-        temp_df = pd.DataFrame(intensity_list)
-        self.dataframeIntensity = temp_df.transpose()
-        self.dataframeIntensity.columns = column_names
         self.modelIntensity.setAllData(self.dataframeIntensity)
 
-        self.column_names = column_names
+        self.plotAndTable.tableWidget.model().layoutChanged.emit()
+
+    def removeResults(self, keys):
+        """
+        Removes MVF and intensity columns of models whose results are no
+        longer shown, other columns are kept
+        """
+        self.dataframeMVF = self.dataframeMVF.drop(columns=keys, errors="ignore")
+        self.dataframeIntensity = self.dataframeIntensity.drop(columns=keys, errors="ignore")
+        self.column_names = [name for name in self.column_names if name not in keys]
+
+        self.modelMVF.setAllData(self.dataframeMVF)
+        self.modelIntensity.setAllData(self.dataframeIntensity)
 
         self.plotAndTable.tableWidget.model().layoutChanged.emit()
 
@@ -261,8 +276,12 @@ class SideMenu2(QVBoxLayout):
                 widget.
         """
         self.modelListWidget.addItems(modelNames)
-        self.ModelsText.clear()
-        self.ModelsText = modelNames
+        self.ModelsText.extend(modelNames)
+
+    def clearSelectedModels(self):
+        """Removes all model names from the model list widget."""
+        self.modelListWidget.clear()
+        self.ModelsText = []
 
     def _setupSideMenu(self):
         """Creates group box widgets and adds them to layout."""
@@ -85,17 +85,11 @@ class Tab3(QWidget):
         Model always contains all result data
         """
 
-        self.sideMenu.comparison.criticMethod(data, self.sideMenu)
-
         rows = []
         row_index = 0
         for key, model in data.items():
             #if model.converged:
-            row = [
-                model.shortName,
-                model.metricString,
-                model.runtime]
-            rows.append(row)
+            rows.append(self._resultRow(model))
             row_index += 1 # endif
         self.dataframe = pd.DataFrame(rows, columns=self.column_names)
         self.tableModel = PandasModel(self.dataframe)
@@ -108,9 +102,73 @@ class Tab3(QWidget):
         self.proxyModel.setSourceModel(self.tableModel)
 
         # self.tableModel.setAllData(self.proxyModel)
-        self.exportTable(f'{model.shortName}.csv', data)
+        self.finishResults(data)
+
+    def clearResults(self):
+        """
+        Removes previous results from the table, called when model fitting
+        starts
+        """
+        self.dataframe = pd.DataFrame(columns=self.column_names)
+        self.tableModel = PandasModel(self.dataframe)
+        self.proxyModel.setSourceModel(self.tableModel)
+
+    def addResult(self, model):
+        """
+        Adds table row for one model, called as soon as the model fitting of
+        the combination is complete
+        """
+        self.dataframe.loc[len(self.dataframe.index)] = self._resultRow(model)
+        self.tableModel.setAllData(self.dataframe)
+
+    def removeResults(self, rows):
+        """
+        Removes table rows of models whose results are no longer shown, rows
+        are given by position
+        """
+        self.dataframe = self.dataframe.drop(self.dataframe.index[rows]).reset_index(drop=True)
+        self.tableModel.setAllData(self.dataframe)
+
+    def finishResults(self, data, export=True):
+        """
+        Called when model fitting of all combinations is complete, runs the
+        comparison and exports the table. The table is not exported when
+        results fitted before are shown again (export False).
+        """
+        if not data:
+            return  # cancelled before any combination completed
+        self.sideMenu.comparison.criticMethod(data, self.sideMenu)
+        model = list(data.values())[-1]
+        if export:
+            self.exportTable(f'{model.shortName}.csv', data)
+
+    def _resultRow(self, model):
+        """Returns list of table values for a model."""
+        return [
+            model.shortName,
+            model.metricString,
+            self._fitStatus(model),
+            model.runtime,
+            model.iterations,
+            model.evaluations,
+            "",     # PSSE added when the PSSE fits complete
+            "",     # rolling origin values added when evaluation completes
+            ""]
+
+    def _fitStatus(self, model):
+        """Returns text describing how the fit of a model ended."""
+        if model.budgetExceeded:
+            return "Budget exceeded"
+        status = "Converged" if model.converged else "Not converged"
+        if model.cached:
+            status += " (cached)"
+        return status
 
     def addResultsPSSE(self, results):
+        """
+        Fills the PSSE column, results are in the same order as the table
+        rows
+        """
         psse_values = []
         for key, val in results.items():
             psse_values.append(val)
@@ -118,7 +176,7 @@ class Tab3(QWidget):
         columnIndex = self.tableModel._data.columns.get_loc("PSSE")
 
         # iterate over all rows
-        for row in range(self.tableModel.rowCount()):
+        for row in range(min(self.tableModel.rowCount(), len(psse_values))):
             # get model index
             index = self.tableModel.index(row, columnIndex)
 
@@ -127,6 +185,22 @@ class Tab3(QWidget):
         # causes whole table to be redrawn
         self.table.model().layoutChanged.emit()
 
+    def addResultsRollingOrigin(self, result):
+        """
+        Fills the rolling origin columns from a RollingOriginResult, whose
+        rows are in the same order as the table rows
+        """
+        psseIndex = self.tableModel._data.columns.get_loc("Rolling PSSE")
+        rmseIndex = self.tableModel._data.columns.get_loc("One-Step RMSE")
+        summary = result.summary()
+
+        for row in range(min(self.tableModel.rowCount(), len(summary.index))):
+            self.tableModel.setData(self.tableModel.index(row, psseIndex), summary["Mean PSSE"][row])
+            self.tableModel.setData(self.tableModel.index(row, rmseIndex), summary["One-Step RMSE"][row])
+
+        # causes whole table to be redrawn
+        self.table.model().layoutChanged.emit()
+
     def _setupTab3(self):
         """Creates tab 3 widgets and adds them to layout."""
         mainLayout = QHBoxLayout()       # main layout
@@ -139,7 +213,8 @@ class Tab3(QWidget):
         self.setLayout(mainLayout)
 
     def _setupTable(self):
-        self.column_names = ["Model Name", "Covariates", "Runtime"]
+        self.column_names = ["Model Name", "Covariates", "Status", "Runtime", "Iterations", "Evaluations", "PSSE",
+                             "Rolling PSSE", "One-Step RMSE"]
         self.dataframe = pd.DataFrame(columns=self.column_names)
         self.tableModel = PandasModel(self.dataframe)
 
@@ -237,6 +312,7 @@ class SideMenu3(QVBoxLayout):
     spinBoxChangedSignal = pyqtSignal()
     modelChangedSignal = pyqtSignal(list)
     runPSSESignal = pyqtSignal(float)
+    runRollingOriginSignal = pyqtSignal(float, float)
 
     def __init__(self):
         """Initializes tab 3 side menu UI elements."""
@@ -262,6 +338,9 @@ class SideMenu3(QVBoxLayout):
         self.psseGroup = QGroupBox("Specify subset data for PSSE")
         self.psseGroup.setLayout(self._setupPSSEGroup())
 
+        self.rollingOriginGroup = QGroupBox("Rolling-Origin Evaluation")
+        self.rollingOriginGroup.setLayout(self._setupRollingOriginGroup())
+
         self.modelsGroup = QGroupBox("Select Model Results")
         # sets minumum size for side menu
         self.modelsGroup.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.MinimumExpanding)
@@ -269,6 +348,7 @@ class SideMenu3(QVBoxLayout):
         
         self.addWidget(self.comparisonGroup, 2)
         self.addWidget(self.psseGroup)
+        self.addWidget(self.rollingOriginGroup)
         self.addWidget(self.modelsGroup, 7)
 
         self.addStretch(1)
@@ -329,6 +409,39 @@ class SideMenu3(QVBoxLayout):
 
         return psseLayout
 
+    def _setupRollingOriginGroup(self):
+        """Creates widget containing the range of rolling origin cut points.
+
+        Returns:
+            A QGridLayout containing controls for rolling origin evaluation.
+        """
+        rollingLayout = QGridLayout()
+
+        self._createLabel("From", 0, 0, rollingLayout)
+        self._createLabel("To", 1, 0, rollingLayout)
+        self.rollingStartSpinBox = self._createFractionSpinBox(0.5, 0, 1, rollingLayout)
+        self.rollingStopSpinBox = self._createFractionSpinBox(0.95, 1, 1, rollingLayout)
+
+        self.rollingOriginButton = QPushButton("Run")
+        self.rollingOriginButton.setDisabled(True)   # enabled when estimation is complete
+        self.rollingOriginButton.clicked.connect(self._emitRunRollingOriginSignal)
+        rollingLayout.addWidget(self.rollingOriginButton, 2, 0, 1, 2)
+
+        rollingLayout.setColumnStretch(1, 1)
+
+        return rollingLayout
+
+    def _createFractionSpinBox(self, value, row, col, layout):
+        """Creates a QDoubleSpinBox for a fraction of the data."""
+        spinBox = QDoubleSpinBox()
+        spinBox.setDecimals(2)
+        spinBox.setMinimum(0.01)
+        spinBox.setMaximum(0.99)
+        spinBox.setValue(value)
+        spinBox.setSingleStep(0.01)
+        layout.addWidget(spinBox, row, col)
+        return spinBox
+
     def _setupModelsGroup(self):
         """Creates widget containing list of converged models.
 
@@ -390,3 +503,8 @@ class SideMenu3(QVBoxLayout):
 
     def _emitRunPSSESignal(self):
         self.runPSSESignal.emit(self.psseParameterSpinBox.value())
+
+    def _emitRunRollingOriginSignal(self):
+        start = self.rollingStartSpinBox.value()
+        stop = self.rollingStopSpinBox.value()
+        self.runRollingOriginSignal.emit(min(start, stop), max(start, stop))